@@ -15,14 +15,19 @@ if parent_dir not in sys.path:
 # Set production environment
 os.environ['FLASK_ENV'] = 'production'
 
+from functools import partial
+
 from app import create_app, db
+from app.connection import add_warmup_task
+from app.models import SCHEMA_VERSION, SchemaInfo
+from utils.database import ensure_schema
 
-# Create the Flask application
+# Create the Flask application (no database connection is opened here)
 app = create_app()
 
-# Initialize database tables on cold start (won't populate data - use seed script for that)
-with app.app_context():
-    db.create_all()
+# Check the schema version on the first request and create tables only if it is
+# out of date (won't populate data - use seed script for that)
+add_warmup_task(app, partial(ensure_schema, db, SchemaInfo, SCHEMA_VERSION))
 
 # Vercel expects the app to be named 'app' or 'application'
 application = app
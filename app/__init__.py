@@ -2,7 +2,7 @@
 Flask application factory and extensions.
 """
 import os
-from flask import Flask
+from flask import Flask, request
 from flask_sqlalchemy import SQLAlchemy
 from flask_bootstrap import Bootstrap5
 from flask_mail import Mail
@@ -39,20 +39,58 @@ def create_app(config_object=None):
     
     app.config.from_object(config_object)
     
+    # Reuse compiled templates across cold workers
+    bytecode_cache_dir = app.config.get('JINJA_BYTECODE_CACHE_DIR')
+    if bytecode_cache_dir:
+        from jinja2 import FileSystemBytecodeCache
+        try:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            app.jinja_env.bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+        except OSError as e:
+            app.logger.warning(f"Template bytecode cache disabled: {str(e)}")
+    
     # Initialize extensions with app
     db.init_app(app)
     mail.init_app(app)
     bootstrap.init_app(app)
     
     # Register blueprints
-    from app.routes import main_bp, rankings_bp, drivers_bp, contact_bp
+    from app.routes import main_bp, rankings_bp, drivers_bp, contact_bp, metrics_bp, api_bp
     app.register_blueprint(main_bp)
     app.register_blueprint(rankings_bp)
     app.register_blueprint(drivers_bp)
     app.register_blueprint(contact_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(api_bp)
+    
+    # Register request and SQL instrumentation
+    from app.instrumentation import init_instrumentation
+    init_instrumentation(app)
+    
+    # Open the first database connection on the first request, not at import
+    from app.connection import init_connection_warmup, init_snapshot_mode
+    init_snapshot_mode(app)
+    init_connection_warmup(app)
+    
+    # Cache rendered pages per data version
+    from app.response_cache import init_response_cache
+    init_response_cache(app)
     
+    # Comparison series shards are named after their contents and never change
+    from utils.series_bundle import SERIES_DIR, SHARD_MAX_AGE
+
+    @app.after_request
+    def cache_series_shards(response):
+        path = request.path
+        if path.startswith(f"{app.static_url_path}/{SERIES_DIR}/") and path.endswith('.bin'):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = SHARD_MAX_AGE
+            response.cache_control.immutable = True
+        return response
+
     # Register context processors
     from app.context_processors import register_context_processors
     register_context_processors(app)
-    
+
     return app
@@ -0,0 +1,84 @@
+"""
+Database connection warm-up and snapshot mode.
+
+Nothing connects to the database while the app is imported or created; the
+engine opens its first connection lazily. The first request runs any
+registered warm-up tasks (such as schema checks) before it is handled and,
+with DB_WARMUP enabled, opens a connection first, so connection and dialect
+setup happen once, up front, and connection failures are logged with context.
+
+In snapshot mode (DATABASE_SNAPSHOT) every connection to the read-only
+SQLite file is set up for memory-mapped reads.
+"""
+import threading
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+
+
+def add_warmup_task(app, task):
+    """
+    Run a callable once, inside the first request's app context.
+
+    Args:
+        app: Flask application instance
+        task: Zero-argument callable, e.g. db.create_all
+    """
+    app.extensions.setdefault('db_warmup_tasks', []).append(task)
+
+
+def warm_up(app):
+    """Open a connection (if DB_WARMUP is enabled) and run the registered warm-up tasks."""
+    try:
+        if app.config.get('DB_WARMUP', True):
+            with db.engine.connect() as conn:
+                conn.execute(text('SELECT 1'))
+        for task in app.extensions.get('db_warmup_tasks', []):
+            task()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        app.logger.error(f"Database warm-up failed: {str(e)}")
+
+
+def init_connection_warmup(app):
+    """
+    Register the first-request warm-up hook.
+
+    Args:
+        app: Flask application instance
+    """
+    lock = threading.Lock()
+    state = {'warm': False}
+
+    @app.before_request
+    def _warm_up_connection():
+        if state['warm']:
+            return
+        with lock:
+            if not state['warm']:
+                warm_up(app)
+                state['warm'] = True
+
+
+def init_snapshot_mode(app):
+    """
+    Configure connections to the read-only snapshot, if DATABASE_SNAPSHOT is set.
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config.get('DATABASE_SNAPSHOT'):
+        return
+
+    mmap_size = int(app.config.get('SNAPSHOT_MMAP_SIZE', 0))
+
+    def _configure_connection(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'PRAGMA mmap_size = {mmap_size}')
+        cursor.execute('PRAGMA query_only = ON')
+        cursor.close()
+
+    with app.app_context():
+        event.listen(db.engine, 'connect', _configure_connection)
@@ -2,6 +2,14 @@
 Flask context processors for template variables.
 """
 from datetime import datetime
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def plotly_js_url():
+    """CDN URL of the plotly.js version bundled with the installed plotly package."""
+    from plotly.offline import get_plotlyjs_version
+    return f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"
 
 
 def register_context_processors(app):
@@ -11,3 +19,8 @@ def register_context_processors(app):
     def inject_year():
         """Inject current year into all templates."""
         return {'current_year': datetime.now().year}
+
+    @app.context_processor
+    def inject_plotly_js_url():
+        """Inject the plotly.js script URL, matching the figures the charts serialize."""
+        return {'plotly_js_url': plotly_js_url()}
@@ -0,0 +1,114 @@
+"""
+Request and SQL instrumentation feeding the /metrics endpoint.
+
+Per-endpoint latency is recorded from Flask request hooks and SQL statement
+counts and durations from SQLAlchemy cursor events. All values go into the
+process-wide registry in utils.metrics. The same cursor events log statements
+slower than DB_SLOW_QUERY_MS.
+"""
+import time
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils.metrics import registry
+
+request_duration = registry.histogram(
+    'f1elo_http_request_duration_seconds',
+    'Request latency by endpoint.',
+    ('endpoint', 'method', 'status')
+)
+sql_statements = registry.counter(
+    'f1elo_sql_statements',
+    'SQL statements executed, by endpoint.',
+    ('endpoint',)
+)
+sql_duration = registry.histogram(
+    'f1elo_sql_duration_seconds',
+    'SQL statement execution time, by endpoint.',
+    ('endpoint',)
+)
+dataframe_duration = registry.histogram(
+    'f1elo_dataframe_duration_seconds',
+    'Time spent building pandas DataFrames from query results.',
+    ('endpoint',)
+)
+
+_sql_listeners_installed = False
+
+# Statements at least this slow are logged; None disables slow-query logging
+_slow_query_seconds = None
+
+
+def _current_endpoint():
+    """Endpoint label for the active request, or 'none' outside a request."""
+    if has_request_context():
+        return request.endpoint or 'unknown'
+    return 'none'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    endpoint = _current_endpoint()
+    if registry.enabled:
+        sql_statements.inc(endpoint)
+        sql_duration.observe(elapsed, endpoint)
+    if _slow_query_seconds is not None and elapsed >= _slow_query_seconds and has_app_context():
+        current_app.logger.warning(
+            "Slow query (%.0fms, endpoint %s): %s", elapsed * 1000, endpoint, statement[:500]
+        )
+
+
+def install_sql_listeners():
+    """Attach cursor execution hooks to every SQLAlchemy engine (once per process)."""
+    global _sql_listeners_installed
+    if _sql_listeners_installed:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    _sql_listeners_installed = True
+
+
+def init_instrumentation(app):
+    """
+    Register request timing hooks and SQL listeners for the app.
+
+    Metrics are skipped entirely when METRICS_ENABLED is False; the SQL
+    listeners stay installed while slow-query logging (DB_SLOW_QUERY_MS) is on.
+
+    Args:
+        app: Flask application instance
+    """
+    global _slow_query_seconds
+    slow_query_ms = app.config.get('DB_SLOW_QUERY_MS', 0)
+    _slow_query_seconds = slow_query_ms / 1000 if slow_query_ms else None
+
+    registry.enabled = app.config.get('METRICS_ENABLED', True)
+    if registry.enabled or _slow_query_seconds is not None:
+        install_sql_listeners()
+    if not registry.enabled:
+        return
+
+    @app.before_request
+    def _start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def _record_latency(response):
+        start = g.pop('request_start', None)
+        if start is not None:
+            request_duration.observe(
+                time.perf_counter() - start,
+                request.endpoint or 'unknown',
+                request.method,
+                str(response.status_code)
+            )
+        return response
@@ -4,6 +4,9 @@ SQLAlchemy database models.
 from datetime import datetime
 from app import db
 
+# Bump whenever a table or index is added, so deployed databases pick it up
+SCHEMA_VERSION = 4
+
 
 class DriverEloRanking(db.Model):
     """Main driver ELO ranking model."""
@@ -21,6 +24,11 @@ class DriverEloRanking(db.Model):
     last_year = db.Column(db.Integer, nullable=False)
     career_span = db.Column(db.Integer, nullable=False)
     flag_level = db.Column(db.String(50), nullable=False)
+    
+    # Glicko-2 results from the same replay; NULL until the next population
+    glicko_rating = db.Column(db.Float, nullable=True)
+    glicko_rd = db.Column(db.Float, nullable=True)
+    glicko_volatility = db.Column(db.Float, nullable=True)
 
 
 class DriverEloProgression(db.Model):
@@ -59,6 +67,28 @@ class RaceResult(db.Model):
     position = db.Column(db.Integer, nullable=True)
     elo_rating = db.Column(db.Float, nullable=False)
     team = db.Column(db.String(250), nullable=True)
+    
+    __table_args__ = (
+        db.Index('idx_race_team', 'race_name', 'race_date', 'team'),
+    )
+
+
+class DriverEncounter(db.Model):
+    """Head-to-head record of a driver against one opponent; stored for both orders of each pair."""
+    id = db.Column(db.Integer, primary_key=True)
+    f1_driver_id = db.Column(db.Integer, nullable=False)
+    opponent_f1_driver_id = db.Column(db.Integer, nullable=False)
+    races = db.Column(db.Integer, nullable=False)
+    wins = db.Column(db.Integer, nullable=False)
+    rating_gap = db.Column(db.Float, nullable=False)
+    teammate_races = db.Column(db.Integer, nullable=False)
+    teammate_wins = db.Column(db.Integer, nullable=False)
+    teammate_rating_gap = db.Column(db.Float, nullable=True)
+    
+    __table_args__ = (
+        db.Index('idx_encounter_pair', 'f1_driver_id', 'opponent_f1_driver_id', unique=True),
+        db.Index('idx_encounter_teammates', 'f1_driver_id', 'teammate_races'),
+    )
 
 
 class AppStats(db.Model):
@@ -67,3 +97,37 @@ class AppStats(db.Model):
     stat_key = db.Column(db.String(50), unique=True, nullable=False)
     stat_value = db.Column(db.Integer, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class HomeSummary(db.Model):
+    """Pre-computed home page chart aggregates and stats, one row per data version."""
+    id = db.Column(db.Integer, primary_key=True)
+    data_version = db.Column(db.String(64), unique=True, nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class OutboxMessage(db.Model):
+    """Contact form email waiting to be sent; deleted once sent, kept if it finally fails."""
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), nullable=False)
+    recipients = db.Column(db.Text, nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    reply_to = db.Column(db.String(255), nullable=True)
+    status = db.Column(db.String(10), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('idx_outbox_due', 'status', 'next_attempt_at'),
+    )
+
+
+class SchemaInfo(db.Model):
+    """Records the schema version the database was last brought up to."""
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,280 @@
+"""
+Persistent outbox for contact form email.
+
+The contact form stores its message in the outbox table and returns at once.
+How due messages are sent depends on MAIL_OUTBOX_MODE:
+
+    thread          A background thread per process sends them in batches
+                    over a single SMTP connection. gunicorn starts it when
+                    each worker boots, so retries left by an earlier run go
+                    out without waiting for a visit to /contact.
+    cron            Messages wait in the table until a scheduled request to
+                    /outbox/flush (a Vercel cron job, see vercel.json)
+                    sends them. Serverless functions are frozen once they
+                    respond and the runtime buffers the whole response, so
+                    neither a thread nor a send after the response would
+                    leave the request that queued the message.
+    auto            cron on Vercel, thread everywhere else (default).
+
+A failed message is retried with exponential backoff
+(MAIL_OUTBOX_RETRY_SECONDS, doubling per attempt, at most an hour apart) and
+marked failed after MAIL_OUTBOX_MAX_ATTEMPTS; in cron mode a retry goes out
+with the first flush after it is due. Sent messages are deleted.
+
+Each message is claimed with a conditional UPDATE before it is sent, so
+several workers can share the table without sending a message twice. A
+claim older than CLAIM_TIMEOUT, left by a worker that died mid-send, is
+picked up again.
+"""
+import os
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db, mail
+from app.models import OutboxMessage
+
+# Claims older than this are considered abandoned
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# Longest wait between two attempts at a message
+MAX_BACKOFF = timedelta(hours=1)
+
+_senders_lock = threading.Lock()
+
+
+def outbox_mode(app):
+    """Resolve MAIL_OUTBOX_MODE to 'thread' or 'cron'."""
+    mode = app.config.get('MAIL_OUTBOX_MODE', 'auto').lower()
+    if mode == 'auto':
+        return 'cron' if os.environ.get('VERCEL') else 'thread'
+    if mode not in ('thread', 'cron'):
+        raise ValueError(f"Unknown MAIL_OUTBOX_MODE: {mode}")
+    return mode
+
+
+def queue_mail(message):
+    """
+    Store a Flask-Mail message in the outbox.
+
+    In thread mode the sender is woken; in cron mode the message waits for
+    the next flush. If the outbox cannot be written (for example on a
+    read-only snapshot database), the message is sent synchronously instead.
+
+    Args:
+        message: flask_mail.Message
+
+    Raises:
+        Exception: If the synchronous fallback fails to send
+    """
+    app = current_app._get_current_object()
+    try:
+        db.session.add(OutboxMessage(
+            subject=message.subject,
+            recipients=','.join(message.recipients),
+            body=message.body,
+            reply_to=message.reply_to
+        ))
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        app.logger.warning(f"Outbox unavailable, sending directly: {str(e)}")
+        mail.send(message)
+        return
+    if outbox_mode(app) == 'thread':
+        outbox_sender(app).wake()
+
+
+def flush_outbox(app):
+    """
+    Send every due message now, in this thread, e.g. from /outbox/flush.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        int: Number of messages claimed (sent, or rescheduled after a failure)
+    """
+    batch_size = app.config.get('MAIL_OUTBOX_BATCH_SIZE', 20)
+    claimed = 0
+    with app.app_context():
+        try:
+            while True:
+                batch = send_due_messages(batch_size)
+                claimed += batch
+                if batch < batch_size:
+                    break
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            app.logger.error(f"Outbox flush error: {str(e)}")
+        finally:
+            db.session.remove()
+    return claimed
+
+
+def start_outbox_sender(app):
+    """
+    Start this process's sender in thread mode, e.g. when a worker boots.
+
+    The sender's first pass sends anything left pending by earlier runs.
+
+    Args:
+        app: Flask application instance
+    """
+    if outbox_mode(app) == 'thread':
+        outbox_sender(app).start()
+
+
+def outbox_sender(app):
+    """The app's OutboxSender, created on first use."""
+    with _senders_lock:
+        sender = app.extensions.get('outbox_sender')
+        if sender is None:
+            sender = app.extensions['outbox_sender'] = OutboxSender(app)
+    return sender
+
+
+def _due(now):
+    """Rows ready to be claimed: pending and due, or abandoned mid-send."""
+    return or_(
+        and_(OutboxMessage.status == 'pending', OutboxMessage.next_attempt_at <= now),
+        and_(OutboxMessage.status == 'sending', OutboxMessage.claimed_at < now - CLAIM_TIMEOUT)
+    )
+
+
+def _to_mail(message):
+    return Message(
+        subject=message.subject,
+        recipients=message.recipients.split(','),
+        body=message.body,
+        reply_to=message.reply_to
+    )
+
+
+def _schedule_retry(message, error, now):
+    config = current_app.config
+    message.attempts += 1
+    message.last_error = str(error)[:1000]
+    message.claimed_at = None
+    if message.attempts >= config.get('MAIL_OUTBOX_MAX_ATTEMPTS', 6):
+        message.status = 'failed'
+        current_app.logger.error(f"Outbox message {message.id} failed after {message.attempts} attempts: {str(error)}")
+        return
+    delay = timedelta(seconds=config.get('MAIL_OUTBOX_RETRY_SECONDS', 30) * 2 ** (message.attempts - 1))
+    message.status = 'pending'
+    message.next_attempt_at = now + min(delay, MAX_BACKOFF)
+    current_app.logger.warning(f"Outbox message {message.id} not sent (attempt {message.attempts}): {str(error)}")
+
+
+def send_due_messages(batch_size=None):
+    """
+    Claim one batch of due messages and send them over one SMTP connection.
+
+    Must run inside an app context.
+
+    Args:
+        batch_size: Messages per batch (default: MAIL_OUTBOX_BATCH_SIZE)
+
+    Returns:
+        int: Number of messages claimed
+    """
+    batch_size = batch_size or current_app.config.get('MAIL_OUTBOX_BATCH_SIZE', 20)
+    now = datetime.utcnow()
+    candidates = db.session.execute(
+        select(OutboxMessage.id).where(_due(now)).order_by(OutboxMessage.id).limit(batch_size)
+    ).scalars().all()
+
+    claimed = []
+    for message_id in candidates:
+        result = db.session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id == message_id, _due(now))
+            .values(status='sending', claimed_at=now)
+        )
+        if result.rowcount == 1:
+            claimed.append(message_id)
+    db.session.commit()
+    if not claimed:
+        return 0
+
+    unsent = OutboxMessage.query.filter(OutboxMessage.id.in_(claimed)).order_by(OutboxMessage.id).all()
+    try:
+        with mail.connect() as connection:
+            while unsent:
+                message = unsent[0]
+                try:
+                    connection.send(_to_mail(message))
+                    db.session.delete(message)
+                except Exception as e:
+                    _schedule_retry(message, e, now)
+                unsent.pop(0)
+                db.session.commit()
+    except Exception as e:
+        # Connecting failed, or the connection broke mid-batch
+        for message in unsent:
+            _schedule_retry(message, e, now)
+        db.session.commit()
+    return len(claimed)
+
+
+def next_attempt_in():
+    """Seconds until the next pending message is due, or None if there is none."""
+    next_at = db.session.execute(
+        select(func.min(OutboxMessage.next_attempt_at)).where(OutboxMessage.status == 'pending')
+    ).scalar()
+    if next_at is None:
+        return None
+    return max((next_at - datetime.utcnow()).total_seconds(), 0)
+
+
+class OutboxSender:
+    """
+    Background thread sending the outbox for one process.
+
+    The thread starts when a gunicorn worker boots (start_outbox_sender) or
+    on first use, and again after a fork, which does not copy it. It sends
+    whatever is due, then sleeps until woken by a new
+    message, the next retry is due or MAIL_OUTBOX_POLL_SECONDS pass.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._wake = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the thread unless it is already running in this process."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='outbox-sender', daemon=True)
+                self._thread.start()
+
+    def wake(self):
+        """Send due messages now."""
+        self.start()
+        self._wake.set()
+
+    def _run(self):
+        poll_seconds = self.app.config.get('MAIL_OUTBOX_POLL_SECONDS', 300)
+        batch_size = self.app.config.get('MAIL_OUTBOX_BATCH_SIZE', 20)
+        while True:
+            self._wake.clear()
+            timeout = poll_seconds
+            with self.app.app_context():
+                try:
+                    while send_due_messages(batch_size) == batch_size:
+                        pass
+                    retry_in = next_attempt_in()
+                    if retry_in is not None:
+                        timeout = min(timeout, max(retry_in, 1))
+                except SQLAlchemyError as e:
+                    db.session.rollback()
+                    self.app.logger.error(f"Outbox sender error: {str(e)}")
+                finally:
+                    db.session.remove()
+            self._wake.wait(timeout)
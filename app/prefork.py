@@ -0,0 +1,118 @@
+"""
+Pre-fork preloading for gunicorn workers.
+
+With preload_app (see gunicorn.conf.py) the master imports the app once and
+preload builds the state workers only ever read: the heavy imports, compiled
+templates, the most requested pages in the response cache and, with
+PRELOAD_PROCESSOR, the cached F1DataProcessor. It then closes every database
+connection and freezes the garbage collector, so the forked workers share
+those memory pages copy-on-write instead of each building their own.
+
+Per-process memory is exposed on /metrics to check how much stays shared.
+"""
+import gc
+import os
+
+from app import db
+from utils.metrics import registry
+
+process_memory = registry.gauge(
+    'f1elo_process_memory_bytes',
+    'Memory of the serving process (rss, pss, shared, private), from /proc/self/smaps_rollup.',
+    ('pid', 'kind')
+)
+gc_frozen_objects = registry.gauge(
+    'f1elo_process_gc_frozen_objects',
+    'Objects the process inherited frozen by gc.freeze() before fork.',
+    ('pid',)
+)
+
+
+def _dispose_engines(app, close=True):
+    """Drop pooled connections; with close=False they are discarded without closing the parent's sockets."""
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=close)
+
+
+def preload(app):
+    """
+    Build shared read-only state in the gunicorn master, before workers fork.
+
+    Args:
+        app: Flask application instance
+    """
+    import pandas  # noqa: F401
+    import plotly.graph_objects  # noqa: F401
+    import utils.visualization  # noqa: F401
+
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        app.jinja_env.get_template(name)
+
+    with app.app_context():
+        if app.config.get('PRELOAD_PROCESSOR'):
+            from core.cache_manager import get_cached_processor
+            get_cached_processor()
+
+        if 'response_cache' in app.extensions:
+            client = app.test_client()
+            for url in app.config.get('PRELOAD_PAGES', ()):
+                response = client.get(url)
+                if response.status_code != 200:
+                    app.logger.warning(f"Preloading {url} returned {response.status_code}")
+
+    # Threads and connections do not survive fork; workers open their own
+    executor = app.extensions.pop('query_executor', None)
+    if executor is not None:
+        executor.shutdown()
+    _dispose_engines(app)
+
+    # Move everything allocated so far out of the collector's reach, so
+    # collections in the workers never write to the shared pages
+    gc.collect()
+    gc.freeze()
+    app.logger.info(f"Preloaded app before fork; {gc.get_freeze_count()} objects frozen")
+
+
+def post_fork(app):
+    """Reset per-process state in a freshly forked worker."""
+    _dispose_engines(app, close=False)
+    gc.enable()
+
+
+def read_process_memory():
+    """
+    Memory of the current process, in bytes.
+
+    Shared pages are those also mapped by another process, such as the
+    preloaded state in forked workers; pss divides shared pages between the
+    processes mapping them.
+
+    Returns:
+        dict: rss, pss, shared and private, or {} where /proc/self/smaps_rollup
+              is unavailable (non-Linux systems)
+    """
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            lines = f.readlines()
+    except OSError:
+        return {}
+    values = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) == 3 and parts[2] == 'kB':
+            values[parts[0].rstrip(':')] = int(parts[1]) * 1024
+    return {
+        'rss': values.get('Rss', 0),
+        'pss': values.get('Pss', 0),
+        'shared': values.get('Shared_Clean', 0) + values.get('Shared_Dirty', 0),
+        'private': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+    }
+
+
+def record_process_metrics():
+    """Update this process's memory gauges, labelled by pid so each worker's scrape is distinguishable."""
+    pid = str(os.getpid())
+    for kind, value in read_process_memory().items():
+        process_memory.set(value, pid, kind)
+    gc_frozen_objects.set(gc.get_freeze_count(), pid)
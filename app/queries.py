@@ -0,0 +1,132 @@
+"""
+Columnar data access for the routes.
+
+Runs SQLAlchemy Core selects with explicit column projection and hands the
+result back as rows, NumPy column arrays or a DataFrame, without building ORM
+instances or copying attributes into intermediate dicts. NumPy and pandas
+are imported on first use so routes that only need rows stay light.
+
+run_concurrently issues a request's independent queries in parallel, each on
+its own pooled connection, so a remote database costs one round trip of
+latency instead of one per query.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import copy_current_request_context, current_app, has_request_context
+from sqlalchemy import select
+
+from app import db
+
+_executor_lock = threading.Lock()
+
+
+def build_select(columns, where=(), order_by=(), limit=None):
+    """
+    Build a Core select over the given columns.
+
+    Args:
+        columns: Column expressions to project (use .label() to rename)
+        where: Filter expressions, combined with AND
+        order_by: Ordering expressions
+        limit: Optional row limit
+
+    Returns:
+        Select statement
+    """
+    statement = select(*columns)
+    if where:
+        statement = statement.where(*where)
+    if order_by:
+        statement = statement.order_by(*order_by)
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+
+def fetch_rows(columns, where=(), order_by=(), limit=None):
+    """Return the matching rows as lightweight named tuples."""
+    return db.session.execute(build_select(columns, where, order_by, limit)).all()
+
+
+def fetch_row(columns, where=(), order_by=()):
+    """Return the first matching row, or None."""
+    return db.session.execute(build_select(columns, where, order_by, limit=1)).first()
+
+
+def _column_array(values):
+    import numpy as np
+    array = np.asarray(values)
+    if array.dtype.kind == 'O' and all(v is None or isinstance(v, (int, float)) for v in values):
+        # Numeric column with NULLs: NULL becomes NaN, as in a DataFrame
+        return np.array([np.nan if v is None else v for v in values], dtype=float)
+    if array.dtype.kind in 'OU':
+        # Keep strings as Python objects rather than fixed-width unicode
+        return np.array(values, dtype=object)
+    return array
+
+
+def fetch_columns(columns, where=(), order_by=(), limit=None):
+    """
+    Return the result as a dict of NumPy arrays keyed by column name.
+
+    Numeric columns come back as numeric arrays (float with NaN where the
+    column has NULLs) and strings as object arrays.
+    """
+    import numpy as np
+    result = db.session.execute(build_select(columns, where, order_by, limit))
+    keys = list(result.keys())
+    rows = result.all()
+    if not rows:
+        return {key: np.array([], dtype=object) for key in keys}
+    return {key: _column_array(values) for key, values in zip(keys, zip(*rows))}
+
+
+def fetch_frame(columns, where=(), order_by=(), limit=None):
+    """Return the result as a DataFrame with one column per projected column."""
+    import pandas as pd
+    result = db.session.execute(build_select(columns, where, order_by, limit))
+    return pd.DataFrame(result.all(), columns=list(result.keys()))
+
+
+def _query_executor(app):
+    """The app's query thread pool, created on first use."""
+    executor = app.extensions.get('query_executor')
+    if executor is None:
+        with _executor_lock:
+            executor = app.extensions.get('query_executor')
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=app.config['QUERY_WORKERS'], thread_name_prefix='query'
+                )
+                app.extensions['query_executor'] = executor
+    return executor
+
+
+def run_concurrently(*calls):
+    """
+    Run independent zero-argument callables concurrently and return their results.
+
+    Each call runs on the app's query thread pool in a copy of the current
+    request context, which gets its own app context and therefore its own
+    session and pooled connection; the connection is returned when the call
+    finishes. Database drivers release the GIL while waiting on the server,
+    so the waits overlap. The calls must not depend on each other's results.
+
+    Falls back to running the calls in order outside a request or when
+    QUERY_WORKERS is 1 or less.
+
+    Args:
+        *calls: Callables, typically wrapping fetch_rows/fetch_frame
+
+    Returns:
+        list: Results in the order of the calls; the first exception raised
+        by a call is re-raised
+    """
+    app = current_app._get_current_object()
+    if len(calls) < 2 or app.config.get('QUERY_WORKERS', 1) <= 1 or not has_request_context():
+        return [call() for call in calls]
+
+    executor = _query_executor(app)
+    futures = [executor.submit(copy_current_request_context(call)) for call in calls]
+    return [future.result() for future in futures]
@@ -0,0 +1,371 @@
+"""
+Full-response cache for GET pages.
+
+Rendered pages only change when the database is reseeded, so a page is cached
+under its endpoint, URL arguments, the query parameters the view reads and the
+current data version. populate_database stores a new data version on every reseed,
+which retires every cached page at once; it also clears the caches of the
+process that ran it.
+
+Responses are kept in a per-process LRU bounded by body size and, when
+RESPONSE_CACHE_DIR is set, in files shared by every worker on the host.
+Views opt in with the cached_page decorator, naming the query parameters they
+read; any other parameter is left out of the key, so junk query strings share
+the page rendered without them. Only views whose output depends on nothing but
+the URL and the data (no session, flashes or forms) should opt in.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import current_app, request, stream_with_context
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from app import db
+from utils.metrics import registry
+
+# AppStats key of the data version, rewritten by every reseed
+DATA_VERSION_KEY = 'data_version'
+
+cache_hits = registry.counter(
+    'f1elo_response_cache_hits',
+    'Pages served from the response cache, by endpoint and backend.',
+    ('endpoint', 'backend')
+)
+cache_misses = registry.counter(
+    'f1elo_response_cache_misses',
+    'Cacheable pages rendered because they were not cached, by endpoint.',
+    ('endpoint',)
+)
+
+
+def read_data_version():
+    """
+    Current data version from AppStats, or None if it cannot be read.
+
+    Databases seeded before data versions were stored are version '0'.
+
+    Returns:
+        str: Data version
+    """
+    from app.models import AppStats
+    from app.queries import fetch_row
+
+    try:
+        row = fetch_row([AppStats.stat_value], where=[AppStats.stat_key == DATA_VERSION_KEY])
+    except (OperationalError, ProgrammingError):
+        db.session.rollback()
+        return None
+    return str(row.stat_value) if row is not None else '0'
+
+
+def current_data_version():
+    """The data version as the response cache sees it, or read directly when caching is off."""
+    cache = current_app.extensions.get('response_cache')
+    return cache.data_version() if cache is not None else read_data_version()
+
+
+class MemoryCache:
+    """
+    LRU of cached responses, bounded by the total size of their bodies.
+
+    Entries are (content_type, body) pairs; bodies larger than a quarter of
+    the budget are not stored, so one page cannot flush the whole cache.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, content_type, body):
+        if len(body) > self.max_bytes // 4:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous[1])
+            self._entries[key] = (content_type, body)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class FileCache:
+    """
+    Cached responses as files, one directory per data version.
+
+    Files are written to a temporary name and renamed into place, so workers
+    reading concurrently never see a partial page. When a worker sees a new
+    data version it removes the directories of older versions. Once this
+    process has written about max_bytes, the oldest files are pruned.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._written = 0
+        self._lock = threading.Lock()
+
+    def _path(self, version, key):
+        return os.path.join(self.directory, str(version), hashlib.sha256(key.encode()).hexdigest())
+
+    def get(self, version, key):
+        try:
+            with open(self._path(version, key), 'rb') as f:
+                content_type, _, body = f.read().partition(b'\n')
+        except OSError:
+            return None
+        return content_type.decode(), body
+
+    def set(self, version, key, content_type, body):
+        path = self._path(version, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content_type.encode() + b'\n' + body)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            current_app.logger.warning(f"Response cache write failed: {str(e)}")
+            return
+        with self._lock:
+            self._written += len(body)
+            prune = self._written > self.max_bytes
+            if prune:
+                self._written = 0
+        if prune:
+            self.prune(version)
+
+    def prune(self, version):
+        """Remove the oldest files of a version until it uses at most three quarters of max_bytes."""
+        directory = os.path.join(self.directory, str(version))
+        try:
+            files = [entry for entry in os.scandir(directory) if entry.is_file()]
+            files = sorted((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in files)
+        except OSError:
+            return
+        size = sum(file_size for _, file_size, _ in files)
+        for _, file_size, path in files:
+            if size <= self.max_bytes * 3 // 4:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= file_size
+
+    def remove_other_versions(self, version):
+        """Delete the directories of every version but this one."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name != str(version):
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class ResponseCache:
+    """
+    Two-level response cache (process memory, then shared files) keyed by data version.
+
+    The data version is read from AppStats at most once every version_ttl
+    seconds, so other processes serve pages cached for the previous data for
+    at most that long after a reseed.
+    """
+
+    def __init__(self, max_bytes, directory=None, directory_max_bytes=None, version_ttl=5):
+        self.memory = MemoryCache(max_bytes)
+        self.files = FileCache(directory, directory_max_bytes or max_bytes) if directory else None
+        self.version_ttl = version_ttl
+        self._version = None
+        self._version_checked = 0
+        self._lock = threading.Lock()
+
+    def data_version(self):
+        """
+        Current data version, or None if it cannot be read.
+
+        Databases seeded before data versions were stored are version '0'.
+
+        Returns:
+            str: Data version
+        """
+        now = time.monotonic()
+        if self._version is not None and now - self._version_checked < self.version_ttl:
+            return self._version
+
+        version = read_data_version()
+        if version is None:
+            return None
+
+        with self._lock:
+            changed = version != self._version
+            self._version = version
+            self._version_checked = now
+        if changed:
+            self.memory.clear()
+            if self.files is not None:
+                self.files.remove_other_versions(version)
+        return version
+
+    def get(self, version, key):
+        """
+        Look up a cached response.
+
+        Returns:
+            tuple: (backend, content_type, body), or None on a miss
+        """
+        entry = self.memory.get(key)
+        if entry is not None:
+            return ('memory',) + entry
+        if self.files is not None:
+            entry = self.files.get(version, key)
+            if entry is not None:
+                self.memory.set(key, *entry)
+                return ('file',) + entry
+        return None
+
+    def set(self, version, key, content_type, body):
+        self.memory.set(key, content_type, body)
+        if self.files is not None:
+            self.files.set(version, key, content_type, body)
+
+    def clear(self):
+        """Drop every cached response and forget the data version."""
+        with self._lock:
+            self._version = None
+        self.memory.clear()
+        if self.files is not None:
+            self.files.clear()
+
+
+def cache_key(version, args=()):
+    """
+    Cache key for the current request.
+
+    Only the query parameters in args are part of the key. They are sorted by
+    name (repeated parameters keep their order, which can matter, e.g.
+    compare's drivers) and empty values are dropped, as the views treat them
+    as absent.
+    """
+    query = urlencode([
+        (name, value)
+        for name, values in sorted(request.args.lists()) if name in args
+        for value in values if value != ''
+    ])
+    view_args = urlencode(sorted((request.view_args or {}).items()))
+    return f"{version}|{request.endpoint}|{view_args}|{query}"
+
+
+def _store_when_complete(chunks, cache, version, key, content_type):
+    """Pass a streamed body through, caching it once it has been sent in full."""
+    body = []
+    for chunk in chunks:
+        body.append(chunk.encode() if isinstance(chunk, str) else chunk)
+        yield chunk
+    cache.set(version, key, content_type, b''.join(body))
+
+
+def cached_page(view=None, *, args=()):
+    """
+    Serve a GET view from the response cache when RESPONSE_CACHE_ENABLED.
+
+    Use as @cached_page for views that read no query parameters, or as
+    @cached_page(args=(...)) naming every parameter the view reads; other
+    parameters do not change the key. The names are kept on the view as
+    cache_args (build_static reads them too).
+
+    Only 200 responses are cached; errors, redirects and aborts are rendered
+    every time. Streamed responses are cached once fully sent.
+    """
+    if view is None:
+        return lambda view: cached_page(view, args=args)
+    args = frozenset(args)
+
+    @wraps(view)
+    def wrapper(*view_args, **kwargs):
+        cache = current_app.extensions.get('response_cache')
+        if cache is None or request.method != 'GET':
+            return view(*view_args, **kwargs)
+
+        version = cache.data_version()
+        if version is None:
+            return view(*view_args, **kwargs)
+
+        key = cache_key(version, args)
+        entry = cache.get(version, key)
+        if entry is not None:
+            backend, content_type, body = entry
+            if registry.enabled:
+                cache_hits.inc(request.endpoint, backend)
+            response = current_app.response_class(body, content_type=content_type)
+            response.headers['X-Cache'] = 'HIT'
+            return response
+
+        if registry.enabled:
+            cache_misses.inc(request.endpoint)
+        response = current_app.make_response(view(*view_args, **kwargs))
+        if response.status_code == 200:
+            if response.is_streamed:
+                response.response = stream_with_context(
+                    _store_when_complete(response.response, cache, version, key, response.content_type)
+                )
+            else:
+                cache.set(version, key, response.content_type, response.get_data())
+        response.headers['X-Cache'] = 'MISS'
+        return response
+
+    wrapper.cache_args = args
+    return wrapper
+
+
+def invalidate_response_cache(app):
+    """Clear the app's response cache, e.g. after the database was repopulated."""
+    cache = app.extensions.get('response_cache')
+    if cache is not None:
+        cache.clear()
+
+
+def init_response_cache(app):
+    """
+    Create the response cache from RESPONSE_CACHE_* settings.
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config.get('RESPONSE_CACHE_ENABLED', False):
+        return
+    app.extensions['response_cache'] = ResponseCache(
+        max_bytes=app.config.get('RESPONSE_CACHE_MAX_BYTES', 128 * 1024 * 1024),
+        directory=app.config.get('RESPONSE_CACHE_DIR') or None,
+        directory_max_bytes=app.config.get('RESPONSE_CACHE_DIR_MAX_BYTES'),
+        version_ttl=app.config.get('RESPONSE_CACHE_VERSION_TTL', 5)
+    )
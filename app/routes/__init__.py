@@ -5,5 +5,7 @@ from app.routes.main import main_bp
 from app.routes.rankings import rankings_bp
 from app.routes.drivers import drivers_bp
 from app.routes.contact import contact_bp
+from app.routes.metrics import metrics_bp
+from app.routes.api import api_bp
 
-__all__ = ['main_bp', 'rankings_bp', 'drivers_bp', 'contact_bp']
+__all__ = ['main_bp', 'rankings_bp', 'drivers_bp', 'contact_bp', 'metrics_bp', 'api_bp']
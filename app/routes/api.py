@@ -0,0 +1,116 @@
+"""
+API routes - JSON data endpoints used by interactive charts.
+"""
+from flask import Blueprint, abort, jsonify, request
+
+from app.models import DriverEloRanking, DriverEncounter, RaceResult
+from app.queries import fetch_row, fetch_rows
+
+api_bp = Blueprint('api', __name__, url_prefix='/api')
+
+
+@api_bp.route('/drivers/<int:driver_id>/races')
+def driver_races(driver_id):
+    """
+    Full-resolution race-by-race ELO series for a driver.
+    
+    Charts are downsampled for display; this endpoint serves every point so
+    the browser can swap in full detail when the user zooms. The optional
+    start and end query parameters limit the result to a race_number range.
+    """
+    driver = fetch_row(
+        [DriverEloRanking.id, DriverEloRanking.driver, DriverEloRanking.f1_driver_id],
+        where=[DriverEloRanking.id == driver_id]
+    )
+    if driver is None:
+        abort(404)
+    start = request.args.get('start', type=float)
+    end = request.args.get('end', type=float)
+    
+    filters = [RaceResult.f1_driver_id == driver.f1_driver_id]
+    if start is not None:
+        filters.append(RaceResult.race_number >= start)
+    if end is not None:
+        filters.append(RaceResult.race_number <= end)
+    rows = fetch_rows(
+        [
+            RaceResult.race_number,
+            RaceResult.race_name,
+            RaceResult.race_date,
+            RaceResult.elo_rating,
+            RaceResult.position
+        ],
+        where=filters,
+        order_by=[RaceResult.race_number]
+    )
+    
+    race_numbers, race_names, race_dates, elo_ratings, positions = (
+        [list(column) for column in zip(*rows)] if rows else ([], [], [], [], [])
+    )
+    return jsonify({
+        'driver_id': driver.id,
+        'driver': driver.driver,
+        'race_number': race_numbers,
+        'race_name': race_names,
+        'race_date': race_dates,
+        'elo_rating': elo_ratings,
+        'position': positions
+    })
+
+
+@api_bp.route('/h2h')
+def head_to_head():
+    """
+    Head-to-head record of two drivers, from the precomputed encounter matrix.
+    
+    The a and b query parameters are driver ids as in /driver/<id>. The
+    record covers every race both drivers started and, separately, the races
+    where they were teammates; rating gaps are a's average ELO minus b's
+    after those races. Drivers who never raced each other get zero races.
+    """
+    a = request.args.get('a', type=int)
+    b = request.args.get('b', type=int)
+    if a is None or b is None or a == b:
+        abort(400)
+    
+    drivers = {
+        row.id: row for row in fetch_rows(
+            [DriverEloRanking.id, DriverEloRanking.driver, DriverEloRanking.f1_driver_id],
+            where=[DriverEloRanking.id.in_((a, b))]
+        )
+    }
+    if a not in drivers or b not in drivers:
+        abort(404)
+    
+    record = fetch_row(
+        [
+            DriverEncounter.races,
+            DriverEncounter.wins,
+            DriverEncounter.rating_gap,
+            DriverEncounter.teammate_races,
+            DriverEncounter.teammate_wins,
+            DriverEncounter.teammate_rating_gap
+        ],
+        where=[
+            DriverEncounter.f1_driver_id == drivers[a].f1_driver_id,
+            DriverEncounter.opponent_f1_driver_id == drivers[b].f1_driver_id
+        ]
+    )
+    
+    # Finishing positions within a race are distinct, so b won every race a did not
+    races = record.races if record else 0
+    wins = record.wins if record else 0
+    teammate_races = record.teammate_races if record else 0
+    teammate_wins = record.teammate_wins if record else 0
+    return jsonify({
+        'a': {'id': a, 'driver': drivers[a].driver},
+        'b': {'id': b, 'driver': drivers[b].driver},
+        'races': races,
+        'a_wins': wins,
+        'b_wins': races - wins,
+        'rating_gap': record.rating_gap if record else None,
+        'teammate_races': teammate_races,
+        'teammate_a_wins': teammate_wins,
+        'teammate_b_wins': teammate_races - teammate_wins,
+        'teammate_rating_gap': record.teammate_rating_gap if record else None
+    })
@@ -1,11 +1,13 @@
 """
 Contact routes - contact form handling.
 """
-from flask import Blueprint, render_template, redirect, url_for, flash, current_app
+import hmac
+
+from flask import Blueprint, render_template, redirect, url_for, flash, current_app, request, abort, jsonify
 from flask_mail import Message
 
-from app import mail
 from app.forms import ContactForm
+from app.outbox import flush_outbox, queue_mail
 
 contact_bp = Blueprint('contact', __name__)
 
@@ -28,10 +30,26 @@ Message:
             reply_to=form.email.data
         )
         try:
-            mail.send(msg)
+            queue_mail(msg)
             flash('Thank you for your message! I will get back to you soon.', 'success')
         except Exception as e:
             current_app.logger.error(f"Email error: {str(e)}")
             flash('An error occurred sending your message. Please try again later.', 'danger')
         return redirect(url_for('contact.contact'))
     return render_template('contact.html', form=form)
+
+
+@contact_bp.route('/outbox/flush')
+def flush():
+    """
+    Send due contact form mail; called by the Vercel cron job in cron mode.
+
+    Vercel sends the CRON_SECRET as a bearer token. Without a configured
+    secret the endpoint does not exist.
+    """
+    secret = current_app.config.get('CRON_SECRET')
+    if not secret:
+        abort(404)
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {secret}"):
+        abort(401)
+    return jsonify(claimed=flush_outbox(current_app._get_current_object()))
@@ -1,122 +1,121 @@
 """
 Driver routes - profile and comparison pages.
 """
-from flask import Blueprint, render_template, request
-import pandas as pd
-import plotly.graph_objects as go
+import os
+
+from flask import Blueprint, abort, current_app, render_template, request, url_for
+from sqlalchemy import select
 
-from app import db
 from app.models import (
     DriverEloRanking, 
     DriverEloProgression, 
+    DriverEncounter,
     DriverTeamHistory, 
     RaceResult
 )
-from utils.visualization import DriverVisualizationUtils
+from app.instrumentation import dataframe_duration
+from app.queries import fetch_columns, fetch_frame, fetch_row, fetch_rows, run_concurrently
+from app.response_cache import cached_page, current_data_version
+from utils.metrics import chart_to_html, timed
+from utils.series_bundle import SERIES_DIR, index_filename
 
 drivers_bp = Blueprint('drivers', __name__)
 
 
 def get_teammate_comparisons_from_db(f1_driver_id):
-    """Get teammate comparisons from pre-computed race results."""
-    # Get this driver's race results
-    driver_results = RaceResult.query.filter_by(f1_driver_id=f1_driver_id).all()
-    
-    if not driver_results:
-        return []
-    
-    # Build comparison data
-    comparisons = {}
-    driver_races_by_team = {}
-    
-    for result in driver_results:
-        if result.team:
-            key = (result.race_name, result.race_date, result.team)
-            if key not in driver_races_by_team:
-                driver_races_by_team[key] = result
-    
-    # Find teammates (other drivers in same team/race)
-    for (race_name, race_date, team), driver_result in driver_races_by_team.items():
-        teammate_results = RaceResult.query.filter(
-            RaceResult.race_name == race_name,
-            RaceResult.race_date == race_date,
-            RaceResult.team == team,
-            RaceResult.f1_driver_id != f1_driver_id
-        ).all()
+    """
+    Get the driver's most frequent teammates from the head-to-head matrix.
+    
+    Args:
+        f1_driver_id: Driver id, or a scalar subquery selecting it
         
-        for teammate_result in teammate_results:
-            # Get teammate name
-            teammate = DriverEloRanking.query.filter_by(
-                f1_driver_id=teammate_result.f1_driver_id
-            ).first()
-            
-            if teammate:
-                teammate_name = teammate.driver
-                if teammate_name not in comparisons:
-                    comparisons[teammate_name] = {
-                        'teammate': teammate_name,
-                        'races': 0,
-                        'wins': 0,
-                        'elo_diffs': []
-                    }
-                
-                comparisons[teammate_name]['races'] += 1
-                if driver_result.position and teammate_result.position:
-                    if driver_result.position < teammate_result.position:
-                        comparisons[teammate_name]['wins'] += 1
-                comparisons[teammate_name]['elo_diffs'].append(
-                    driver_result.elo_rating - teammate_result.elo_rating
-                )
-    
-    # Calculate final statistics
-    result = []
-    for name, data in comparisons.items():
-        if data['races'] > 0:
-            avg_elo_diff = sum(data['elo_diffs']) / len(data['elo_diffs']) if data['elo_diffs'] else 0
-            result.append({
-                'teammate': name,
-                'races': data['races'],
-                'win_percentage': (data['wins'] / data['races']) * 100,
-                'elo_diff': round(avg_elo_diff, 1)
-            })
-    
-    return sorted(result, key=lambda x: x['races'], reverse=True)[:5]
+    Returns:
+        list: Up to five dicts with teammate, races, win_percentage and
+        elo_diff (average ELO difference after their races together)
+    """
+    rows = fetch_rows(
+        [
+            DriverEloRanking.driver,
+            DriverEncounter.teammate_races,
+            DriverEncounter.teammate_wins,
+            DriverEncounter.teammate_rating_gap
+        ],
+        where=[
+            DriverEncounter.f1_driver_id == f1_driver_id,
+            DriverEncounter.teammate_races > 0,
+            DriverEloRanking.f1_driver_id == DriverEncounter.opponent_f1_driver_id
+        ],
+        order_by=[DriverEncounter.teammate_races.desc(), DriverEloRanking.driver],
+        limit=5
+    )
+    return [
+        {
+            'teammate': row.driver,
+            'races': row.teammate_races,
+            'win_percentage': (row.teammate_wins / row.teammate_races) * 100,
+            'elo_diff': round(row.teammate_rating_gap, 1)
+        }
+        for row in rows
+    ]
 
 
 @drivers_bp.route('/driver/<int:driver_id>')
+@cached_page
 def driver_profile(driver_id):
     """Individual driver profile page."""
-    driver = DriverEloRanking.query.get_or_404(driver_id)
+    # Chart modules pull in pandas and plotly; import them only for chart pages
+    from utils.figure_builder import FigureDict
+    from utils.visualization import DriverVisualizationUtils
+    
+    # The four queries only depend on the URL, so they run concurrently, each
+    # keyed by the driver's f1_driver_id through a subquery
+    f1_driver_id = (
+        select(DriverEloRanking.f1_driver_id)
+        .where(DriverEloRanking.id == driver_id)
+        .scalar_subquery()
+    )
     
-    # Get ELO progression from database
-    elo_progression = DriverEloProgression.query.filter_by(
-        f1_driver_id=driver.f1_driver_id
-    ).order_by(DriverEloProgression.year).all()
+    def load_progression():
+        # Get ELO progression and team history straight into DataFrames
+        with timed(dataframe_duration, 'drivers.driver_profile'):
+            return fetch_frame(
+                [
+                    DriverEloProgression.year,
+                    DriverEloProgression.f1_driver_id.label('driverId'),
+                    DriverEloProgression.elo_rating
+                ],
+                where=[DriverEloProgression.f1_driver_id == f1_driver_id],
+                order_by=[DriverEloProgression.year]
+            )
     
-    if not elo_progression:
-        return "No ELO progression data available", 404
+    def load_team_history():
+        with timed(dataframe_duration, 'drivers.driver_profile'):
+            return fetch_frame(
+                [
+                    DriverTeamHistory.year,
+                    DriverTeamHistory.team,
+                    DriverTeamHistory.elo_rating,
+                    DriverTeamHistory.f1_driver_id.label('driverId')
+                ],
+                where=[DriverTeamHistory.f1_driver_id == f1_driver_id],
+                order_by=[DriverTeamHistory.year]
+            )
+    
+    driver, driver_elo_progression, team_data, teammate_comparisons = run_concurrently(
+        lambda: fetch_row(DriverEloRanking.__table__.columns, where=[DriverEloRanking.id == driver_id]),
+        load_progression,
+        load_team_history,
+        lambda: get_teammate_comparisons_from_db(f1_driver_id)
+    )
     
-    # Convert to DataFrame
-    driver_elo_progression = pd.DataFrame([{
-        'year': p.year,
-        'driverId': p.f1_driver_id,
-        'elo_rating': p.elo_rating
-    } for p in elo_progression])
-    
-    # Get team history from database
-    team_history = DriverTeamHistory.query.filter_by(
-        f1_driver_id=driver.f1_driver_id
-    ).order_by(DriverTeamHistory.year).all()
-    
-    team_data = pd.DataFrame([{
-        'year': t.year,
-        'team': t.team,
-        'elo_rating': t.elo_rating,
-        'driverId': t.f1_driver_id
-    } for t in team_history]) if team_history else pd.DataFrame()
+    if driver is None:
+        abort(404)
+    
+    if driver_elo_progression.empty:
+        return "No ELO progression data available", 404
     
     # Initialize visualization utils
-    viz_utils = DriverVisualizationUtils()
+    viz_utils = DriverVisualizationUtils(max_points=current_app.config['CHART_MAX_POINTS'])
     
     charts = {
         'elo_history_chart': viz_utils.create_elo_history_chart(driver_elo_progression, driver.driver),
@@ -129,68 +128,150 @@ def driver_profile(driver_id):
         charts['team_elo_chart'] = viz_utils.create_team_elo_chart(team_data, driver.driver)
     else:
         # Create empty chart placeholder
-        fig = go.Figure()
-        fig.update_layout(title='Team ELO data not available')
-        charts['team_elo_chart'] = fig
-    
-    # Get teammate comparisons from database
-    teammate_comparisons = get_teammate_comparisons_from_db(driver.f1_driver_id)
+        charts['team_elo_chart'] = FigureDict(layout={'title': {'text': 'Team ELO data not available'}})
     
     return render_template(
         'driver_profile.html',
         driver=driver,
-        elo_history_chart=charts['elo_history_chart'].to_html(full_html=False),
-        team_elo_chart=charts['team_elo_chart'].to_html(full_html=False),
-        era_performance_chart=charts['era_performance_chart'].to_html(full_html=False),
-        confidence_chart=charts['confidence_chart'].to_html(full_html=False),
+        elo_history_chart=chart_to_html(charts['elo_history_chart'], 'elo_history'),
+        team_elo_chart=chart_to_html(charts['team_elo_chart'], 'team_elo'),
+        era_performance_chart=chart_to_html(charts['era_performance_chart'], 'era_performance'),
+        confidence_chart=chart_to_html(charts['confidence_chart'], 'confidence'),
         teammate_comparisons=teammate_comparisons
     )
 
 
+def parse_selected_ids(values, max_count):
+    """
+    Parse driver ids from the query string.
+    
+    Non-numeric values and duplicates are dropped and the selection is capped
+    at max_count, preserving the order the drivers were picked in.
+    
+    Returns:
+        tuple: (selected ids, whether the selection was truncated)
+    """
+    selected_ids = []
+    for value in values:
+        if value.isdigit() and int(value) not in selected_ids:
+            selected_ids.append(int(value))
+    return selected_ids[:max_count], len(selected_ids) > max_count
+
+
+def get_comparison_data(selected_ids):
+    """
+    Fetch race-by-race ELO series for the selected drivers in a single query.
+    
+    Args:
+        selected_ids: DriverEloRanking ids in display order
+        
+    Returns:
+        DataFrame with one row per race per driver, ordered by selection and
+        race number, or None if none of the drivers have race results.
+    """
+    import numpy as np
+    import pandas as pd
+    
+    columns = fetch_columns(
+        [
+            DriverEloRanking.id,
+            DriverEloRanking.driver,
+            RaceResult.race_number,
+            RaceResult.race_name,
+            RaceResult.race_date,
+            RaceResult.elo_rating,
+            RaceResult.position,
+            RaceResult.year
+        ],
+        where=[
+            RaceResult.f1_driver_id == DriverEloRanking.f1_driver_id,
+            DriverEloRanking.id.in_(selected_ids)
+        ],
+        order_by=[DriverEloRanking.id, RaceResult.race_number]
+    )
+    
+    if not len(columns['id']):
+        return None
+    
+    with timed(dataframe_duration, 'drivers.compare_drivers'):
+        # Stable sort by selection order keeps race_number order within each driver
+        selection_rank = {driver_id: rank for rank, driver_id in enumerate(selected_ids)}
+        order = np.argsort([selection_rank[i] for i in columns['id'].tolist()], kind='stable')
+        
+        return pd.DataFrame({
+            'race_number': columns['race_number'][order],
+            'race_name': columns['race_name'][order],
+            'race_date': columns['race_date'][order],
+            'elo_rating': columns['elo_rating'][order],
+            'position': columns['position'][order],
+            'year': columns['year'][order],
+            'Driver': columns['driver'][order],
+            'driver_id': columns['id'][order]
+        })
+
+
+def series_index_url():
+    """
+    URL of the comparison series bundle built for the current data, or None.
+
+    build_static.py writes the bundle; without one for the data being served
+    (not built, or the database was reseeded since) the page falls back to
+    rendering every comparison on the server.
+    """
+    version = current_data_version()
+    if version is None:
+        return None
+    filename = f"{SERIES_DIR}/{index_filename(version)}"
+    if not os.path.exists(os.path.join(current_app.static_folder, filename)):
+        return None
+    return url_for('static', filename=filename)
+
+
 @drivers_bp.route('/compare', methods=['GET'])
+@cached_page(args=('drivers',))
 def compare_drivers():
     """Driver comparison page."""
-    # Get all drivers for the dropdown
-    drivers = DriverEloRanking.query.order_by(DriverEloRanking.driver).all()
+    # Only the columns the dropdown needs
+    drivers = fetch_rows(
+        [
+            DriverEloRanking.id,
+            DriverEloRanking.driver,
+            DriverEloRanking.first_year,
+            DriverEloRanking.last_year
+        ],
+        order_by=[DriverEloRanking.driver]
+    )
     
     # Get selected driver IDs from query parameters
-    selected_ids = request.args.getlist('drivers')
-    selected_ids = [int(id) for id in selected_ids if id.isdigit()]
-    
-    comparison_data = None
-    if selected_ids:
-        comparison_data = []
-        for driver_id in selected_ids:
-            driver = DriverEloRanking.query.get(driver_id)
-            if driver:
-                # Get race progression from database
-                race_results = RaceResult.query.filter_by(
-                    f1_driver_id=driver.f1_driver_id
-                ).order_by(RaceResult.race_number).all()
-                
-                if race_results:
-                    driver_data = pd.DataFrame([{
-                        'race_number': r.race_number,
-                        'race_name': r.race_name,
-                        'race_date': r.race_date,
-                        'elo_rating': r.elo_rating,
-                        'position': r.position,
-                        'year': r.year,
-                        'Driver': driver.driver
-                    } for r in race_results])
-                    comparison_data.append(driver_data)
-        
-        if comparison_data:
-            comparison_data = pd.concat(comparison_data, ignore_index=True)
+    max_drivers = current_app.config['COMPARE_MAX_DRIVERS']
+    selected_ids, truncated = parse_selected_ids(request.args.getlist('drivers'), max_drivers)
+    
+    comparison_data = get_comparison_data(selected_ids) if selected_ids else None
     
-    viz_utils = DriverVisualizationUtils()
     comparison_chart = None
     if comparison_data is not None and not comparison_data.empty:
-        comparison_chart = viz_utils.create_comparison_chart(comparison_data).to_html(full_html=False)
+        from utils.visualization import DriverVisualizationUtils
+        viz_utils = DriverVisualizationUtils(max_points=current_app.config['CHART_MAX_POINTS'])
+        comparison_chart = chart_to_html(viz_utils.create_comparison_chart(comparison_data), 'comparison')
+    
+    # With a series bundle the browser draws later comparisons itself
+    series_url = series_index_url()
+    series_figure = None
+    if series_url is not None:
+        from utils.figure_builder import FigureDict
+        from utils.visualization import DriverVisualizationUtils
+        series_figure = FigureDict(
+            data=[DriverVisualizationUtils.COMPARISON_TRACE],
+            layout=DriverVisualizationUtils.comparison_layout()
+        ).to_dict()
     
     return render_template(
         'compare.html',
         drivers=drivers,
         selected_ids=selected_ids,
-        comparison_chart=comparison_chart
+        max_drivers=max_drivers,
+        truncated=truncated,
+        comparison_chart=comparison_chart,
+        series_url=series_url,
+        series_figure=series_figure
     )
@@ -1,33 +1,68 @@
 """
 Main routes - home page, methodology, and search.
 """
+import json
+
 from flask import Blueprint, render_template, redirect, url_for, request
-import pandas as pd
+from sqlalchemy.exc import OperationalError, ProgrammingError
 
 from app import db
-from app.models import DriverEloRanking, AppStats
-from utils.visualization import DriverVisualizationUtils
+from app.models import DriverEloRanking, AppStats, HomeSummary
+from app.instrumentation import dataframe_duration
+from app.queries import fetch_frame, fetch_row, fetch_rows
+from app.response_cache import cached_page, current_data_version
+from utils.metrics import chart_to_html, timed
 
 main_bp = Blueprint('main', __name__)
 
+# Columns shown for each search result
+SEARCH_RESULT_COLUMNS = [
+    DriverEloRanking.id,
+    DriverEloRanking.driver,
+    DriverEloRanking.elo_rating,
+    DriverEloRanking.reliability_grade,
+    DriverEloRanking.flag_level,
+    DriverEloRanking.first_year,
+    DriverEloRanking.last_year
+]
+
 
 def get_app_stats():
     """Get application statistics from database."""
-    stats = {}
-    for stat in AppStats.query.all():
-        stats[stat.stat_key] = stat.stat_value
-    return stats
+    return dict(fetch_rows([AppStats.stat_key, AppStats.stat_value]))
 
 
-@main_bp.route('/')
-def home():
-    """Home page with dashboard and charts."""
-    # Fetch data from database
-    drivers = DriverEloRanking.query.all()
-    df = pd.DataFrame([
-        {col.name: getattr(driver, col.name) for col in DriverEloRanking.__table__.columns}
-        for driver in drivers
-    ])
+def get_home_summary():
+    """
+    Get the precomputed home page stats and chart aggregates for the current data version.
+    
+    Returns:
+        dict: {'stats': ..., 'charts': ...}, or None if no summary is stored
+        for the data version
+    """
+    version = current_data_version()
+    if version is None:
+        return None
+    try:
+        summary = fetch_row(
+            [HomeSummary.payload],
+            where=[HomeSummary.data_version == version]
+        )
+    except (OperationalError, ProgrammingError):
+        # Database seeded before the home_summary table existed
+        db.session.rollback()
+        return None
+    if summary is None:
+        return None
+    return json.loads(summary.payload)
+
+
+def compute_home_summary():
+    """Compute the home page stats and chart aggregates from the rankings table."""
+    from utils.visualization import summarize_home_charts
+    
+    with timed(dataframe_duration, 'main.home'):
+        df = fetch_frame(DriverEloRanking.__table__.columns)
     
     # Get pre-computed statistics from database
     stats = get_app_stats()
@@ -40,29 +75,47 @@ def home():
             'data_points': len(df) * len(df.columns) if not df.empty else 0
         }
     
+    return {
+        'stats': stats,
+        'charts': summarize_home_charts(df) if not df.empty else None
+    }
+
+
+@main_bp.route('/')
+@cached_page
+def home():
+    """Home page with dashboard and charts."""
+    from utils.visualization import DriverVisualizationUtils
+    
+    # One small query when the read model has been populated
+    summary = get_home_summary() or compute_home_summary()
+    stats = summary['stats']
+    charts = summary['charts']
+    
     # Initialize visualization utils
     viz_utils = DriverVisualizationUtils()
     
-    # Generate charts from database data
-    if not df.empty:
-        bar_chart = viz_utils.create_top_drivers_chart(df)
-        line_chart = viz_utils.create_era_trends_chart(df)
-        pie_chart = viz_utils.create_reliability_distribution_chart(df)
-        scatter_chart = viz_utils.create_career_longevity_chart(df)
+    # Generate charts from the precomputed aggregates
+    if charts:
+        bar_chart = viz_utils.create_top_drivers_chart(charts['top_drivers'])
+        line_chart = viz_utils.create_era_trends_chart(charts['era_trends'])
+        pie_chart = viz_utils.create_reliability_distribution_chart(charts['reliability_distribution'])
+        scatter_chart = viz_utils.create_career_longevity_chart(charts['career_longevity'])
         
         return render_template(
             'index.html',
             stats=stats,
-            bar_chart=bar_chart.to_html(full_html=False),
-            line_chart=line_chart.to_html(full_html=False),
-            pie_chart=pie_chart.to_html(full_html=False),
-            scatter_chart=scatter_chart.to_html(full_html=False)
+            bar_chart=chart_to_html(bar_chart, 'top_drivers'),
+            line_chart=chart_to_html(line_chart, 'era_trends'),
+            pie_chart=chart_to_html(pie_chart, 'reliability_distribution'),
+            scatter_chart=chart_to_html(scatter_chart, 'career_longevity')
         )
     
     return render_template('index.html', stats=stats)
 
 
 @main_bp.route('/methodology')
+@cached_page
 def methodology():
     """Methodology explanation page."""
     return render_template('methodology.html')
@@ -88,16 +141,18 @@ def search_drivers():
         return redirect(url_for('main.home'))
 
     # Check for exact match
-    exact_match = DriverEloRanking.query.filter(
-        db.func.lower(DriverEloRanking.driver) == db.func.lower(query)
-    ).first()
+    exact_match = fetch_row(
+        [DriverEloRanking.id],
+        where=[db.func.lower(DriverEloRanking.driver) == db.func.lower(query)]
+    )
 
     if exact_match:
         return redirect(url_for('drivers.driver_profile', driver_id=exact_match.id))
 
     # Find similar drivers
-    similar_drivers = DriverEloRanking.query.filter(
-        db.func.lower(DriverEloRanking.driver).like(f"%{query.lower()}%")
-    ).all()
+    similar_drivers = fetch_rows(
+        SEARCH_RESULT_COLUMNS,
+        where=[db.func.lower(DriverEloRanking.driver).like(f"%{query.lower()}%")]
+    )
 
     return render_template('search_results.html', drivers=similar_drivers, query=query)
@@ -0,0 +1,21 @@
+"""
+Metrics routes - Prometheus text exposition endpoint.
+"""
+from flask import Blueprint, Response
+
+from app.prefork import record_process_metrics
+from utils.metrics import registry
+
+metrics_bp = Blueprint('metrics', __name__)
+
+# Prometheus text exposition format; passed as content_type so Werkzeug does
+# not append a second charset
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@metrics_bp.route('/metrics')
+def metrics():
+    """Expose collected metrics in Prometheus text format."""
+    if registry.enabled:
+        record_process_metrics()
+    return Response(registry.render(), content_type=CONTENT_TYPE)
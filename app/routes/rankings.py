@@ -1,15 +1,62 @@
 """
 Rankings routes - complete rankings page with filters.
 """
-from flask import Blueprint, render_template, request
+from flask import Blueprint, current_app, render_template, request, stream_template, url_for
+from sqlalchemy import and_, func, or_
 
 from app import db
 from app.models import DriverEloRanking
+from app.queries import fetch_columns, fetch_row, fetch_rows
+from app.response_cache import cached_page
 
 rankings_bp = Blueprint('rankings', __name__)
 
+# Ranking order; id breaks ties, which also makes it a stable keyset for paging
+RANKING_ORDER = [DriverEloRanking.elo_rating.desc(), DriverEloRanking.id]
+
+# Query parameters of the rankings page; filters are carried over between pages
+RANKINGS_FILTERS = ('experience', 'reliability', 'min_elo', 'max_elo', 'year_from', 'year_to', 'search', 'per_page')
+RANKINGS_ARGS = RANKINGS_FILTERS + ('after', 'stream')
+
+
+def parse_page_size(value, default, maximum):
+    """Page size from the per_page parameter, clamped to 1..maximum."""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return min(max(size, 1), maximum)
+
+
+def stream_requested(value, default):
+    """Whether to stream, from the stream parameter (1/true or 0/false), else default."""
+    if value is None:
+        return default
+    value = value.strip().lower()
+    if value in ('1', 'true', 'yes', 'on'):
+        return True
+    if value in ('0', 'false', 'no', 'off'):
+        return False
+    return default
+
+
+def buffered(chunks, size=16384):
+    """Join a template's many small chunks into writes of about size characters."""
+    buffer = []
+    length = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer)
+
 
 @rankings_bp.route('/rankings')
+@cached_page(args=RANKINGS_ARGS)
 def complete_rankings():
     """Complete rankings page with filtering options."""
     # Get filter parameters from request
@@ -20,36 +67,67 @@ def complete_rankings():
     year_from = request.args.get('year_from', type=int)
     year_to = request.args.get('year_to', type=int)
     search_query = request.args.get('search', '').strip()
+    page_size = parse_page_size(
+        request.args.get('per_page'),
+        current_app.config['RANKINGS_PAGE_SIZE'],
+        current_app.config['RANKINGS_MAX_PAGE_SIZE']
+    )
+    # Cursor: id of the last driver on the previous page
+    after = request.args.get('after', type=int)
 
-    # Get all drivers ordered by Elo rating to calculate absolute rankings
-    all_drivers = DriverEloRanking.query.order_by(DriverEloRanking.elo_rating.desc()).all()
-    rankings_dict = {driver.id: idx + 1 for idx, driver in enumerate(all_drivers)}
-
-    # Start with base query
-    query = DriverEloRanking.query
+    # Get all driver ids ordered by Elo rating to calculate absolute rankings
+    ranked = fetch_columns(
+        [DriverEloRanking.id, DriverEloRanking.elo_rating],
+        order_by=RANKING_ORDER
+    )
+    rankings_dict = {driver_id: idx + 1 for idx, driver_id in enumerate(ranked['id'].tolist())}
 
     # Apply filters
+    filters = []
     if experience_filter:
-        query = query.filter(DriverEloRanking.flag_level == experience_filter)
+        filters.append(DriverEloRanking.flag_level == experience_filter)
     if reliability_filter:
-        query = query.filter(DriverEloRanking.reliability_grade == reliability_filter)
+        filters.append(DriverEloRanking.reliability_grade == reliability_filter)
     if min_elo is not None:
-        query = query.filter(DriverEloRanking.elo_rating >= min_elo)
+        filters.append(DriverEloRanking.elo_rating >= min_elo)
     if max_elo is not None:
-        query = query.filter(DriverEloRanking.elo_rating <= max_elo)
+        filters.append(DriverEloRanking.elo_rating <= max_elo)
     if year_from is not None:
-        query = query.filter(DriverEloRanking.last_year >= year_from)
+        filters.append(DriverEloRanking.last_year >= year_from)
     if year_to is not None:
-        query = query.filter(DriverEloRanking.first_year <= year_to)
+        filters.append(DriverEloRanking.first_year <= year_to)
     if search_query:
-        query = query.filter(DriverEloRanking.driver.ilike(f"%{search_query}%"))
+        filters.append(DriverEloRanking.driver.ilike(f"%{search_query}%"))
+
+    total = fetch_row([func.count(DriverEloRanking.id)], where=filters)[0]
+
+    # Keyset pagination: rows ranked after the cursor driver (unknown cursors start at the top)
+    page_filters = list(filters)
+    if after in rankings_dict:
+        after_elo = float(ranked['elo_rating'][rankings_dict[after] - 1])
+        page_filters.append(or_(
+            DriverEloRanking.elo_rating < after_elo,
+            and_(DriverEloRanking.elo_rating == after_elo, DriverEloRanking.id > after)
+        ))
+    else:
+        after = None
+
+    # Get one page of filtered and ordered results, with the ranking added to each driver
+    drivers = [
+        {**row._mapping, 'ranking': rankings_dict[row.id]}
+        for row in fetch_rows(
+            DriverEloRanking.__table__.columns,
+            where=page_filters,
+            order_by=RANKING_ORDER,
+            limit=page_size + 1
+        )
+    ]
+    has_next = len(drivers) > page_size
+    drivers = drivers[:page_size]
 
-    # Get filtered and ordered results
-    drivers = query.order_by(DriverEloRanking.elo_rating.desc()).all()
-    
-    # Add ranking to each driver
-    for driver in drivers:
-        driver.ranking = rankings_dict[driver.id]
+    page_args = {key: value for key, value in request.args.items() if key in RANKINGS_FILTERS and value != ''}
+    next_url = url_for('rankings.complete_rankings', **page_args, after=drivers[-1]['id']) if has_next else None
+    first_url = url_for('rankings.complete_rankings', **page_args) if after is not None else None
 
     # Get dropdown options
     experiences = [exp[0] for exp in db.session.query(DriverEloRanking.flag_level).distinct()]
@@ -59,9 +137,16 @@ def complete_rankings():
         db.func.max(DriverEloRanking.last_year)
     ).first()
 
-    return render_template(
+    # Streaming sends the rendered page in chunks as the table rows are rendered;
+    # ?stream=1 or ?stream=0 overrides the RANKINGS_STREAM default for one request
+    stream = stream_requested(request.args.get('stream'), current_app.config['RANKINGS_STREAM'])
+    render = stream_template if stream else render_template
+    rendered = render(
         "rankings.html",
         drivers=drivers,
+        total=total,
+        next_url=next_url,
+        first_url=first_url,
         experiences=experiences,
         reliability_grades=reliability_grades,
         year_range=year_range,
@@ -75,3 +160,6 @@ def complete_rankings():
             'search': search_query
         }
     )
+    if stream:
+        return current_app.response_class(buffered(rendered), mimetype='text/html')
+    return rendered
@@ -1,18 +1,32 @@
 """
 Application services for database initialization and population.
 """
+import json
+import multiprocessing
+import os
+import secrets
 import pandas as pd
 from datetime import datetime
 
+from flask import current_app
+from sqlalchemy import insert, select
+
 from app import db
 from app.models import (
     DriverEloRanking, 
     DriverEloProgression, 
     DriverTeamHistory, 
+    DriverEncounter,
     RaceResult, 
-    AppStats
+    AppStats,
+    HomeSummary,
+    SchemaInfo,
+    SCHEMA_VERSION
 )
-from utils.database import update_database_from_df
+from app.response_cache import DATA_VERSION_KEY, invalidate_response_cache
+from utils.database import ensure_schema, update_database_from_df
+from utils.stage_report import StageReport
+from utils.visualization import summarize_home_charts
 
 
 def init_db(app):
@@ -27,8 +41,8 @@ def init_db(app):
     """
     with app.app_context():
         try:
-            # Create all tables
-            db.create_all()
+            # Create tables and indexes unless the schema is already current
+            ensure_schema(db, SchemaInfo, SCHEMA_VERSION)
             
             # Check if we need to populate the data
             if not DriverEloRanking.query.first():
@@ -42,120 +56,273 @@ def init_db(app):
             return False
 
 
-def populate_database():
-    """Populate the database with computed ELO rankings and progressions."""
+def populate_database(report=None):
+    """
+    Populate the database with computed ELO rankings and progressions.
+    
+    Args:
+        report: StageReport recording each stage's time, memory and row
+                count (default: a new report, discarded)
+    """
     from core import F1DataProcessor
     
+    if report is None:
+        report = StageReport()
+    
     print("Loading and processing F1 data...")
-    processor = F1DataProcessor()
-    processor.load_data()
-    processor.process_races()
+    processor = F1DataProcessor(pairing=current_app.config.get('ELO_PAIRING', 'teammates'))
+    with report.stage('load_data') as stage:
+        processor.load_data()
+        stage['rows'] = len(processor.results)
+    with report.stage('process_races') as stage:
+        processor.process_races(workers=current_app.config.get('REPLAY_WORKERS') or os.cpu_count() or 1)
+        stage['rows'] = len(processor.races)
     
     # Calculate and store rankings
     print("Calculating rankings...")
-    rankings = processor.calculate_rankings()
-    update_database_from_df(db, DriverEloRanking, rankings)
+    with report.stage('calculate_rankings') as stage:
+        rankings = processor.calculate_rankings()
+        stage['rows'] = len(rankings)
+    with report.stage('write_rankings') as stage:
+        update_database_from_df(db, DriverEloRanking, rankings)
+        stage['rows'] = len(rankings)
     
     # Store app statistics
     print("Storing app statistics...")
-    stats_data = [
-        ('drivers_count', len(rankings)),
-        ('years_covered', int(rankings['Last Year'].max() - rankings['First Year'].min())),
-        ('races_count', len(processor.races)),
-        ('data_points', len(rankings) * len(rankings.columns))
-    ]
-    
-    for key, value in stats_data:
-        stat = AppStats.query.filter_by(stat_key=key).first()
-        if stat:
-            stat.stat_value = value
-            stat.updated_at = datetime.utcnow()
-        else:
-            stat = AppStats(stat_key=key, stat_value=value)
-            db.session.add(stat)
+    with report.stage('write_stats') as stage:
+        stats_data = [
+            ('drivers_count', len(rankings)),
+            ('years_covered', int(rankings['Last Year'].max() - rankings['First Year'].min())),
+            ('races_count', len(processor.races)),
+            ('data_points', len(rankings) * len(rankings.columns))
+        ]
+        
+        # A new data version retires every cached page (stat values are 32-bit integers)
+        version = secrets.randbelow(2 ** 31 - 1) + 1
+        data_version = [(DATA_VERSION_KEY, version)]
+        
+        for key, value in stats_data + data_version:
+            stat = AppStats.query.filter_by(stat_key=key).first()
+            if stat:
+                stat.stat_value = value
+                stat.updated_at = datetime.utcnow()
+            else:
+                stat = AppStats(stat_key=key, stat_value=value)
+                db.session.add(stat)
+        
+        # Store the home page read model
+        print("Storing home page summary...")
+        store_home_summary(dict(stats_data), version)
+        stage['rows'] = len(stats_data) + len(data_version) + 1
     
     # Store ELO progressions for each driver
     print("Storing ELO progressions...")
-    all_progressions = processor.get_all_drivers_elo_progression()
-    
-    # Clear existing progressions
-    DriverEloProgression.query.delete()
-    
-    for _, row in all_progressions.iterrows():
-        progression = DriverEloProgression(
-            f1_driver_id=int(row['driverId']),
-            year=int(row['year']),
-            elo_rating=float(row['elo_rating'])
-        )
-        db.session.add(progression)
-    
-    # Store race results for comparison feature
-    print("Storing race results...")
-    RaceResult.query.delete()
-    DriverTeamHistory.query.delete()
-    
-    # Get race-by-race progression for each driver
-    for driver_id in processor.drivers_dict.keys():
-        driver = processor.drivers_dict[driver_id]
-        if driver.race_count == 0:
-            continue
+    with report.stage('progressions') as stage:
+        all_progressions = processor.get_all_drivers_elo_progression()
         
-        race_progression = processor.get_driver_race_progression(driver_id)
-        if race_progression.empty:
-            continue
+        # Clear existing progressions
+        DriverEloProgression.query.delete()
         
-        # Get team info for each race
-        driver_results = processor.results[processor.results['driverId'] == driver_id].copy()
-        driver_results = pd.merge(
-            driver_results,
-            processor.races[['raceId', 'name', 'date', 'year']],
-            on='raceId'
-        )
-        driver_results = pd.merge(
-            driver_results,
-            processor.constructors[['constructorId', 'name']].rename(columns={'name': 'team'}),
-            on='constructorId'
-        )
-        driver_results = driver_results.sort_values('date')
-        
-        # Store race results
-        for idx, (_, row) in enumerate(race_progression.iterrows()):
-            # Find matching race in driver_results
-            matching_race = driver_results[
-                (driver_results['name'] == row['race_name']) &
-                (driver_results['date'] == row['race_date'])
-            ]
-            team = matching_race['team'].iloc[0] if not matching_race.empty else None
-            
-            result = RaceResult(
-                f1_driver_id=driver_id,
-                race_number=int(row['race_number']),
-                race_name=row['race_name'],
-                race_date=str(row['race_date']),
+        for _, row in all_progressions.iterrows():
+            progression = DriverEloProgression(
+                f1_driver_id=int(row['driverId']),
                 year=int(row['year']),
-                position=int(row['position']) if pd.notna(row['position']) else None,
-                elo_rating=float(row['elo_rating']),
-                team=team
+                elo_rating=float(row['elo_rating'])
             )
-            db.session.add(result)
+            db.session.add(progression)
+        stage['rows'] = len(all_progressions)
+    
+    # Store race results for comparison feature
+    print("Storing race results...")
+    with report.stage('driver_rows') as stage:
+        RaceResult.query.delete()
+        DriverTeamHistory.query.delete()
         
-        # Store team history (aggregated by year)
-        team_years = driver_results.groupby(['year', 'team']).agg({
-            'raceId': 'count'
-        }).reset_index()
+        driver_ids = [
+            driver_id for driver_id, driver in processor.drivers_dict.items()
+            if driver.race_count > 0
+        ]
+        workers = current_app.config.get('POPULATE_WORKERS') or os.cpu_count() or 1
         
-        for _, team_row in team_years.iterrows():
-            # Get average ELO for that year from progression
-            year_elo = race_progression[race_progression['year'] == team_row['year']]['elo_rating']
-            avg_elo = year_elo.mean() if not year_elo.empty else 1500.0
-            
-            team_history = DriverTeamHistory(
-                f1_driver_id=driver_id,
-                team=team_row['team'],
-                year=int(team_row['year']),
-                elo_rating=float(avg_elo)
-            )
-            db.session.add(team_history)
+        # Rows are computed in parallel and written here, in driver order
+        stage['rows'] = 0
+        for race_rows, team_rows in iter_driver_rows(processor, driver_ids, workers):
+            if race_rows:
+                db.session.execute(insert(RaceResult), race_rows)
+            if team_rows:
+                db.session.execute(insert(DriverTeamHistory), team_rows)
+            stage['rows'] += len(race_rows) + len(team_rows)
+    
+    # Store the head-to-head encounter matrix
+    print("Storing head-to-head records...")
+    with report.stage('encounters') as stage:
+        DriverEncounter.query.delete()
+        encounter_rows = processor.encounters.rows()
+        if encounter_rows:
+            db.session.execute(insert(DriverEncounter), encounter_rows)
+        stage['rows'] = len(encounter_rows)
     
-    db.session.commit()
+    with report.stage('commit'):
+        db.session.commit()
+    invalidate_response_cache(current_app)
     print("Database population completed!")
+
+
+def store_home_summary(stats, data_version):
+    """
+    Precompute the home page charts' aggregates and store them with the stats.
+    
+    Aggregates are computed from the stored DriverEloRanking rows, exactly as
+    the home page would compute them. The row is keyed by the AppStats data
+    version written in the same transaction; rows for other versions are
+    removed.
+    
+    Args:
+        stats: App statistics dict shown on the home page
+        data_version: The data version stored with the stats
+    """
+    columns = [
+        DriverEloRanking.driver,
+        DriverEloRanking.elo_rating,
+        DriverEloRanking.reliability_grade,
+        DriverEloRanking.first_year,
+        DriverEloRanking.career_span
+    ]
+    rows = db.session.execute(select(*columns).order_by(DriverEloRanking.id)).all()
+    df = pd.DataFrame(rows, columns=[column.key for column in columns])
+    
+    payload = json.dumps(
+        {'stats': stats, 'charts': summarize_home_charts(df)},
+        sort_keys=True, separators=(',', ':')
+    )
+    data_version = str(data_version)
+    
+    HomeSummary.query.filter(HomeSummary.data_version != data_version).delete()
+    db.session.add(HomeSummary(data_version=data_version, payload=payload))
+
+
+def build_driver_rows(processor, driver_id):
+    """
+    Compute the RaceResult and DriverTeamHistory rows for one driver.
+    
+    Only reads from the processor, so it can run in a worker process
+    against a snapshot of the engine state.
+    
+    Args:
+        processor: F1DataProcessor with races already processed
+        driver_id: Ergast driver id
+        
+    Returns:
+        tuple: (race result rows, team history rows) as lists of dicts
+    """
+    race_progression = processor.get_driver_race_progression(driver_id)
+    if race_progression.empty:
+        return [], []
+    
+    # Get team info for each race
+    driver_results = processor.results[processor.results['driverId'] == driver_id].copy()
+    driver_results = pd.merge(
+        driver_results,
+        processor.races[['raceId', 'name', 'date', 'year']],
+        on='raceId'
+    )
+    driver_results = pd.merge(
+        driver_results,
+        processor.constructors[['constructorId', 'name']].rename(columns={'name': 'team'}),
+        on='constructorId'
+    )
+    driver_results = driver_results.sort_values('date')
+    
+    # First team listed for each (race name, date), in date order
+    race_teams = {}
+    for name, date, team in zip(driver_results['name'], driver_results['date'], driver_results['team']):
+        race_teams.setdefault((name, date), team)
+    
+    race_rows = [
+        {
+            'f1_driver_id': int(driver_id),
+            'race_number': int(race_number),
+            'race_name': race_name,
+            'race_date': str(race_date),
+            'year': int(year),
+            'position': int(position) if pd.notna(position) else None,
+            'elo_rating': float(elo_rating),
+            'team': race_teams.get((race_name, race_date))
+        }
+        for race_number, race_name, race_date, year, position, elo_rating in zip(
+            race_progression['race_number'],
+            race_progression['race_name'],
+            race_progression['race_date'],
+            race_progression['year'],
+            race_progression['position'],
+            race_progression['elo_rating']
+        )
+    ]
+    
+    # Team history aggregated by year, with the average ELO for that year
+    yearly_elo = {
+        year: ratings.mean()
+        for year, ratings in race_progression.groupby('year')['elo_rating']
+    }
+    team_years = driver_results.groupby(['year', 'team']).size().reset_index()
+    team_rows = [
+        {
+            'f1_driver_id': int(driver_id),
+            'team': team,
+            'year': int(year),
+            'elo_rating': float(yearly_elo.get(year, 1500.0))
+        }
+        for year, team in zip(team_years['year'], team_years['team'])
+    ]
+    
+    return race_rows, team_rows
+
+
+# Engine snapshot shared by the row-building worker processes
+_row_snapshot = None
+
+
+def _init_row_worker(snapshot):
+    """Install the read-only engine snapshot in a worker process."""
+    global _row_snapshot
+    _row_snapshot = snapshot
+
+
+def _build_shard(driver_ids):
+    """Build the rows for a shard of drivers. Runs inside a worker process."""
+    race_rows, team_rows = [], []
+    for driver_id in driver_ids:
+        driver_race_rows, driver_team_rows = build_driver_rows(_row_snapshot, driver_id)
+        race_rows.extend(driver_race_rows)
+        team_rows.extend(driver_team_rows)
+    return race_rows, team_rows
+
+
+def iter_driver_rows(processor, driver_ids, workers=1, shard_size=20):
+    """
+    Yield (race rows, team rows) batches for the given drivers, in order.
+    
+    Drivers are split into contiguous shards. With more than one worker the
+    shards are built in a process pool from a read-only snapshot of the
+    processor (inherited copy-on-write where fork is available) and streamed
+    back in shard order, so the output is identical to the serial path.
+    
+    Args:
+        processor: F1DataProcessor with races already processed
+        driver_ids: Driver ids in output order
+        workers: Number of worker processes; 1 builds rows in this process
+        shard_size: Drivers per shard
+    """
+    shards = [driver_ids[i:i + shard_size] for i in range(0, len(driver_ids), shard_size)]
+    snapshot = processor.read_snapshot()
+    
+    if workers <= 1 or len(shards) <= 1:
+        _init_row_worker(snapshot)
+        for shard in shards:
+            yield _build_shard(shard)
+        return
+    
+    start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+    context = multiprocessing.get_context(start_method)
+    with context.Pool(min(workers, len(shards)), initializer=_init_row_worker, initargs=(snapshot,)) as pool:
+        yield from pool.imap(_build_shard, shards)
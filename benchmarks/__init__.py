@@ -0,0 +1,8 @@
+"""
+Microbenchmarks for the ELO engine, chart builders and database pipeline.
+
+Run all benchmarks and write a JSON report:
+    python -m benchmarks
+
+See `python -m benchmarks --help` for filtering and baseline comparison.
+"""
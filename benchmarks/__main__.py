@@ -0,0 +1,79 @@
+"""
+Command-line entry point for the benchmark suite.
+
+Usage:
+    python -m benchmarks [-k PATTERN ...] [--repeat N] [--output FILE]
+                         [--compare BASELINE.json] [--list]
+"""
+import argparse
+import importlib
+import json
+import os
+import pkgutil
+import sys
+
+from benchmarks.harness import (
+    build_report,
+    default_report_path,
+    format_results,
+    get_benchmarks,
+    run_benchmark,
+    write_report,
+)
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+_PROJECT_ROOT = os.path.dirname(_PACKAGE_DIR)
+
+
+def load_benchmark_modules():
+    """Import every benchmarks/bench_*.py module so its benchmarks register."""
+    for module in pkgutil.iter_modules([_PACKAGE_DIR]):
+        if module.name.startswith('bench_'):
+            importlib.import_module(f'benchmarks.{module.name}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="Run microbenchmarks.")
+    parser.add_argument('-k', dest='patterns', action='append',
+                        help="Only run benchmarks whose name contains PATTERN (repeatable)")
+    parser.add_argument('--repeat', type=int, default=None,
+                        help="Override the number of timed repetitions")
+    parser.add_argument('--output', default=None,
+                        help="Report path (default: benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument('--compare', default=None,
+                        help="Baseline report to compare median times against")
+    parser.add_argument('--list', action='store_true', help="List benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    if _PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, _PROJECT_ROOT)
+    load_benchmark_modules()
+    benchmarks = get_benchmarks(args.patterns)
+
+    if args.list:
+        for bench in benchmarks:
+            print(f"{bench.name:<45} {bench.description}")
+        return 0
+
+    results = []
+    for bench in benchmarks:
+        print(f"Running {bench.name}...", flush=True)
+        results.append(run_benchmark(bench, args.repeat))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    report = build_report(results)
+    path = args.output or default_report_path(report)
+    write_report(report, path)
+
+    print()
+    print(format_results(results, baseline))
+    print(f"\nReport written to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Benchmarks for the chart builders in DriverVisualizationUtils.
+
+Chart inputs are derived once from a processed engine so the benchmarks do not
+need a seeded database. Each chart has a 'build' benchmark (figure
+construction only) and an 'html' benchmark (construction plus to_html without
+the embedded plotly.js bundle). The home page charts are built from the
+precomputed summaries stored at seed time; 'charts.summarize.home' times
+producing those summaries.
+"""
+from types import SimpleNamespace
+
+import pandas as pd
+
+from benchmarks.bench_core import processed_processor
+from benchmarks.harness import benchmark
+
+_inputs = None
+
+
+def _team_history(processor, driver_id, race_progression):
+    """Per-year team rows with average ELO, as stored in DriverTeamHistory."""
+    results = processor.results[processor.results['driverId'] == driver_id]
+    results = pd.merge(results, processor.races[['raceId', 'year']], on='raceId')
+    results = pd.merge(
+        results,
+        processor.constructors[['constructorId', 'name']].rename(columns={'name': 'team'}),
+        on='constructorId'
+    )
+    team_years = results.groupby(['year', 'team']).size().reset_index(name='races')
+    yearly_elo = race_progression.groupby('year')['elo_rating'].mean()
+    team_years['elo_rating'] = team_years['year'].map(yearly_elo).fillna(1500.0)
+    team_years['driverId'] = driver_id
+    return team_years[['year', 'team', 'elo_rating', 'driverId']]
+
+
+def chart_inputs():
+    """Build (and cache) representative inputs for every chart method."""
+    global _inputs
+    if _inputs is not None:
+        return _inputs
+
+    from utils.database import COLUMN_MAPPING
+    from utils.visualization import summarize_home_charts
+
+    processor = processed_processor()
+    rankings = processor.calculate_rankings().rename(columns=COLUMN_MAPPING)
+
+    # Longest careers give the heaviest driver-page and comparison charts
+    longest = sorted(
+        (d for d in processor.drivers_dict.values() if d.race_count > 0),
+        key=lambda d: d.race_count, reverse=True
+    )[:3]
+    lead = longest[0]
+    lead_row = rankings[rankings['f1_driver_id'] == lead.driver_id].iloc[0]
+
+    race_progressions = []
+    for driver in longest:
+        progression = processor.get_driver_race_progression(driver.driver_id).copy()
+        progression['Driver'] = rankings.loc[rankings['f1_driver_id'] == driver.driver_id, 'driver'].iloc[0]
+        race_progressions.append(progression)
+
+    _inputs = SimpleNamespace(
+        rankings=rankings,
+        home=summarize_home_charts(rankings),
+        driver_name=lead_row['driver'],
+        driver=SimpleNamespace(**lead_row.to_dict()),
+        elo_progression=processor.get_driver_elo_progression(lead.driver_id),
+        team_data=_team_history(processor, lead.driver_id, race_progressions[0]),
+        comparison=pd.concat(race_progressions, ignore_index=True)
+    )
+    return _inputs
+
+
+def _chart_calls(viz, inputs):
+    """Map chart names to zero-argument callables building that chart."""
+    return {
+        'top_drivers': lambda: viz.create_top_drivers_chart(inputs.home['top_drivers']),
+        'era_trends': lambda: viz.create_era_trends_chart(inputs.home['era_trends']),
+        'reliability_distribution': lambda: viz.create_reliability_distribution_chart(
+            inputs.home['reliability_distribution']),
+        'career_longevity': lambda: viz.create_career_longevity_chart(inputs.home['career_longevity']),
+        'elo_history': lambda: viz.create_elo_history_chart(inputs.elo_progression, inputs.driver_name),
+        'team_elo': lambda: viz.create_team_elo_chart(inputs.team_data, inputs.driver_name),
+        'era_performance': lambda: viz.create_era_performance_chart(inputs.elo_progression),
+        'confidence': lambda: viz.create_confidence_chart(inputs.driver),
+        'comparison': lambda: viz.create_comparison_chart(inputs.comparison),
+    }
+
+
+# Repetitions per timed sample; single chart builds are too fast to time alone
+CHART_LOOPS = 20
+
+
+def _register(chart_name):
+    def setup():
+        from utils.visualization import DriverVisualizationUtils
+        viz = DriverVisualizationUtils(max_points=150)
+        return _chart_calls(viz, chart_inputs())[chart_name]
+
+    def build(make_chart):
+        for _ in range(CHART_LOOPS):
+            make_chart()
+        return {'loops': CHART_LOOPS}
+
+    def html(make_chart):
+        for _ in range(CHART_LOOPS):
+            make_chart().to_html(full_html=False, include_plotlyjs=False)
+        return {'loops': CHART_LOOPS}
+
+    build.__doc__ = f"Build the {chart_name} chart {CHART_LOOPS} times."
+    html.__doc__ = f"Build and serialize the {chart_name} chart {CHART_LOOPS} times."
+    benchmark(f'charts.build.{chart_name}', setup=setup)(build)
+    benchmark(f'charts.html.{chart_name}', setup=setup)(html)
+
+
+for _name in ('top_drivers', 'era_trends', 'reliability_distribution', 'career_longevity',
+              'elo_history', 'team_elo', 'era_performance', 'confidence', 'comparison'):
+    _register(_name)
+
+
+@benchmark('charts.summarize.home', setup=lambda: chart_inputs().rankings)
+def summarize_home(rankings):
+    """Aggregate the rankings for the four home page charts, as done at seed time."""
+    from utils.visualization import summarize_home_charts
+    for _ in range(CHART_LOOPS):
+        summarize_home_charts(rankings)
+    return {'loops': CHART_LOOPS}
@@ -0,0 +1,59 @@
+"""
+Connection checkout overhead for each database connection mode.
+
+Each benchmark checks out a connection and runs 'SELECT 1' repeatedly using
+the engine options from config.get_engine_options. Set BENCH_CONNECTION_URL
+to measure against a real (e.g. local PostgreSQL) server; otherwise a
+temporary SQLite file stands in, which shows pool and pre-ping overhead but
+not network round trips.
+"""
+import os
+import tempfile
+
+from benchmarks.harness import benchmark
+
+# Checkouts per timed sample
+CHECKOUTS = 200
+
+_database_url = None
+
+
+def connection_url():
+    """Database URL for the connection benchmarks."""
+    global _database_url
+    if _database_url is None:
+        _database_url = os.environ.get('BENCH_CONNECTION_URL') or (
+            'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='f1elo-bench-'), 'connections.db')
+        )
+    return _database_url
+
+
+def _register(name, mode, pre_ping=True):
+    def setup():
+        from sqlalchemy import create_engine, text
+        from config import get_engine_options
+
+        options = get_engine_options(connection_url(), mode=mode)
+        if mode == 'pooled':
+            options['pool_pre_ping'] = pre_ping
+        engine = create_engine(connection_url(), **options)
+        # Connect once so dialect initialization is not part of the timing
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+        return engine
+
+    def run(engine):
+        from sqlalchemy import text
+        for _ in range(CHECKOUTS):
+            with engine.connect() as conn:
+                conn.execute(text('SELECT 1'))
+        engine.dispose()
+        return {'checkouts': CHECKOUTS, 'url': engine.url.render_as_string(hide_password=True)}
+
+    run.__doc__ = f"{CHECKOUTS} checkouts + SELECT 1 in {name} mode."
+    benchmark(f'connections.{name}', setup=setup)(run)
+
+
+_register('pooled', 'pooled')
+_register('pooled_no_ping', 'pooled', pre_ping=False)
+_register('serverless', 'serverless')
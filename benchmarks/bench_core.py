@@ -0,0 +1,116 @@
+"""
+Benchmarks for the core engine and the database population pipeline.
+"""
+import contextlib
+import io
+
+from benchmarks.harness import benchmark
+
+# Number of drivers sampled for the per-driver progression benchmark
+PROGRESSION_SAMPLE_SIZE = 25
+
+# Worker processes for the parallel replay benchmark
+PARALLEL_REPLAY_WORKERS = 4
+
+_processed = None
+
+
+def fresh_processor(pairing='teammates'):
+    """A new processor with CSV data loaded but no races processed."""
+    from core import F1DataProcessor
+    processor = F1DataProcessor(pairing=pairing)
+    processor.load_data()
+    return processor
+
+
+def processed_processor():
+    """A processor with all races processed, shared between benchmarks."""
+    global _processed
+    if _processed is None:
+        _processed = fresh_processor()
+        _processed.process_races()
+    return _processed
+
+
+def sqlite_app_context():
+    """An app context bound to an empty in-memory SQLite database."""
+    from app import create_app, db
+    from config import TestingConfig
+
+    app = create_app(TestingConfig)
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+    return ctx
+
+
+@benchmark('core.load_data', repeat=3)
+def bench_load_data():
+    """Parse all CSV files and build driver objects."""
+    fresh_processor()
+
+
+@benchmark('core.process_races', setup=fresh_processor, repeat=3)
+def bench_process_races(processor):
+    """Replay every race and apply teammate ELO updates."""
+    processor.process_races()
+
+
+@benchmark('core.process_races_parallel', setup=fresh_processor, repeat=3)
+def bench_process_races_parallel(processor):
+    """Replay each season's independent teammate components in a process pool."""
+    processor.process_races(workers=PARALLEL_REPLAY_WORKERS)
+    return {'workers': PARALLEL_REPLAY_WORKERS}
+
+
+@benchmark('core.process_races_full_field', setup=lambda: fresh_processor('full_field'), repeat=3)
+def bench_process_races_full_field(processor):
+    """Replay every race comparing all pairs of starters, one matrix update per race."""
+    processor.process_races()
+    return {'drivers_rated': sum(1 for d in processor.drivers_dict.values() if d.rating_history)}
+
+
+@benchmark('core.build_encounters', setup=processed_processor)
+def bench_build_encounters(processor):
+    """Build the head-to-head encounter matrix from the replayed races."""
+    encounters = processor._build_encounters()
+    return {'pairs': len(encounters)}
+
+
+@benchmark('core.calculate_rankings', setup=processed_processor)
+def bench_calculate_rankings(processor):
+    """Build the final rankings DataFrame."""
+    rankings = processor.calculate_rankings()
+    return {'drivers': len(rankings)}
+
+
+@benchmark('core.get_all_drivers_elo_progression', setup=processed_processor)
+def bench_all_drivers_elo_progression(processor):
+    """Build end-of-year ELO progressions for every driver."""
+    progression = processor.get_all_drivers_elo_progression()
+    return {'rows': len(progression)}
+
+
+@benchmark('core.get_driver_race_progression', setup=processed_processor)
+def bench_driver_race_progression(processor):
+    """Build race-by-race progressions for a fixed sample of drivers."""
+    driver_ids = sorted(d.driver_id for d in processor.drivers_dict.values() if d.race_count > 0)
+    step = max(1, len(driver_ids) // PROGRESSION_SAMPLE_SIZE)
+    sample = driver_ids[::step][:PROGRESSION_SAMPLE_SIZE]
+    rows = 0
+    for driver_id in sample:
+        rows += len(processor.get_driver_race_progression(driver_id))
+    return {'drivers': len(sample), 'rows': rows}
+
+
+@benchmark('pipeline.populate_database', setup=sqlite_app_context, repeat=1)
+def bench_populate_database(ctx):
+    """Run the full populate_database pipeline against in-memory SQLite."""
+    from app.services import populate_database
+    from app.models import RaceResult
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            populate_database()
+        return {'race_results': RaceResult.query.count()}
+    finally:
+        ctx.pop()
@@ -0,0 +1,133 @@
+"""
+End-to-end route benchmarks through the Flask test client.
+
+The routes need a populated database. Set BENCH_DATABASE_URL to an already
+seeded database to use it directly; otherwise a temporary SQLite database is
+populated once per run (about half a minute). Each benchmark records the
+number of SQL statements per request as extra result data, and the harness
+records peak Python memory, so per-route allocation can be compared across
+commits alongside latency.
+
+The routes.latency.* benchmarks issue LATENCY_REQUESTS requests and report
+p50/p95 per-request latency. Set BENCH_SQL_LATENCY_MS to add a simulated
+network round trip to every statement (a sleep, which releases the GIL as a
+driver waiting on a socket does) when no remote database is at hand. Set
+RESPONSE_CACHE_ENABLED=true to serve pages from the response cache (in memory
+only); all but the first request are then cache hits.
+"""
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.harness import benchmark
+
+# Requests per timed sample
+ROUTE_LOOPS = 3
+
+# Requests per sample for the p50/p95 latency benchmarks
+LATENCY_REQUESTS = 40
+
+_client = None
+
+
+def seeded_client():
+    """A test client bound to a populated database, shared between benchmarks."""
+    global _client
+    if _client is not None:
+        return _client
+
+    from sqlalchemy import event
+
+    from app import create_app, db
+    from app.services import populate_database
+    from config import TestingConfig
+
+    class RouteBenchmarkConfig(TestingConfig):
+        METRICS_ENABLED = False
+        QUERY_WORKERS = int(os.environ.get('QUERY_WORKERS', 4))
+        RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'false').lower() == 'true'
+        RESPONSE_CACHE_DIR = ''
+        SQLALCHEMY_DATABASE_URI = os.environ.get('BENCH_DATABASE_URL') or (
+            'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='f1elo-bench-'), 'f1.db')
+        )
+
+    app = create_app(RouteBenchmarkConfig)
+    ctx = app.app_context()
+    ctx.push()
+    if not os.environ.get('BENCH_DATABASE_URL'):
+        db.create_all()
+        with contextlib.redirect_stdout(io.StringIO()):
+            populate_database()
+
+    client = app.test_client()
+    client.statements = 0
+    latency = float(os.environ.get('BENCH_SQL_LATENCY_MS', 0)) / 1000
+
+    def count_statement(*args):
+        client.statements += 1
+        if latency:
+            time.sleep(latency)
+
+    event.listen(db.engine, 'before_cursor_execute', count_statement)
+    _client = client
+    return _client
+
+
+def _register(name, url):
+    def run(client):
+        client.statements = 0
+        for _ in range(ROUTE_LOOPS):
+            response = client.get(url)
+        return {
+            'loops': ROUTE_LOOPS,
+            'status': response.status_code,
+            'sql_statements': client.statements // ROUTE_LOOPS
+        }
+
+    run.__doc__ = f"GET {url} {ROUTE_LOOPS} times."
+    benchmark(f'routes.{name}', setup=seeded_client, repeat=3)(run)
+
+
+def _register_latency(name, url):
+    def run(client):
+        times = []
+        for _ in range(LATENCY_REQUESTS):
+            start = time.perf_counter()
+            response = client.get(url)
+            times.append(time.perf_counter() - start)
+        cut_points = statistics.quantiles(times, n=20)
+        return {
+            'requests': LATENCY_REQUESTS,
+            'status': response.status_code,
+            'p50_ms': round(statistics.median(times) * 1000, 2),
+            'p95_ms': round(cut_points[18] * 1000, 2),
+            'sql_latency_ms': float(os.environ.get('BENCH_SQL_LATENCY_MS', 0))
+        }
+
+    run.__doc__ = f"p50/p95 of {LATENCY_REQUESTS} GETs of {url}."
+    benchmark(f'routes.latency.{name}', setup=seeded_client, repeat=1)(run)
+
+
+for _name, _url in (
+    ('home', '/'),
+    ('rankings', '/rankings'),
+    ('rankings_filtered', '/rankings?reliability=A%2B&min_elo=1600'),
+    ('driver_profile', '/driver/1'),
+    ('driver_profile_long_career', '/driver/5'),
+    ('compare', '/compare?drivers=1&drivers=5&drivers=20'),
+    ('search', '/search?q=ham'),
+    ('api_driver_races', '/api/drivers/1/races'),
+    ('api_h2h', '/api/h2h?a=1&b=5'),
+):
+    _register(_name, _url)
+
+for _name, _url in (
+    ('home', '/'),
+    ('rankings', '/rankings'),
+    ('driver_profile', '/driver/1'),
+    ('driver_profile_long_career', '/driver/5'),
+):
+    _register_latency(_name, _url)
@@ -0,0 +1,188 @@
+"""
+Benchmark registry, runner and result files.
+
+Benchmarks are plain functions registered with the @benchmark decorator. An
+optional setup callable prepares fresh state for every repetition outside the
+timed region. Each benchmark is timed over several repetitions and then run
+once more under tracemalloc to record peak Python memory, so the tracing
+overhead never leaks into the timings.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_REGISTRY = {}
+
+
+class Benchmark:
+    """A registered benchmark."""
+
+    def __init__(self, name, func, setup=None, repeat=5, description=''):
+        self.name = name
+        self.func = func
+        self.setup = setup
+        self.repeat = repeat
+        self.description = description
+
+
+class BenchmarkResult:
+    """Timing and memory measurements for one benchmark."""
+
+    def __init__(self, name, repeat):
+        self.name = name
+        self.repeat = repeat
+        self.times = []
+        self.peak_memory_bytes = 0
+        self.extra = {}
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'repeat': self.repeat,
+            'min_s': min(self.times),
+            'median_s': statistics.median(self.times),
+            'mean_s': statistics.mean(self.times),
+            'stdev_s': statistics.stdev(self.times) if len(self.times) > 1 else 0.0,
+            'times_s': self.times,
+            'peak_memory_bytes': self.peak_memory_bytes,
+            'extra': self.extra
+        }
+
+
+def benchmark(name, setup=None, repeat=5):
+    """
+    Register a benchmark function.
+
+    Args:
+        name: Unique dotted name, e.g. 'core.process_races'
+        setup: Callable returning the argument passed to the benchmark.
+               Called before every repetition, outside the timed region.
+        repeat: Default number of timed repetitions
+
+    The benchmark may return a dict, which is stored as extra result data.
+    """
+    def decorator(func):
+        _REGISTRY[name] = Benchmark(
+            name=name,
+            func=func,
+            setup=setup,
+            repeat=repeat,
+            description=(func.__doc__ or '').strip().split('\n')[0]
+        )
+        return func
+    return decorator
+
+
+def get_benchmarks(patterns=None):
+    """Return registered benchmarks whose names contain any of the given patterns."""
+    benchmarks = sorted(_REGISTRY.values(), key=lambda b: b.name)
+    if not patterns:
+        return benchmarks
+    return [b for b in benchmarks if any(p in b.name for p in patterns)]
+
+
+def _call(bench):
+    args = () if bench.setup is None else (bench.setup(),)
+    start = time.perf_counter()
+    extra = bench.func(*args)
+    return time.perf_counter() - start, extra
+
+
+def run_benchmark(bench, repeat=None):
+    """
+    Run a benchmark and collect its timings and peak memory.
+
+    Args:
+        bench: Benchmark to run
+        repeat: Number of timed repetitions. Defaults to the benchmark's own.
+
+    Returns:
+        BenchmarkResult
+    """
+    repeat = repeat or bench.repeat
+    result = BenchmarkResult(name=bench.name, repeat=repeat)
+    for _ in range(repeat):
+        elapsed, extra = _call(bench)
+        result.times.append(elapsed)
+        if isinstance(extra, dict):
+            result.extra = extra
+
+    args = () if bench.setup is None else (bench.setup(),)
+    tracemalloc.start()
+    try:
+        bench.func(*args)
+        result.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=_PROJECT_ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def build_report(results):
+    """Build the machine-readable report for a set of results."""
+    return {
+        'commit': _git_commit(),
+        'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'results': {r.name: r.to_dict() for r in results}
+    }
+
+
+def write_report(report, path):
+    """Write a report to JSON, creating parent directories as needed."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def default_report_path(report):
+    """Default location for a report: benchmarks/results/<commit>-<timestamp>.json."""
+    stamp = report['timestamp'].replace(':', '').replace('-', '')
+    return os.path.join(_PROJECT_ROOT, 'benchmarks', 'results', f"{report['commit']}-{stamp}.json")
+
+
+def format_results(results, baseline=None):
+    """
+    Format results as a text table, optionally comparing with a baseline report.
+
+    Args:
+        results: List of BenchmarkResult
+        baseline: Previously written report dict to compare medians against
+
+    Returns:
+        str: The formatted table
+    """
+    baseline_results = (baseline or {}).get('results', {})
+    header = f"{'Benchmark':<45} {'median':>10} {'min':>10} {'peak mem':>10}"
+    if baseline_results:
+        header += f" {'vs base':>9}"
+    lines = [header, '-' * len(header)]
+    for r in results:
+        d = r.to_dict()
+        line = (f"{r.name:<45} {d['median_s'] * 1000:>8.1f}ms {d['min_s'] * 1000:>8.1f}ms "
+                f"{r.peak_memory_bytes / 1_048_576:>8.1f}MB")
+        base = baseline_results.get(r.name)
+        if base:
+            line += f" {d['median_s'] / base['median_s']:>8.2f}x"
+        elif baseline_results:
+            line += f" {'new':>9}"
+        lines.append(line)
+    return '\n'.join(lines)
@@ -0,0 +1,156 @@
+"""
+Script to check the serverless cold-start budget.
+
+Each run starts a fresh interpreter with `python -X importtime`, imports the
+Vercel entry point (api/index.py) and serves one light request, exactly as a
+cold function invocation would. The script prints a summary of the slowest
+imports and exits non-zero when the cold start goes over budget or when a
+module that should be deferred to the routes needing it (pandas, NumPy,
+Plotly) is imported at startup.
+
+Budget (median over the runs):
+    - import of api/index.py, including create_app():  1000 ms
+    - first request (connection warm-up and schema check): 500 ms
+    - pandas, numpy and plotly must not be imported before the first chart page
+
+Usage:
+    python check_cold_start.py [--runs N] [--top N] [--budget-ms MS]
+                               [--first-request-budget-ms MS] [--database-url URL]
+
+Without --database-url (or DATABASE_URL) a temporary SQLite database is used.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+_PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_BUDGET_MS = 1000
+FIRST_REQUEST_BUDGET_MS = 500
+DEFERRED_MODULES = ('pandas', 'numpy', 'plotly')
+
+# Runs inside the child interpreter; prints its timings as JSON on stdout
+_COLD_START_CODE = '''
+import importlib.util, json, sys, time
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('index', 'api/index.py')
+index = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(index)
+imported = time.perf_counter()
+loaded = sorted(m for m in {deferred} if m in sys.modules)
+response = index.app.test_client().get('/methodology')
+done = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'first_request_ms': (done - imported) * 1000,
+    'status': response.status_code,
+    'deferred_loaded': loaded
+}}))
+'''.format(deferred=repr(DEFERRED_MODULES))
+
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        list: (cumulative_us, self_us, module, depth) per imported module
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((int(cumulative_us), int(self_us), name.strip(), depth))
+    return imports
+
+
+def run_cold_start(database_url):
+    """Run one cold start in a fresh interpreter and return (timings, imports)."""
+    env = dict(os.environ, DATABASE_URL=database_url, FLASK_ENV='production')
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _COLD_START_CODE],
+        cwd=_PROJECT_ROOT, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Cold start failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1]), parse_importtime(proc.stderr)
+
+
+def format_import_summary(imports, top):
+    """Slowest imports by cumulative time, and self time per top-level package."""
+    lines = [f"{'cumulative':>12} {'self':>10}  module", '-' * 50]
+    for cumulative_us, self_us, name, depth in sorted(imports, reverse=True)[:top]:
+        lines.append(f"{cumulative_us / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {'  ' * depth}{name}")
+
+    packages = {}
+    for _, self_us, name, _ in imports:
+        package = name.split('.')[0]
+        packages[package] = packages.get(package, 0) + self_us
+    lines += ['', f"{'self total':>12}  package", '-' * 50]
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"{self_us / 1000:>10.1f}ms  {package}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the serverless cold-start budget.")
+    parser.add_argument('--runs', type=int, default=3, help="Cold starts to run (default: 3)")
+    parser.add_argument('--top', type=int, default=15, help="Imports to list in the summary")
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS,
+                        help=f"Import budget in ms (default: {IMPORT_BUDGET_MS})")
+    parser.add_argument('--first-request-budget-ms', type=float, default=FIRST_REQUEST_BUDGET_MS,
+                        help=f"First request budget in ms (default: {FIRST_REQUEST_BUDGET_MS})")
+    parser.add_argument('--database-url', default=os.environ.get('DATABASE_URL'),
+                        help="Database to connect to (default: DATABASE_URL or a temporary SQLite file)")
+    args = parser.parse_args()
+
+    database_url = args.database_url or (
+        'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='f1elo-coldstart-'), 'f1.db')
+    )
+
+    # One untimed run so a fresh database gets its schema and bytecode is compiled
+    run_cold_start(database_url)
+
+    results = []
+    imports = None
+    for _ in range(args.runs):
+        timings, imports = run_cold_start(database_url)
+        results.append(timings)
+
+    import_ms = statistics.median(r['import_ms'] for r in results)
+    first_request_ms = statistics.median(r['first_request_ms'] for r in results)
+    deferred_loaded = sorted({m for r in results for m in r['deferred_loaded']})
+
+    print(format_import_summary(imports, args.top))
+    print()
+    print(f"Import of api/index.py: {import_ms:>7.1f}ms (budget {args.budget_ms:.0f}ms)")
+    print(f"First request:          {first_request_ms:>7.1f}ms (budget {args.first_request_budget_ms:.0f}ms)")
+
+    failures = []
+    if import_ms > args.budget_ms:
+        failures.append(f"import took {import_ms:.0f}ms, over the {args.budget_ms:.0f}ms budget")
+    if first_request_ms > args.first_request_budget_ms:
+        failures.append(f"first request took {first_request_ms:.0f}ms, "
+                        f"over the {args.first_request_budget_ms:.0f}ms budget")
+    if any(r['status'] != 200 for r in results):
+        failures.append("first request did not return 200")
+    if deferred_loaded:
+        failures.append(f"imported at startup: {', '.join(deferred_loaded)}")
+
+    if failures:
+        print("\nCold-start check FAILED:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\nCold-start check passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,9 @@
 import os
+import tempfile
 from dotenv import load_dotenv
+from sqlalchemy.pool import NullPool
+
+from utils.snapshot import snapshot_uri
 
 load_dotenv()
 
@@ -15,6 +19,62 @@ def get_database_url():
     return database_url
 
 
+def resolve_connection_mode(mode=None):
+    """
+    Resolve the database connection mode.
+    
+    'pooled' keeps a QueuePool with pre-ping, for long-running servers.
+    'serverless' opens a fresh connection per checkout (NullPool), for
+    short-lived functions connecting through a pooler endpoint such as Neon's.
+    'auto' picks 'serverless' on Vercel and 'pooled' everywhere else.
+    """
+    mode = (mode or os.environ.get('DB_CONNECTION_MODE', 'auto')).lower()
+    if mode == 'auto':
+        return 'serverless' if os.environ.get('VERCEL') else 'pooled'
+    if mode not in ('pooled', 'serverless'):
+        raise ValueError(f"Unknown DB_CONNECTION_MODE: {mode}")
+    return mode
+
+
+def get_engine_options(database_url, mode=None, statement_timeout_ms=None):
+    """
+    Build SQLAlchemy engine options for a connection mode.
+    
+    Args:
+        database_url: Database URL the engine will connect to
+        mode: 'pooled', 'serverless' or 'auto' (default: DB_CONNECTION_MODE)
+        statement_timeout_ms: Server-side statement timeout for PostgreSQL
+                              (default: DB_STATEMENT_TIMEOUT_MS, 0 disables)
+    
+    Returns:
+        dict: Keyword arguments for create_engine
+    """
+    if resolve_connection_mode(mode) == 'serverless':
+        # The pooler endpoint does the pooling; a frozen function keeps no stale pool
+        options = {'poolclass': NullPool}
+    else:
+        options = {
+            'pool_pre_ping': True,  # Verify connections before use
+            'pool_recycle': 300,    # Recycle connections after 5 minutes
+        }
+    
+    if statement_timeout_ms is None:
+        statement_timeout_ms = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 0))
+    if statement_timeout_ms and database_url.startswith('postgresql'):
+        options['connect_args'] = {'options': f'-c statement_timeout={int(statement_timeout_ms)}'}
+    
+    return options
+
+
+def get_snapshot_path():
+    """Path of the read-only SQLite snapshot from DATABASE_SNAPSHOT, or None."""
+    path = os.environ.get('DATABASE_SNAPSHOT')
+    if not path:
+        return None
+    # Relative paths are relative to the project root, where the snapshot ships
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+
+
 class Config:
     """Base configuration."""
     SECRET_KEY = os.environ.get('FLASK_SECRET_KEY', 'dev-key-change-in-production')
@@ -29,12 +89,86 @@ class Config:
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_USERNAME')
     MAIL_RECIPIENT = os.environ.get('MAIL_RECIPIENT')
+    
+    # Contact form outbox (see app/outbox.py)
+    MAIL_OUTBOX_MODE = os.environ.get('MAIL_OUTBOX_MODE', 'auto')
+    # Bearer token the Vercel cron job sends to /outbox/flush
+    CRON_SECRET = os.environ.get('CRON_SECRET')
+    MAIL_OUTBOX_BATCH_SIZE = int(os.environ.get('MAIL_OUTBOX_BATCH_SIZE', 20))
+    MAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('MAIL_OUTBOX_MAX_ATTEMPTS', 6))
+    MAIL_OUTBOX_RETRY_SECONDS = int(os.environ.get('MAIL_OUTBOX_RETRY_SECONDS', 30))
+    MAIL_OUTBOX_POLL_SECONDS = int(os.environ.get('MAIL_OUTBOX_POLL_SECONDS', 300))
+    
+    # Maximum number of drivers on the comparison page
+    COMPARE_MAX_DRIVERS = int(os.environ.get('COMPARE_MAX_DRIVERS', 6))
+    
+    # Drivers per rankings page, by default and at most (per_page parameter)
+    RANKINGS_PAGE_SIZE = int(os.environ.get('RANKINGS_PAGE_SIZE', 100))
+    RANKINGS_MAX_PAGE_SIZE = int(os.environ.get('RANKINGS_MAX_PAGE_SIZE', 1000))
+    
+    # Stream the rankings page while it renders instead of buffering it
+    RANKINGS_STREAM = os.environ.get('RANKINGS_STREAM', 'false').lower() == 'true'
+    
+    # Compiled templates are cached here across worker restarts ('' disables)
+    JINJA_BYTECODE_CACHE_DIR = os.environ.get(
+        'JINJA_BYTECODE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'f1elo-jinja-cache')
+    )
+    
+    # Target points per series for time-series charts (0 plots every point)
+    CHART_MAX_POINTS = int(os.environ.get('CHART_MAX_POINTS', 150))
+    
+    # Worker processes for building per-driver rows in populate_database (0 = CPU count)
+    POPULATE_WORKERS = int(os.environ.get('POPULATE_WORKERS', 0))
+    
+    # Worker processes for the teammate replay in populate_database (0 = CPU count, 1 = sequential)
+    REPLAY_WORKERS = int(os.environ.get('REPLAY_WORKERS', 0))
+    
+    # Shadow reseeds (--shadow, PostgreSQL): retired table versions kept after a
+    # swap, and the longest wait for table locks per swap attempt
+    RESEED_KEEP_VERSIONS = int(os.environ.get('RESEED_KEEP_VERSIONS', 1))
+    RESEED_LOCK_TIMEOUT_MS = int(os.environ.get('RESEED_LOCK_TIMEOUT_MS', 1000))
+    
+    # ELO pairing in populate_database: 'teammates' or 'full_field'
+    ELO_PAIRING = os.environ.get('ELO_PAIRING', 'teammates')
+    
+    # Metrics collection for the /metrics endpoint
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    
+    # Log SQL statements slower than this many milliseconds (0 disables)
+    DB_SLOW_QUERY_MS = int(os.environ.get('DB_SLOW_QUERY_MS', 500))
+    
+    # Open a database connection on the first request rather than at import
+    DB_WARMUP = os.environ.get('DB_WARMUP', 'true').lower() == 'true'
+    
+    # Threads for running a request's independent queries concurrently (1 disables)
+    QUERY_WORKERS = int(os.environ.get('QUERY_WORKERS', 4))
+    
+    # Serve reads from a read-only SQLite snapshot instead of DATABASE_URL
+    DATABASE_SNAPSHOT = get_snapshot_path()
+    SNAPSHOT_MMAP_SIZE = int(os.environ.get('SNAPSHOT_MMAP_SIZE', 256 * 1024 * 1024))
+    
+    # Cache rendered pages until the next reseed (see app/response_cache.py)
+    RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+    RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 128 * 1024 * 1024))
+    # Directory shared by the workers on a host ('' keeps pages in memory only)
+    RESPONSE_CACHE_DIR = os.environ.get('RESPONSE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'f1elo-response-cache'))
+    RESPONSE_CACHE_DIR_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_DIR_MAX_BYTES', 256 * 1024 * 1024))
+    # Seconds between data version checks
+    RESPONSE_CACHE_VERSION_TTL = float(os.environ.get('RESPONSE_CACHE_VERSION_TTL', 5))
+    
+    # Built in the gunicorn master before fork when preloading (see gunicorn.conf.py)
+    PRELOAD_PAGES = [url for url in os.environ.get('PRELOAD_PAGES', '/,/methodology,/rankings').split(',') if url]
+    PRELOAD_PROCESSOR = os.environ.get('PRELOAD_PROCESSOR', 'false').lower() == 'true'
 
 
 class DevelopmentConfig(Config):
     """Development configuration."""
     DEBUG = True
-    SQLALCHEMY_DATABASE_URI = os.environ.get(
+    
+    # Templates change while developing; opt in to page caching explicitly
+    RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'false').lower() == 'true'
+    
+    SQLALCHEMY_DATABASE_URI = snapshot_uri(Config.DATABASE_SNAPSHOT) if Config.DATABASE_SNAPSHOT else os.environ.get(
         'DATABASE_URL', 
         'sqlite:///f1-driver-elo-rankings.db'
     )
@@ -44,21 +178,27 @@ class ProductionConfig(Config):
     """Production configuration for Vercel + Neon PostgreSQL."""
     DEBUG = False
     
-    # Get Neon PostgreSQL URL
-    SQLALCHEMY_DATABASE_URI = get_database_url() or 'sqlite:///f1-driver-elo-rankings.db'
-    
-    # SQLAlchemy engine options for Neon PostgreSQL
-    # Neon requires SSL and benefits from connection pooling settings
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_pre_ping': True,  # Verify connections before use
-        'pool_recycle': 300,    # Recycle connections after 5 minutes
-    }
+    if Config.DATABASE_SNAPSHOT:
+        # Local read-only snapshot; no network connections to pool
+        SQLALCHEMY_DATABASE_URI = snapshot_uri(Config.DATABASE_SNAPSHOT)
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+    else:
+        # Get Neon PostgreSQL URL
+        SQLALCHEMY_DATABASE_URI = get_database_url() or 'sqlite:///f1-driver-elo-rankings.db'
+        
+        # SQLAlchemy engine options for Neon PostgreSQL, by DB_CONNECTION_MODE
+        SQLALCHEMY_ENGINE_OPTIONS = get_engine_options(SQLALCHEMY_DATABASE_URI)
 
 
 class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    
+    # Every connection to an in-memory database is a separate, empty database
+    QUERY_WORKERS = 1
+    
+    RESPONSE_CACHE_ENABLED = False
 
 
 config = {
@@ -5,11 +5,20 @@ This package contains the domain logic for F1 driver ELO ratings:
 - Driver: Driver entity with rating history
 - EloCalculator: ELO rating calculations
 - ConfidenceCalculator: Confidence interval calculations
+- RatingEngine: Interface for rating systems run alongside ELO
+- Glicko2Engine: Vectorized Glicko-2 ratings
+- EncounterMatrix: Head-to-head records of every pair of drivers
 - F1DataProcessor: Data loading and race processing
 """
 from core.driver import Driver
 from core.elo_calculator import EloCalculator
 from core.confidence_calculator import ConfidenceCalculator
+from core.rating_engine import RaceMatchups, RatingEngine
+from core.glicko2 import Glicko2Engine
+from core.encounters import EncounterMatrix
 from core.data_processor import F1DataProcessor
 
-__all__ = ['Driver', 'EloCalculator', 'ConfidenceCalculator', 'F1DataProcessor']
+__all__ = [
+    'Driver', 'EloCalculator', 'ConfidenceCalculator',
+    'RaceMatchups', 'RatingEngine', 'Glicko2Engine', 'EncounterMatrix', 'F1DataProcessor'
+]
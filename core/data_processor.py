@@ -2,12 +2,26 @@
 F1 data processor for loading and processing race data.
 """
 import os
+import numpy as np
 import pandas as pd
-from itertools import combinations
+from itertools import combinations, groupby
 
 from core.driver import Driver
 from core.elo_calculator import EloCalculator
 from core.confidence_calculator import ConfidenceCalculator
+from core.data_store import DataStore
+from core.encounters import EncounterMatrix
+from core.glicko2 import Glicko2Engine
+from core.parallel_replay import TeammateSeason, UnionFind, replay_seasons
+from core.rating_engine import RaceMatchups
+
+# Pairing modes for process_races
+PAIRING_TEAMMATES = 'teammates'
+PAIRING_FULL_FIELD = 'full_field'
+PAIRING_MODES = (PAIRING_TEAMMATES, PAIRING_FULL_FIELD)
+
+# Status ids counted as a loss against a finisher (accident, collision, spun off)
+PENALIZED_STATUS_IDS = {3, 4, 20}
 
 # Get the project root directory
 _PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -21,15 +35,28 @@ class F1DataProcessor:
     This class handles:
     - Loading CSV data files
     - Processing race results
-    - Calculating pairwise ELO updates for teammates
+    - Calculating pairwise ELO updates for teammates, or for the full field
+    - Running additional rating engines (Glicko-2 by default) in the same pass
     - Generating driver rankings
     """
     
-    def __init__(self):
+    def __init__(self, rating_engines=None, pairing=PAIRING_TEAMMATES):
+        """
+        Args:
+            rating_engines: RatingEngine instances updated alongside ELO in
+                           process_races. Defaults to [Glicko2Engine()].
+            pairing: 'teammates' compares drivers within each constructor;
+                    'full_field' compares every pair of starters in a race.
+        """
+        if pairing not in PAIRING_MODES:
+            raise ValueError(f"Unknown pairing mode {pairing!r}; expected one of {PAIRING_MODES}")
+        self.pairing = pairing
         self.elo_calculator = EloCalculator()
         self.confidence_calculator = ConfidenceCalculator()
+        self.rating_engines = [Glicko2Engine()] if rating_engines is None else rating_engines
         self.drivers_dict = {}
         self.status_mapping = {}
+        self.encounters = None
 
         # Define absolute non-start status IDs
         self.non_start_status_ids = {
@@ -56,19 +83,31 @@ class F1DataProcessor:
         Load all CSV data files.
         
         Args:
-            data_path: Path to directory containing CSV files. 
+            data_path: Path to directory containing CSV files (and the
+                      optional store/ written by ingest.py).
                       Defaults to project's data/ directory.
         """
         if data_path is None:
             data_path = _DEFAULT_DATA_PATH
-        self.circuits = pd.read_csv(f'{data_path}/circuits.csv')
-        self.constructors = pd.read_csv(f'{data_path}/constructors.csv')
-        self.drivers = pd.read_csv(f'{data_path}/drivers.csv')
-        self.qualifying = pd.read_csv(f'{data_path}/qualifying.csv')
-        self.races = pd.read_csv(f'{data_path}/races.csv')
-        self.results = pd.read_csv(f'{data_path}/results.csv')
-        self.sprint_results = pd.read_csv(f'{data_path}/sprint_results.csv')
-        self.status = pd.read_csv(f'{data_path}/status.csv')
+        
+        # Tables ingested into the local store (see ingest.py) are read from
+        # it; anything else from the CSV files
+        store = DataStore(os.path.join(data_path, 'store'))
+        stored_tables = store.read_manifest()['tables']
+        
+        def read_table(name):
+            if name in stored_tables:
+                return store.load_table(name)
+            return pd.read_csv(f'{data_path}/{name}.csv')
+        
+        self.circuits = read_table('circuits')
+        self.constructors = read_table('constructors')
+        self.drivers = read_table('drivers')
+        self.qualifying = read_table('qualifying')
+        self.races = read_table('races')
+        self.results = read_table('results')
+        self.sprint_results = read_table('sprint_results')
+        self.status = read_table('status')
 
         # Exclude Indianapolis 500 races
         self.races = self.races[self.races['name'] != 'Indianapolis 500']
@@ -80,6 +119,21 @@ class F1DataProcessor:
             
         self.status_mapping = dict(zip(self.status['statusId'], self.status['status']))
 
+    def read_snapshot(self):
+        """
+        Return a lightweight copy of the processor for read-only use.
+        
+        The copy shares the race, result, constructor and driver state needed
+        to build per-driver progressions, and drops the tables only used
+        during loading, so it is cheap to hand to worker processes.
+        """
+        snapshot = F1DataProcessor.__new__(F1DataProcessor)
+        snapshot.__dict__.update({
+            key: value for key, value in self.__dict__.items()
+            if key not in ('circuits', 'qualifying', 'sprint_results', 'status', 'encounters')
+        })
+        return snapshot
+
     def get_driver_elo_progression(self, driver_id):
         """Get the ELO rating progression for a specific driver (end-of-year ratings)."""
         driver = self.drivers_dict.get(driver_id)
@@ -118,13 +172,43 @@ class F1DataProcessor:
             return pd.concat(all_progressions, ignore_index=True)
         return pd.DataFrame(columns=['year', 'driverId', 'elo_rating'])
 
-    def process_races(self):
-        """Process all races and update ELO ratings."""
+    def process_races(self, workers=1):
+        """
+        Process all races and update ELO ratings.
+        
+        Each race's teammate outcomes are decided once; ELO is updated pair by
+        pair and the same outcomes are then handed to every rating engine.
+        In full-field mode every pair of starters is compared instead (see
+        _process_races_full_field). Afterwards the head-to-head record of
+        every pair of drivers is collected in self.encounters (see
+        _build_encounters).
+        
+        Args:
+            workers: Worker processes for the teammate replay. With more than
+                    one, each season's independent teammate components are
+                    replayed in parallel (see core.parallel_replay) with
+                    identical results. Full-field mode always runs here.
+        """
+        if self.pairing == PAIRING_FULL_FIELD:
+            self._process_races_full_field()
+        elif workers > 1:
+            replay_seasons(self, *self._index_teammate_seasons(), workers)
+        else:
+            self._process_races_teammates()
+        self.encounters = self._build_encounters()
+
+    def _process_races_teammates(self):
+        """Replay every race comparing teammates, one pair at a time."""
         races_sorted = self.races.sort_values(by=["year", "round"])
         race_results = self.results[['raceId', 'driverId', 'constructorId', 'positionOrder', 'statusId', 'grid', 'position', 'laps']]
 
         # Calculate races per season
         races_per_season = self.races.groupby('year').size()
+        
+        # Engines address drivers by position in drivers_dict
+        driver_index = {driver_id: i for i, driver_id in enumerate(self.drivers_dict)}
+        for engine in self.rating_engines:
+            engine.start(list(self.drivers_dict))
 
         for race_id in races_sorted["raceId"]:
             race_year = races_sorted[races_sorted['raceId'] == race_id]['year'].iloc[0]
@@ -136,14 +220,7 @@ class F1DataProcessor:
                 continue
 
             race_data = race_results[race_results['raceId'] == race_id].copy()
-            race_data['weight'] = 1.0
-
-            # Special handling for shortened races
-            if ((race_year == 1976 and race_name == 'Japanese Grand Prix') or
-                (race_year == 1991 and race_name == 'Australian Grand Prix') or
-                (race_year == 2009 and race_name == 'Malaysian Grand Prix') or
-                (race_year == 2021 and race_name == 'Belgian Grand Prix')):
-                race_data['weight'] = 0.5
+            race_data['weight'] = self._race_weight(race_year, race_name)
 
             # First filter out definite non-starts
             race_data = race_data[~race_data['statusId'].isin(self.non_start_status_ids)]
@@ -167,15 +244,242 @@ class F1DataProcessor:
                     processed_drivers.add(driver_id)
 
             # Do teammate comparisons only where possible
+            index_a, index_b, scores = [], [], []
             for constructor_id, group in race_data.groupby('constructorId'):
                 if len(group) < 2:
                     continue  # Only skips teammate comparison, not race counting
 
                 for row_a, row_b in combinations(group.itertuples(index=False), 2):
-                    self._process_driver_pair(row_a, row_b, race_year, race_id, season_races)
+                    score_a = self._process_driver_pair(row_a, row_b, race_year, race_id, season_races)
+                    if score_a is not None:
+                        index_a.append(driver_index[row_a.driverId])
+                        index_b.append(driver_index[row_b.driverId])
+                        scores.append(score_a)
+
+            if self.rating_engines:
+                matchups = RaceMatchups(
+                    race_id, race_year, race_data['weight'].iloc[0] if len(race_data) else 1.0,
+                    index_a, index_b, scores
+                )
+                for engine in self.rating_engines:
+                    engine.process_race(matchups)
+
+    def _build_encounters(self):
+        """
+        Collect the head-to-head record of every pair of drivers who raced each other.
+        
+        One pass over the indexed starters (the same races and start filters
+        as the replay) with every driver's rating after each race, taken from
+        the rating history: the last update in that race, or the rating the
+        driver carried into it. A driver entered twice in a race counts with
+        their first entry.
+        
+        Returns:
+            EncounterMatrix: Records for every ordered pair of drivers who met
+        """
+        races, starters = self._index_starters()
+        post_race = {
+            driver_id: {race_id: rating for _, race_id, rating in driver.rating_history if race_id is not None}
+            for driver_id, driver in self.drivers_dict.items()
+        }
+        current = {}
+        base_elo = self.elo_calculator.BASE_ELO
+        
+        matrix = EncounterMatrix()
+        for race_id, _, _, start, stop in races:
+            _, first = np.unique(starters['driver_id'][start:stop], return_index=True)
+            entries = start + np.sort(first)
+            driver_ids = starters['driver_id'][entries]
+            
+            ratings = []
+            for driver_id in driver_ids.tolist():
+                rating = post_race[driver_id].get(race_id, current.get(driver_id, base_elo))
+                current[driver_id] = rating
+                ratings.append(rating)
+            
+            matrix.add_race(driver_ids, starters['constructor_id'][entries], starters['position'][entries], ratings)
+        return matrix.finish()
+
+    def _race_weight(self, race_year, race_name):
+        """Weight of a race's comparisons: 0.5 for shortened races, else 1.0."""
+        # Special handling for shortened races
+        if ((race_year == 1976 and race_name == 'Japanese Grand Prix') or
+            (race_year == 1991 and race_name == 'Australian Grand Prix') or
+            (race_year == 2009 and race_name == 'Malaysian Grand Prix') or
+            (race_year == 2021 and race_name == 'Belgian Grand Prix')):
+            return 0.5
+        return 1.0
+
+    def _index_starters(self):
+        """
+        Pre-index the starters of every race for the vectorized replay.
+        
+        Applies the same start filters as the teammate replay (non-starts and
+        zero-lap withdrawals removed) to the whole results table at once and
+        orders the rows chronologically by race.
+        
+        Returns:
+            tuple: (races, starters) where races is a list of (race_id, year,
+            name, start, stop) in replay order and starters is a dict of
+            NumPy arrays whose rows start:stop belong to that race
+        """
+        races_sorted = self.races.sort_values(by=["year", "round"])
+        races_sorted = races_sorted[~races_sorted['raceId'].isin(self.indy_500_race_ids)]
+        
+        results = self.results
+        started = ~results['statusId'].isin(self.non_start_status_ids) & ~(
+            results['statusId'].isin(self.withdrawal_status_ids) & (results['laps'] <= 0)
+        )
+        results = results[started & results['raceId'].isin(races_sorted['raceId'])]
+        
+        # Stable sort keeps the original row order within each race
+        race_order = pd.Series(np.arange(len(races_sorted)), index=races_sorted['raceId'].to_numpy())
+        order_key = race_order.loc[results['raceId']].to_numpy()
+        order = np.argsort(order_key, kind='stable')
+        results = results.iloc[order]
+        order_key = order_key[order]
+        
+        bounds = np.searchsorted(order_key, np.arange(len(races_sorted) + 1))
+        races = [
+            (race_id, year, name, bounds[i], bounds[i + 1])
+            for i, (race_id, year, name) in enumerate(
+                races_sorted[['raceId', 'year', 'name']].itertuples(index=False, name=None)
+            )
+        ]
+        
+        finished_ids = [status_id for status_id, status in self.status_mapping.items() if 'Finished' in status]
+        starters = {
+            'driver_id': results['driverId'].to_numpy(),
+            'constructor_id': results['constructorId'].to_numpy(),
+            'status_id': results['statusId'].to_numpy(),
+            'position': results['positionOrder'].to_numpy(),
+            'penalized': results['statusId'].isin(PENALIZED_STATUS_IDS).to_numpy(),
+            'finished': results['statusId'].isin(finished_ids).to_numpy()
+        }
+        return races, starters
+
+    def _index_teammate_seasons(self):
+        """
+        Split the indexed race stream into seasons of independent teammate components.
+        
+        A union-find over each season's starters joins drivers entered for
+        the same constructor in the same race. Drivers in different
+        components never meet within the season, so their updates can be
+        replayed independently from the state at the start of the season.
+        
+        Returns:
+            tuple: (seasons, starters) where seasons is a list of
+            TeammateSeason in replay order and starters is the starter
+            index from _index_starters
+        """
+        races, starters = self._index_starters()
+        races_per_season = self.races.groupby('year').size()
+        
+        seasons = []
+        for race_year, season in groupby(races, key=lambda race: race[1]):
+            graph = UnionFind()
+            season_races = []
+            for race_id, _, race_name, start, stop in season:
+                teams = {}
+                for driver_id, constructor_id in zip(
+                    starters['driver_id'][start:stop].tolist(),
+                    starters['constructor_id'][start:stop].tolist()
+                ):
+                    graph.add(driver_id)
+                    teammate = teams.setdefault(constructor_id, driver_id)
+                    graph.union(teammate, driver_id)
+                season_races.append((race_id, race_year, self._race_weight(race_year, race_name), start, stop))
+            seasons.append(TeammateSeason(
+                race_year, races_per_season[race_year], season_races, graph.groups()
+            ))
+        return seasons, starters
+
+    def _process_races_full_field(self):
+        """
+        Replay every race comparing each pair of starters, as per-race matrices.
+        
+        Outcomes follow the teammate rules (a penalized retirement loses to a
+        finisher, two penalized retirements are not compared, otherwise the
+        better positionOrder wins). All of a race's updates are computed from
+        the pre-race ratings: each driver moves by K times the race weight
+        times their mean (actual - expected) score over their opponents, so
+        a race moves a rating about as much as one teammate comparison.
+        """
+        races, starters = self._index_starters()
+        races_per_season = self.races.groupby('year').size()
+        
+        driver_ids = list(self.drivers_dict)
+        driver_index = {driver_id: i for i, driver_id in enumerate(driver_ids)}
+        entry_index = np.array([driver_index[d] for d in starters['driver_id']], dtype=np.intp)
+        ratings = np.array([driver.rating for driver in self.drivers_dict.values()], dtype=float)
+        for engine in self.rating_engines:
+            engine.start(driver_ids)
+        
+        for race_id, race_year, race_name, start, stop in races:
+            season_races = races_per_season[race_year]
+            weight = self._race_weight(race_year, race_name)
+            index = entry_index[start:stop]
+            
+            # Increment race count for ALL drivers in this race
+            participants = list(dict.fromkeys(starters['driver_id'][start:stop].tolist()))
+            for driver_id in participants:
+                driver = self.drivers_dict[driver_id]
+                driver.increment_race_count()
+                driver.update_years(race_year)
+            
+            if len(index) < 2:
+                if self.rating_engines:
+                    matchups = RaceMatchups(race_id, race_year, weight, [], [], [])
+                    for engine in self.rating_engines:
+                        engine.process_race(matchups)
+                continue
+            
+            position = starters['position'][start:stop]
+            penalized = starters['penalized'][start:stop]
+            finished = starters['finished'][start:stop]
+            
+            # actual[i, j]: score of entry i against entry j
+            actual = (position[:, np.newaxis] < position[np.newaxis, :]).astype(float)
+            actual[penalized[:, np.newaxis] & finished[np.newaxis, :]] = 0
+            actual[finished[:, np.newaxis] & penalized[np.newaxis, :]] = 1
+            compared = ~(penalized[:, np.newaxis] & penalized[np.newaxis, :])
+            compared &= index[:, np.newaxis] != index[np.newaxis, :]
+            
+            expected = self.elo_calculator.expected_score_matrix(ratings[index])
+            opponents = compared.sum(axis=1)
+            score_delta = np.where(compared, actual - expected, 0).sum(axis=1) / np.maximum(opponents, 1)
+            
+            k_factors = np.array([
+                self.elo_calculator.calculate_k_factor(self.drivers_dict[driver_id].race_count, race_year, season_races)
+                for driver_id in starters['driver_id'][start:stop].tolist()
+            ])
+            rating_delta = np.bincount(index, weights=k_factors * weight * score_delta, minlength=len(ratings))
+            
+            rated = np.unique(index[opponents > 0])
+            ratings[rated] += rating_delta[rated]
+            for i in rated.tolist():
+                driver = self.drivers_dict[driver_ids[i]]
+                driver.set_current_race(race_year, race_id)
+                driver.update_rating(float(ratings[i]))
+            
+            if self.rating_engines:
+                # Each driver's comparisons together count as much as one
+                # teammate comparison, as for ELO above
+                rows, cols = np.nonzero(np.triu(compared, k=1))
+                matchups = RaceMatchups(
+                    race_id, race_year, weight / max(len(participants) - 1, 1),
+                    index[rows], index[cols], actual[rows, cols]
+                )
+                for engine in self.rating_engines:
+                    engine.process_race(matchups)
 
     def _process_driver_pair(self, row_a, row_b, race_year, race_id, season_races):
-        """Process a pairwise ELO update between two teammates."""
+        """
+        Process a pairwise ELO update between two teammates.
+        
+        Returns:
+            int: Score of driver A (1 win, 0 loss), or None if the pair was skipped
+        """
         driver_a = self.drivers_dict[row_a.driverId]
         driver_b = self.drivers_dict[row_b.driverId]
         
@@ -197,16 +501,15 @@ class F1DataProcessor:
         status_a = self.status_mapping[row_a.statusId]
         status_b = self.status_mapping[row_b.statusId]
 
-        penalized_status = {3, 4, 20}
-        is_penalized_a = row_a.statusId in penalized_status
-        is_penalized_b = row_b.statusId in penalized_status
+        is_penalized_a = row_a.statusId in PENALIZED_STATUS_IDS
+        is_penalized_b = row_b.statusId in PENALIZED_STATUS_IDS
 
         if is_penalized_a and 'Finished' in status_b:
             actual_score_a, actual_score_b = 0, 1
         elif is_penalized_b and 'Finished' in status_a:
             actual_score_a, actual_score_b = 1, 0
         elif is_penalized_a and is_penalized_b:
-            return
+            return None
         else:
             actual_score_a = 1 if row_a.positionOrder < row_b.positionOrder else 0
             actual_score_b = 1 - actual_score_a
@@ -223,6 +526,7 @@ class F1DataProcessor:
 
         driver_a.update_rating(new_rating_a)
         driver_b.update_rating(new_rating_b)
+        return actual_score_a
 
     def calculate_rankings(self):
         """Calculate final rankings for all drivers."""
@@ -250,15 +554,16 @@ class F1DataProcessor:
             confidence_score = self.confidence_calculator.calculate_confidence_score(width, max_width, min_width)
             confidence_grade = self.confidence_calculator.get_confidence_grade(confidence_score)
 
-            final_stats.append(
-                driver.to_stats_dict(
-                    self.elo_calculator,
-                    self.confidence_calculator,
-                    self.drivers,
-                    confidence_score,
-                    confidence_grade
-                )
+            stats = driver.to_stats_dict(
+                self.elo_calculator,
+                self.confidence_calculator,
+                self.drivers,
+                confidence_score,
+                confidence_grade
             )
+            for engine in self.rating_engines:
+                stats.update(engine.driver_stats(driver.driver_id))
+            final_stats.append(stats)
 
         rankings_df = pd.DataFrame(final_stats)
         return rankings_df.sort_values('Elo Rating', ascending=False)
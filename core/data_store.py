@@ -0,0 +1,308 @@
+"""
+Compact local store for the Ergast tables, fed by incremental ingestion.
+
+Each table is kept as one gzip-compressed pickled DataFrame with the exact
+dtypes pandas.read_csv gives the original CSV, so F1DataProcessor.load_data
+can read the store instead of reparsing every CSV. New data arrives as delta
+CSVs or a newer full dump and is appended: rows are read in chunks,
+deduplicated by primary key (resultId, raceId, ...), checked against the
+referenced tables (drivers, constructors, status, ...) and only then added.
+"""
+import io
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+# Tables in dependency order: primary key and foreign keys (column -> table)
+TABLES = {
+    'circuits': ('circuitId', {}),
+    'status': ('statusId', {}),
+    'drivers': ('driverId', {}),
+    'constructors': ('constructorId', {}),
+    'races': ('raceId', {'circuitId': 'circuits'}),
+    'results': ('resultId', {
+        'raceId': 'races', 'driverId': 'drivers', 'constructorId': 'constructors', 'statusId': 'status'
+    }),
+    'sprint_results': ('resultId', {
+        'raceId': 'races', 'driverId': 'drivers', 'constructorId': 'constructors', 'statusId': 'status'
+    }),
+    'qualifying': ('qualifyId', {'raceId': 'races', 'driverId': 'drivers', 'constructorId': 'constructors'}),
+}
+
+# Tables whose new rows mark a race as needing reprocessing
+RACE_TABLES = ('results', 'sprint_results', 'qualifying')
+
+# Rows read per chunk from each input file
+CHUNK_ROWS = 5000
+
+
+def table_for_file(path):
+    """
+    Ergast table an input CSV belongs to, from its file name.
+
+    'results.csv', 'results_2025.csv' and 'results-delta.csv' all map to
+    'results'; the longest matching table name wins, so 'sprint_results.csv'
+    maps to 'sprint_results'.
+
+    Returns:
+        str: Table name, or None if the file does not match any table
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    matches = [table for table in TABLES if stem == table or stem.startswith((f'{table}_', f'{table}-'))]
+    return max(matches, key=len) if matches else None
+
+
+def find_input_files(paths):
+    """
+    Expand input paths to (table, file) pairs in dependency order.
+
+    Directories contribute every CSV in them that matches a table.
+
+    Raises:
+        ValueError: If a file given explicitly does not match any table
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                table = table_for_file(name) if name.endswith('.csv') else None
+                if table:
+                    files.append((table, os.path.join(path, name)))
+        else:
+            table = table_for_file(path)
+            if table is None:
+                raise ValueError(f"Cannot tell which table {path} belongs to; name it after the table, "
+                                 f"e.g. results_2025.csv")
+            files.append((table, path))
+    order = list(TABLES)
+    return sorted(files, key=lambda item: order.index(item[0]))
+
+
+class IngestReport:
+    """What one ingestion run added to the store."""
+
+    def __init__(self):
+        self.tables = {}
+        self.new_race_ids = set()
+        self.races_with_new_results = set()
+
+    def table(self, name):
+        """Counters for one table, created on first use."""
+        return self.tables.setdefault(name, {
+            'read': 0, 'added': 0, 'duplicates': 0, 'conflicts': 0, 'rejected': 0, 'rejections': []
+        })
+
+    @property
+    def affected_race_ids(self):
+        """Races downstream stages need to (re)process: new races and races with new results."""
+        return self.new_race_ids | self.races_with_new_results
+
+    @property
+    def rejected(self):
+        return sum(counts['rejected'] for counts in self.tables.values())
+
+    def to_dict(self):
+        return {
+            'new_race_ids': sorted(self.new_race_ids),
+            'races_with_new_results': sorted(self.races_with_new_results),
+            'affected_race_ids': sorted(self.affected_race_ids),
+            'tables': self.tables
+        }
+
+
+class DataStore:
+    """
+    Directory of compressed per-table DataFrames plus a manifest.
+
+    The manifest records the row count of every table and a log of
+    ingestion runs with the races each one added.
+    """
+
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(os.path.join(self.path, self.MANIFEST))
+
+    def _table_path(self, table):
+        return os.path.join(self.path, f'{table}.pkl.gz')
+
+    def read_manifest(self):
+        if not self.exists():
+            return {'tables': {}, 'ingestions': []}
+        with open(os.path.join(self.path, self.MANIFEST)) as f:
+            return json.load(f)
+
+    def load_table(self, table):
+        """Stored table as a DataFrame (empty if it has never been ingested)."""
+        path = self._table_path(table)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return pd.read_pickle(path, compression='gzip')
+
+    def load(self):
+        """All stored tables, keyed by table name."""
+        return {table: self.load_table(table) for table in TABLES}
+
+    def ingest(self, paths, chunk_rows=CHUNK_ROWS):
+        """
+        Append new rows from delta CSVs or a full dump.
+
+        Files are processed in table dependency order, so a delta containing
+        both new drivers and their results is accepted. Within each file,
+        rows are read in chunks as raw text; a row is:
+        - a duplicate if its primary key is already stored (or appeared
+          earlier in the input) with identical values, and skipped;
+        - a conflict if the key is stored with different values; the stored
+          row is kept, as the store is append-only;
+        - rejected if its key is not an integer or a foreign key does not
+          exist in the referenced table.
+        Remaining rows are appended and the table is written once.
+
+        Args:
+            paths: CSV files and/or directories of CSVs
+            chunk_rows: Rows read per chunk
+
+        Returns:
+            IngestReport
+        """
+        report = IngestReport()
+        files = find_input_files(paths)
+        tables = {table: self.load_table(table) for table in TABLES}
+        keys = {
+            table: set(tables[table][key].tolist()) if len(tables[table]) else set()
+            for table, (key, _) in TABLES.items()
+        }
+        # Canonical values of stored rows by key, built on first duplicate per table
+        stored_rows = {}
+        appended = {}
+
+        for table, path in files:
+            key, foreign_keys = TABLES[table]
+            counts = report.table(table)
+            new_chunks = appended.setdefault(table, [])
+
+            for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_rows):
+                columns = list(tables[table].columns) or (list(new_chunks[0].columns) if new_chunks else None)
+                if columns and list(chunk.columns) != columns:
+                    raise ValueError(f"{path}: columns do not match the stored {table} table")
+                counts['read'] += len(chunk)
+
+                chunk_keys = pd.to_numeric(chunk[key], errors='coerce')
+                valid = chunk_keys.notna() & (chunk_keys % 1 == 0)
+                for value in chunk[key][~valid]:
+                    self._reject(counts, f"{key}={value!r} is not an integer id")
+                chunk, chunk_keys = chunk[valid], chunk_keys[valid].astype('int64')
+
+                for column, referenced in foreign_keys.items():
+                    known = pd.to_numeric(chunk[column], errors='coerce').isin(keys[referenced])
+                    for row_key, value in zip(chunk_keys[~known], chunk[column][~known]):
+                        self._reject(counts, f"{key}={row_key}: {column}={value!r} not in {referenced}")
+                    chunk, chunk_keys = chunk[known], chunk_keys[known]
+
+                seen = (chunk_keys.isin(keys[table]) | chunk_keys.duplicated()).to_numpy()
+                duplicates = chunk[seen]
+                chunk, new_keys = chunk[~seen], chunk_keys[~seen]
+
+                if len(chunk):
+                    new_chunks.append(chunk)
+                    keys[table].update(new_keys.tolist())
+                    if table in stored_rows:
+                        stored_rows[table].update(self._canonical_rows(chunk, key))
+                    counts['added'] += len(chunk)
+
+                    if table == 'races':
+                        report.new_race_ids.update(new_keys.tolist())
+                    elif table in RACE_TABLES:
+                        report.races_with_new_results.update(pd.to_numeric(chunk['raceId']).astype('int64').tolist())
+
+                if len(duplicates):
+                    rows = stored_rows.get(table)
+                    if rows is None:
+                        rows = stored_rows[table] = self._canonical_rows(tables[table], key)
+                        for new_chunk in new_chunks:
+                            rows.update(self._canonical_rows(new_chunk, key))
+                    for row_key, values in self._canonical_rows(duplicates, key, unique=False):
+                        if rows.get(row_key) == values:
+                            counts['duplicates'] += 1
+                        else:
+                            counts['conflicts'] += 1
+
+        # New races count once, under new_race_ids
+        report.races_with_new_results -= report.new_race_ids
+
+        os.makedirs(self.path, exist_ok=True)
+        manifest = self.read_manifest()
+        for table, chunks in appended.items():
+            if chunks:
+                tables[table] = self._append(tables[table], chunks)
+                tables[table].to_pickle(self._table_path(table), compression='gzip')
+            manifest['tables'][table] = len(tables[table])
+
+        manifest['ingestions'].append({
+            'time': datetime.utcnow().isoformat(timespec='seconds'),
+            'sources': [path for _, path in files],
+            'new_race_ids': sorted(report.new_race_ids),
+            'races_with_new_results': sorted(report.races_with_new_results),
+            'added': {table: counts['added'] for table, counts in report.tables.items()}
+        })
+        with open(os.path.join(self.path, self.MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        return report
+
+    @staticmethod
+    def _reject(counts, reason, limit=20):
+        counts['rejected'] += 1
+        if len(counts['rejections']) < limit:
+            counts['rejections'].append(reason)
+
+    @staticmethod
+    def _canonical_rows(frame, key, unique=True):
+        """
+        Rows as comparable value tuples, keyed by primary key.
+
+        Stored (typed) rows and incoming (raw text) rows compare equal when
+        they hold the same data: numbers compare by value ('10' == 10.0) and
+        empty cells match NaN.
+
+        Returns:
+            dict of key -> values, or a list of (key, values) if unique is False
+        """
+        def canonical(value):
+            if value is None or value == '' or (isinstance(value, float) and value != value):
+                return None
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return str(value)
+
+        pairs = [
+            (int(row[0]), tuple(canonical(value) for value in row[1:]))
+            for row in frame[[key] + list(frame.columns)].itertuples(index=False, name=None)
+        ]
+        return dict(pairs) if unique else pairs
+
+    @staticmethod
+    def _append(frame, chunks):
+        """
+        Stored rows plus new raw-text chunks, typed as read_csv would type them.
+
+        Going through CSV text once here keeps the stored dtypes identical to
+        parsing the combined CSV, e.g. a column that gains a '\\N' value
+        becomes a string column, exactly as in a fresh dump.
+        """
+        buffer = io.StringIO()
+        if len(frame):
+            frame.to_csv(buffer, index=False)
+            header = False
+        else:
+            header = True
+        for chunk in chunks:
+            chunk.to_csv(buffer, index=False, header=header)
+            header = False
+        buffer.seek(0)
+        return pd.read_csv(buffer)
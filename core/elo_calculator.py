@@ -1,6 +1,7 @@
 """
 ELO rating calculator for F1 drivers.
 """
+import numpy as np
 
 
 class EloCalculator:
@@ -100,6 +101,19 @@ class EloCalculator:
         """
         return 1 / (1 + 10 ** ((rating_b - rating_a) / 400))
 
+    def expected_score_matrix(self, ratings):
+        """
+        Calculate expected scores between every pair of drivers at once.
+        
+        Args:
+            ratings: Array of ELO ratings
+            
+        Returns:
+            ndarray: Matrix E where E[i, j] is the expected score of driver i against driver j
+        """
+        ratings = np.asarray(ratings, dtype=float)
+        return 1 / (1 + 10 ** ((ratings[np.newaxis, :] - ratings[:, np.newaxis]) / 400))
+
     def update_elo(self, rating, expected, actual, k_factor):
         """
         Update ELO rating based on expected and actual scores.
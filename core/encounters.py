@@ -0,0 +1,129 @@
+"""
+Sparse head-to-head encounter matrix over every pair of drivers who raced each other.
+"""
+import math
+
+import numpy as np
+
+
+class EncounterMatrix:
+    """
+    Head-to-head records of every pair of drivers who started the same race.
+
+    F1DataProcessor.process_races adds each race's starters with add_race
+    and reduces them with finish into one entry per ordered driver pair: the
+    entries for (a, b) and (b, a) both exist and mirror each other, and get
+    is a single dict lookup. Pairs that never met have no entry.
+
+    Each entry holds:
+        races: Races both drivers started
+        wins: Races the driver finished ahead of the opponent
+        rating_gap: Mean ELO difference (driver minus opponent) after those races
+        teammate_races, teammate_wins, teammate_rating_gap: The same over the
+            races they drove for the same constructor (gap None if there are none)
+    """
+
+    FIELDS = ('races', 'wins', 'rating_gap', 'teammate_races', 'teammate_wins', 'teammate_rating_gap')
+
+    def __init__(self):
+        self._pending = []
+        self.columns = {}
+        self._index = {}
+
+    def add_race(self, driver_ids, constructor_ids, positions, ratings):
+        """
+        Record every pair of one race's starters.
+
+        Args:
+            driver_ids: Starter driver ids, each driver once
+            constructor_ids: Their constructor ids
+            positions: Their positionOrder (lower finished ahead)
+            ratings: Their ELO ratings after the race
+        """
+        driver_ids = np.asarray(driver_ids)
+        if len(driver_ids) < 2:
+            return
+        positions = np.asarray(positions)
+        ratings = np.asarray(ratings, dtype=float)
+        constructor_ids = np.asarray(constructor_ids)
+        i, j = np.triu_indices(len(driver_ids), 1)
+        self._pending.append((
+            driver_ids[i], driver_ids[j],
+            positions[i] < positions[j], positions[j] < positions[i],
+            ratings[i] - ratings[j],
+            constructor_ids[i] == constructor_ids[j]
+        ))
+
+    def finish(self):
+        """
+        Reduce the recorded races to one entry per ordered driver pair.
+
+        Returns:
+            EncounterMatrix: self
+        """
+        if self._pending:
+            a, b, a_ahead, b_ahead, gap, teammates = (np.concatenate(column) for column in zip(*self._pending))
+        else:
+            a = b = np.array([], dtype=np.int64)
+            a_ahead = b_ahead = teammates = np.array([], dtype=bool)
+            gap = np.array([], dtype=float)
+        self._pending = []
+
+        # Every pair in both orders
+        drivers = np.concatenate([a, b]).astype(np.int64)
+        opponents = np.concatenate([b, a]).astype(np.int64)
+        ahead = np.concatenate([a_ahead, b_ahead])
+        gap = np.concatenate([gap, -gap])
+        teammates = np.concatenate([teammates, teammates])
+
+        stride = int(opponents.max()) + 1 if len(opponents) else 1
+        keys, inverse = np.unique(drivers * stride + opponents, return_inverse=True)
+        inverse = inverse.ravel()
+
+        def total(weights=None):
+            return np.bincount(inverse, weights=weights, minlength=len(keys))
+
+        races = total()
+        teammate_races = total(teammates)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            teammate_rating_gap = total(np.where(teammates, gap, 0.0)) / teammate_races
+        self.columns = {
+            'f1_driver_id': keys // stride,
+            'opponent_f1_driver_id': keys % stride,
+            'races': races,
+            'wins': total(ahead).astype(np.int64),
+            'rating_gap': total(gap) / races,
+            'teammate_races': teammate_races.astype(np.int64),
+            'teammate_wins': total(ahead & teammates).astype(np.int64),
+            'teammate_rating_gap': teammate_rating_gap
+        }
+        self._index = {
+            pair: k for k, pair in enumerate(zip(
+                self.columns['f1_driver_id'].tolist(), self.columns['opponent_f1_driver_id'].tolist()
+            ))
+        }
+        return self
+
+    def __len__(self):
+        return len(self._index)
+
+    def _entry(self, k):
+        entry = {name: self.columns[name][k].item() for name in self.columns}
+        if math.isnan(entry['teammate_rating_gap']):
+            entry['teammate_rating_gap'] = None
+        return entry
+
+    def get(self, driver_id, opponent_id):
+        """
+        Head-to-head record of a driver against an opponent.
+
+        Returns:
+            dict: f1_driver_id, opponent_f1_driver_id and FIELDS, or None if
+            they never started the same race
+        """
+        k = self._index.get((driver_id, opponent_id))
+        return None if k is None else self._entry(k)
+
+    def rows(self):
+        """Every entry as a dict, in (driver, opponent) order, e.g. for a bulk insert."""
+        return [self._entry(k) for k in range(len(self))]
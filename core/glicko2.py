@@ -0,0 +1,217 @@
+"""
+Glicko-2 rating engine for F1 drivers.
+"""
+import copy
+import math
+
+import numpy as np
+
+from core.rating_engine import RatingEngine
+
+# Conversion between the Glicko and Glicko-2 scales
+GLICKO2_SCALE = 173.7178
+
+
+class Glicko2Engine(RatingEngine):
+    """
+    Glicko-2 ratings (rating, rating deviation and volatility) for F1 drivers.
+
+    Each race is one rating period: drivers with teammate comparisons in the
+    race are updated together from their pre-race values. Rating deviation
+    grows by the volatility once per race a driver misses within a season
+    they race in, and once per season they do not race in at all, so the
+    deviation of a retired driver reflects the seasons since they last
+    raced rather than the hundreds of races held since. All updates
+    for a race are vectorized over its drivers, including the volatility
+    iteration. Comparisons count at the matchups' weight, which full-field
+    pairing divides by the field size - 1 so that a driver's comparisons in
+    one race weigh as much as a single teammate comparison.
+
+    See Glickman, "Example of the Glicko-2 system" (2012).
+    """
+
+    name = 'glicko2'
+
+    BASE_RATING = 1500
+    BASE_RD = 350
+    BASE_VOLATILITY = 0.06
+
+    # System constant constraining volatility change over time
+    TAU = 0.5
+
+    # Convergence tolerance and iteration cap for the volatility update
+    EPSILON = 0.000001
+    MAX_ITERATIONS = 100
+
+    # Season of a driver before the replay's first race
+    NO_SEASON = -1
+
+    def __init__(self, tau=None):
+        if tau is not None:
+            self.TAU = tau
+        self.driver_index = {}
+        self.mu = np.zeros(0)
+        self.phi = np.zeros(0)
+        self.sigma = np.zeros(0)
+        self.active = np.zeros(0, dtype=bool)
+        self.season = np.zeros(0, dtype=np.int64)
+
+    def start(self, driver_ids):
+        """Reset every driver to the base rating, deviation and volatility."""
+        n = len(driver_ids)
+        self.driver_index = {driver_id: i for i, driver_id in enumerate(driver_ids)}
+        self.mu = np.zeros(n)
+        self.phi = np.full(n, self.BASE_RD / GLICKO2_SCALE)
+        self.sigma = np.full(n, self.BASE_VOLATILITY)
+        # Season each driver's state has reached, and whether they had a
+        # comparison in it; kept per driver so split copies carry their own
+        self.season = np.full(n, self.NO_SEASON, dtype=np.int64)
+        self.active = np.zeros(n, dtype=bool)
+
+    def _grow_deviation(self, drivers, periods=1):
+        """Add periods rating periods of volatility to the deviation of drivers (a mask or indices)."""
+        max_phi = self.BASE_RD / GLICKO2_SCALE
+        self.phi[drivers] = np.minimum(np.sqrt(self.phi[drivers] ** 2 + periods * self.sigma[drivers] ** 2), max_phi)
+
+    def _start_season(self, year):
+        """
+        Move every driver still in an earlier season on to this one.
+
+        Drivers who did not race in their last season gain one period of
+        deviation for it, and every driver one per season skipped in between.
+        """
+        behind = self.season < year
+        if not behind.any():
+            return
+        started = behind & (self.season != self.NO_SEASON)
+        periods = year - self.season[started] - self.active[started]
+        grow = periods > 0
+        indices = np.flatnonzero(started)[grow]
+        self._grow_deviation(indices, periods[grow])
+        self.season[behind] = year
+        self.active[behind] = False
+
+    def process_race(self, matchups):
+        """Apply one rating period."""
+        n = len(self.mu)
+        max_phi = self.BASE_RD / GLICKO2_SCALE
+        self._start_season(matchups.year)
+
+        # Every comparison counts for both drivers
+        players = np.concatenate([matchups.index_a, matchups.index_b])
+        opponents = np.concatenate([matchups.index_b, matchups.index_a])
+        scores = np.concatenate([matchups.score_a, 1 - matchups.score_a])
+
+        if len(players):
+            g = 1 / np.sqrt(1 + 3 * self.phi[opponents] ** 2 / math.pi ** 2)
+            expected = 1 / (1 + np.exp(-g * (self.mu[players] - self.mu[opponents])))
+            weight = matchups.weight
+
+            information = np.bincount(players, weights=weight * g ** 2 * expected * (1 - expected), minlength=n)
+            improvement = np.bincount(players, weights=weight * g * (scores - expected), minlength=n)
+
+            rated = np.flatnonzero(information > 0)
+        else:
+            rated = np.zeros(0, dtype=np.intp)
+
+        # Drivers of this season without comparisons in the race only gain uncertainty
+        idle = self.active.copy()
+        idle[rated] = False
+        self._grow_deviation(idle)
+
+        if not len(rated):
+            return
+        self.active[rated] = True
+
+        mu = self.mu[rated]
+        phi = self.phi[rated]
+        v = 1 / information[rated]
+        delta = v * improvement[rated]
+
+        sigma = self._update_volatility(phi, self.sigma[rated], v, delta)
+
+        phi_star = np.sqrt(phi ** 2 + sigma ** 2)
+        new_phi = 1 / np.sqrt(1 / phi_star ** 2 + 1 / v)
+
+        self.mu[rated] = mu + new_phi ** 2 * improvement[rated]
+        self.phi[rated] = np.minimum(new_phi, max_phi)
+        self.sigma[rated] = sigma
+
+    def split(self, indices):
+        """A copy holding only the given drivers' rating, deviation and volatility."""
+        part = copy.copy(self)
+        part.driver_index = {}
+        part.mu = self.mu[indices]
+        part.phi = self.phi[indices]
+        part.sigma = self.sigma[indices]
+        part.active = self.active[indices]
+        part.season = self.season[indices]
+        return part
+
+    def merge(self, part, indices):
+        """Write back the state of a copy made by split."""
+        self.mu[indices] = part.mu
+        self.phi[indices] = part.phi
+        self.sigma[indices] = part.sigma
+        self.active[indices] = part.active
+        self.season[indices] = part.season
+
+    def _update_volatility(self, phi, sigma, v, delta):
+        """New volatilities by the Illinois algorithm, vectorized over drivers."""
+        tau_sq = self.TAU ** 2
+        a = np.log(sigma ** 2)
+        delta_sq = delta ** 2
+        phi_sq = phi ** 2
+
+        def f(x):
+            ex = np.exp(x)
+            return (ex * (delta_sq - phi_sq - v - ex) / (2 * (phi_sq + v + ex) ** 2)
+                    - (x - a) / tau_sq)
+
+        # Bracket the root
+        big_a = a.copy()
+        excess = delta_sq - phi_sq - v
+        big_b = np.empty_like(a)
+        large = excess > 0
+        big_b[large] = np.log(excess[large])
+
+        k = np.ones_like(a)
+        pending = ~large
+        while pending.any():
+            candidate = a - k * self.TAU
+            found = pending & (f(candidate) >= 0)
+            big_b[found] = candidate[found]
+            pending &= ~found
+            k[pending] += 1
+
+        f_a = f(big_a)
+        f_b = f(big_b)
+
+        active = np.abs(big_b - big_a) > self.EPSILON
+        for _ in range(self.MAX_ITERATIONS):
+            if not active.any():
+                break
+            # Converged drivers are carried along unchanged by the masks below
+            with np.errstate(divide='ignore', invalid='ignore'):
+                big_c = big_a + (big_a - big_b) * f_a / (f_b - f_a)
+                f_c = f(big_c)
+
+            swap = active & (f_c * f_b <= 0)
+            halve = active & ~swap
+            big_a = np.where(swap, big_b, big_a)
+            f_a = np.where(swap, f_b, np.where(halve, f_a / 2, f_a))
+            big_b = np.where(active, big_c, big_b)
+            f_b = np.where(active, f_c, f_b)
+
+            active &= np.abs(big_b - big_a) > self.EPSILON
+
+        return np.exp(big_a / 2)
+
+    def driver_stats(self, driver_id):
+        """Final Glicko-2 rating, rating deviation and volatility on the Glicko scale."""
+        i = self.driver_index[driver_id]
+        return {
+            'Glicko Rating': round(float(self.mu[i] * GLICKO2_SCALE + self.BASE_RATING), 1),
+            'Glicko RD': round(float(self.phi[i] * GLICKO2_SCALE), 1),
+            'Glicko Volatility': round(float(self.sigma[i]), 4)
+        }
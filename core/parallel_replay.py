@@ -0,0 +1,232 @@
+"""
+Parallel teammate replay over independent teammate-graph components.
+
+In teammate pairing, drivers only interact with the drivers they share a car
+with in a race. Within one season the teammate graph therefore splits into
+components (usually a team's driver line-up) whose rating updates depend only
+on their own drivers' state at the start of the season. Seasons are replayed
+in order; each season's components are packed into one shard per worker and
+replayed in a process pool, and the shard states are merged back before the
+next season starts.
+
+Every driver's updates happen in the same order and with the same arithmetic
+as in the sequential replay, so the merged results are identical to it.
+"""
+import copy
+import multiprocessing
+from collections import Counter, namedtuple
+from itertools import combinations
+
+from core.rating_engine import RaceMatchups
+
+# One starter row as seen by F1DataProcessor._process_driver_pair
+Starter = namedtuple('Starter', ['driverId', 'constructorId', 'positionOrder', 'statusId', 'weight'])
+
+# One season of the replay: its races as (race_id, year, weight, start, stop)
+# rows of the starter index, and its teammate components as lists of driver ids
+TeammateSeason = namedtuple('TeammateSeason', ['year', 'season_races', 'races', 'components'])
+
+
+class UnionFind:
+    """Disjoint sets over hashable items, with path halving and union by size."""
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def add(self, item):
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+
+    def find(self, item):
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+
+    def groups(self):
+        """The sets as lists, each in the order its items were added."""
+        groups = {}
+        for item in self.parent:
+            groups.setdefault(self.find(item), []).append(item)
+        return list(groups.values())
+
+
+def plan_shards(components, weights, shards):
+    """
+    Pack components into at most `shards` groups of similar total weight.
+
+    Components are placed largest first into the lightest shard, and each
+    shard lists its components in their original order.
+
+    Args:
+        components: Lists of driver ids
+        weights: Work estimate per component (e.g. its starter rows)
+        shards: Maximum number of shards
+
+    Returns:
+        list: Shards as flat lists of driver ids, empty shards dropped
+    """
+    loads = [0] * max(1, min(shards, len(components)))
+    assigned = [[] for _ in loads]
+    for i in sorted(range(len(components)), key=lambda i: -weights[i]):
+        target = loads.index(min(loads))
+        loads[target] += weights[i]
+        assigned[target].append(i)
+    return [
+        [driver_id for i in sorted(members) for driver_id in components[i]]
+        for members in assigned if members
+    ]
+
+
+# Lightweight F1DataProcessor (ELO calculator and status names) used by the workers
+_shard_processor = None
+
+
+def _init_shard_worker(processor):
+    global _shard_processor
+    _shard_processor = processor
+
+
+def replay_shard(task):
+    """
+    Replay one season's races for a shard of drivers. Runs inside a worker process.
+
+    Args:
+        task: (season_races, races, drivers, engines) where races lists
+              (race_id, year, weight, starter rows), drivers maps the shard's
+              driver ids to Driver copies and engines are the rating engines
+              split to the shard's drivers, in the same order
+
+    Returns:
+        tuple: (drivers, engines) after the season
+    """
+    season_races, races, drivers, engines = task
+    processor = _shard_processor
+    processor.drivers_dict = drivers
+    driver_index = {driver_id: i for i, driver_id in enumerate(drivers)}
+
+    for race_id, race_year, weight, rows in races:
+        processed_drivers = set()
+        for row in rows:
+            if row.driverId not in processed_drivers:
+                driver = drivers[row.driverId]
+                driver.increment_race_count()
+                driver.update_years(race_year)
+                processed_drivers.add(row.driverId)
+
+        # Same pair order as DataFrame.groupby('constructorId') in the sequential replay
+        teams = {}
+        for row in rows:
+            teams.setdefault(row.constructorId, []).append(row)
+
+        index_a, index_b, scores = [], [], []
+        for constructor_id in sorted(teams):
+            group = teams[constructor_id]
+            if len(group) < 2:
+                continue
+            for row_a, row_b in combinations(group, 2):
+                score_a = processor._process_driver_pair(row_a, row_b, race_year, race_id, season_races)
+                if score_a is not None:
+                    index_a.append(driver_index[row_a.driverId])
+                    index_b.append(driver_index[row_b.driverId])
+                    scores.append(score_a)
+
+        if engines:
+            matchups = RaceMatchups(race_id, race_year, weight, index_a, index_b, scores)
+            for engine in engines:
+                engine.process_race(matchups)
+
+    return drivers, engines
+
+
+def replay_seasons(processor, seasons, starters, workers):
+    """
+    Replay every season, its teammate components in parallel.
+
+    Args:
+        processor: F1DataProcessor whose drivers and rating engines are updated
+        seasons: TeammateSeason list in replay order
+        starters: Starter index from F1DataProcessor._index_starters
+        workers: Number of worker processes
+    """
+    drivers_dict = processor.drivers_dict
+    engines = processor.rating_engines
+    engine_index = {driver_id: i for i, driver_id in enumerate(drivers_dict)}
+    for engine in engines:
+        engine.start(list(drivers_dict))
+
+    shard_processor = type(processor).__new__(type(processor))
+    shard_processor.__dict__.update(
+        elo_calculator=processor.elo_calculator,
+        status_mapping=processor.status_mapping,
+        drivers_dict={}
+    )
+
+    start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+    context = multiprocessing.get_context(start_method)
+    with context.Pool(workers, initializer=_init_shard_worker, initargs=(shard_processor,)) as pool:
+        for season in seasons:
+            first, last = season.races[0][3], season.races[-1][4]
+            starts = Counter(starters['driver_id'][first:last].tolist())
+            weights = [sum(starts[driver_id] for driver_id in component) for component in season.components]
+            shards = plan_shards(season.components, weights, workers) if season.components else []
+            shard_of = {driver_id: n for n, shard in enumerate(shards) for driver_id in shard}
+
+            # Each shard gets its drivers' starter rows, in the original row order
+            shard_races = [[] for _ in shards]
+            for race_id, race_year, weight, start, stop in season.races:
+                rows = [[] for _ in shards]
+                for row in zip(
+                    starters['driver_id'][start:stop].tolist(),
+                    starters['constructor_id'][start:stop].tolist(),
+                    starters['position'][start:stop].tolist(),
+                    starters['status_id'][start:stop].tolist()
+                ):
+                    rows[shard_of[row[0]]].append(Starter(*row, weight))
+                for n in range(len(shards)):
+                    shard_races[n].append((race_id, race_year, weight, rows[n]))
+
+            tasks = []
+            for shard, races in zip(shards, shard_races):
+                drivers = {}
+                for driver_id in shard:
+                    driver = copy.copy(drivers_dict[driver_id])
+                    driver.rating_history = []
+                    drivers[driver_id] = driver
+                indices = [engine_index[driver_id] for driver_id in shard]
+                tasks.append((season.season_races, races, drivers, [engine.split(indices) for engine in engines]))
+            pending = pool.map_async(replay_shard, tasks)
+
+            # Drivers without a start this season only go through the engines' idle updates
+            if engines:
+                idle = [i for driver_id, i in engine_index.items() if driver_id not in shard_of]
+                idle_engines = [engine.split(idle) for engine in engines]
+                for race_id, race_year, weight, start, stop in season.races:
+                    matchups = RaceMatchups(race_id, race_year, weight, [], [], [])
+                    for engine in idle_engines:
+                        engine.process_race(matchups)
+                for engine, part in zip(engines, idle_engines):
+                    engine.merge(part, idle)
+
+            for shard, (drivers, parts) in zip(shards, pending.get()):
+                for driver_id, replayed in drivers.items():
+                    driver = drivers_dict[driver_id]
+                    history = driver.rating_history
+                    driver.__dict__.update(replayed.__dict__)
+                    history.extend(replayed.rating_history)
+                    driver.rating_history = history
+                indices = [engine_index[driver_id] for driver_id in shard]
+                for engine, part in zip(engines, parts):
+                    engine.merge(part, indices)
@@ -0,0 +1,100 @@
+"""
+Rating engine interface for rating systems run alongside ELO.
+"""
+import numpy as np
+
+
+class RaceMatchups:
+    """
+    The teammate comparisons of one race, as seen by every rating engine.
+
+    Built once per race by F1DataProcessor.process_races after the pairwise
+    outcomes are decided, so all engines share the same filtered race data
+    and scoring rules.
+
+    Attributes:
+        race_id: Race identifier
+        year: Season of the race
+        weight: Weight of each comparison: the race weight (0.5 for shortened
+                races), divided by the field size - 1 in full-field mode
+        index_a: Driver indices (into the engine's driver order) of the first drivers
+        index_b: Driver indices of the second drivers
+        score_a: Score of the first driver in each pair (1 win, 0 loss)
+    """
+
+    def __init__(self, race_id, year, weight, index_a, index_b, score_a):
+        self.race_id = race_id
+        self.year = year
+        self.weight = weight
+        self.index_a = np.asarray(index_a, dtype=np.intp)
+        self.index_b = np.asarray(index_b, dtype=np.intp)
+        self.score_a = np.asarray(score_a, dtype=float)
+
+    def __len__(self):
+        return len(self.score_a)
+
+
+class RatingEngine:
+    """
+    A rating system updated race by race in the ELO replay.
+
+    Engines keep their state in arrays indexed by driver position, so a
+    race's comparisons can be applied with vectorized operations. Subclasses
+    implement start, process_race and driver_stats, and split and merge
+    for the parallel teammate replay (F1DataProcessor.process_races with
+    workers > 1).
+    """
+
+    # Display name, e.g. for logs and benchmarks
+    name = None
+
+    def start(self, driver_ids):
+        """
+        Reset the engine's state before a replay.
+
+        Args:
+            driver_ids: All driver ids, in the order RaceMatchups indices refer to
+        """
+        raise NotImplementedError
+
+    def process_race(self, matchups):
+        """
+        Apply one race's comparisons. Called in chronological order.
+
+        Args:
+            matchups: RaceMatchups for the race (may be empty)
+        """
+        raise NotImplementedError
+
+    def split(self, indices):
+        """
+        A copy of the engine holding only the given drivers' state.
+
+        Used by the parallel teammate replay: the copy processes races whose
+        RaceMatchups indices refer to positions in `indices`, and is merged
+        back afterwards. Updating the copy must give each of its drivers
+        exactly the values the full engine would have.
+
+        Args:
+            indices: Driver indices (into the start order) to keep
+        """
+        raise NotImplementedError
+
+    def merge(self, part, indices):
+        """
+        Write back the state of a copy made by split(indices).
+
+        Args:
+            part: Engine returned by split
+            indices: The indices it was split with
+        """
+        raise NotImplementedError
+
+    def driver_stats(self, driver_id):
+        """
+        Final values for one driver, as extra rankings columns.
+
+        Returns:
+            dict: Column name to value
+        """
+        raise NotImplementedError
@@ -0,0 +1,37 @@
+"""
+Gunicorn settings, read automatically by `gunicorn wsgi:app`.
+
+Workers and bind address come from gunicorn's own environment handling
+(WEB_CONCURRENCY, PORT). With GUNICORN_PRELOAD (default on) the app is loaded
+once in the master and app.prefork.preload builds the shared read-only state
+before the workers fork; see app/prefork.py.
+"""
+import gc
+import os
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+if preload_app:
+    # No collections in the master while the app loads, so freed objects do
+    # not leave holes in pages the workers will share; gc.freeze() runs
+    # right before fork and each worker re-enables collection
+    gc.disable()
+
+
+def when_ready(server):
+    """Preload the app's shared state once, in the master, before any worker forks."""
+    if server.cfg.preload_app:
+        from app.prefork import preload
+        preload(server.app.wsgi())
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from app.prefork import post_fork as reset_worker
+        reset_worker(server.app.wsgi())
+
+
+def post_worker_init(worker):
+    """Start the worker's outbox sender, which also sends mail left pending by earlier runs."""
+    from app.outbox import start_outbox_sender
+    start_outbox_sender(worker.wsgi)
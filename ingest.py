@@ -0,0 +1,87 @@
+"""
+Script to ingest new Ergast data into the local data store.
+
+Accepts delta CSVs (e.g. results_2025.csv, races_2025.csv) or a newer full
+dump directory. Rows are read in chunks, deduplicated by primary key,
+validated against drivers, constructors, status, races and circuits, and
+appended to the store in data/store/, which F1DataProcessor.load_data reads
+instead of the CSVs once it exists. The first run should ingest the current
+dump (python ingest.py data/).
+
+The report lists exactly which races are new and which existing races gained
+results, so later stages can limit their work to them.
+
+Usage:
+    python ingest.py PATH [PATH ...] [--store data/store] [--report report.json]
+                          [--chunk-rows N]
+
+Exits with status 1 if any row was rejected; the accepted rows are still stored.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from core.data_store import CHUNK_ROWS, DataStore
+
+_PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+_DEFAULT_STORE = os.path.join(_PROJECT_ROOT, 'data', 'store')
+
+
+def format_race_ids(race_ids, limit=30):
+    """Comma-separated race ids, shortened when there are many (e.g. the first ingestion)."""
+    race_ids = sorted(race_ids)
+    if not race_ids:
+        return 'none'
+    if len(race_ids) > limit:
+        return f"{len(race_ids)} races ({race_ids[0]}-{race_ids[-1]}); see --report for the full list"
+    return ', '.join(map(str, race_ids))
+
+
+def format_report(report):
+    """Human-readable summary of an IngestReport."""
+    lines = [f"{'table':<16}{'read':>8}{'added':>8}{'dupes':>8}{'conflicts':>11}{'rejected':>10}", '-' * 61]
+    for table, counts in report.tables.items():
+        lines.append(
+            f"{table:<16}{counts['read']:>8}{counts['added']:>8}{counts['duplicates']:>8}"
+            f"{counts['conflicts']:>11}{counts['rejected']:>10}"
+        )
+        for reason in counts['rejections']:
+            lines.append(f"    rejected: {reason}")
+    lines.append('')
+    lines.append(f"New races: {format_race_ids(report.new_race_ids)}")
+    lines.append(f"Existing races with new results: {format_race_ids(report.races_with_new_results)}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest new Ergast CSV data into the local store.")
+    parser.add_argument('paths', nargs='+', help="Delta CSV files and/or directories of CSVs")
+    parser.add_argument('--store', default=_DEFAULT_STORE, help="Store directory (default: data/store)")
+    parser.add_argument('--report', help="Also write the report as JSON to this path")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS,
+                        help=f"Rows read per chunk (default: {CHUNK_ROWS})")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        report = DataStore(args.store).ingest(args.paths, chunk_rows=args.chunk_rows)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 2
+    elapsed = time.perf_counter() - start
+
+    print(format_report(report))
+    print(f"\nIngested into {args.store} in {elapsed:.1f}s")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report.to_dict(), f, indent=2)
+        print(f"Report written to {args.report}")
+
+    return 1 if report.rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
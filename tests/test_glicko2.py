@@ -0,0 +1,123 @@
+"""
+Glicko-2 rating deviation over long careers and retirements.
+"""
+import os
+
+import numpy as np
+
+from core.data_processor import PAIRING_FULL_FIELD, F1DataProcessor
+from core.glicko2 import GLICKO2_SCALE, Glicko2Engine
+from core.rating_engine import RaceMatchups
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+RACES_PER_SEASON = 16
+
+
+def season_races(year, pairs):
+    """One season of races in which each (a, b) pair of teammates is compared, alternating wins."""
+    return [
+        RaceMatchups(
+            year * 100 + race, year, 1.0,
+            [a for a, _ in pairs], [b for _, b in pairs], [race % 2] * len(pairs)
+        )
+        for race in range(RACES_PER_SEASON)
+    ]
+
+
+def rd(engine, i):
+    return engine.phi[i] * GLICKO2_SCALE
+
+
+def test_retired_driver_rd_stays_well_below_base():
+    engine = Glicko2Engine()
+    engine.start([0, 1, 2, 3])
+
+    # Drivers 0 and 1 race together for twelve seasons, then retire while
+    # 2 and 3 race on for another fifty
+    for year in range(1960, 1972):
+        for matchups in season_races(year, [(0, 1)]):
+            engine.process_race(matchups)
+    retired_phi = engine.phi[0]
+    for year in range(1972, 2022):
+        for matchups in season_races(year, [(2, 3)]):
+            engine.process_race(matchups)
+
+    assert rd(engine, 0) < Glicko2Engine.BASE_RD / 2
+    # One period of growth per completed season away (1972-2020), not per race
+    assert np.isclose(engine.phi[0], np.sqrt(retired_phi ** 2 + 49 * engine.sigma[0] ** 2))
+
+
+def test_missed_race_within_a_season_grows_deviation():
+    engine = Glicko2Engine()
+    engine.start([0, 1, 2])
+    for matchups in season_races(2000, [(0, 1)]):
+        engine.process_race(matchups)
+    before = engine.phi.copy()
+
+    # Driver 1 sits out a race of the same season; driver 2 has not raced yet
+    engine.process_race(RaceMatchups(2099, 2000, 1.0, [], [], []))
+
+    assert engine.phi[0] > before[0] and engine.phi[1] > before[1]
+    assert engine.phi[2] == before[2]
+
+
+def test_split_and_merge_match_the_full_engine():
+    races = [matchups for year in range(1990, 1996) for matchups in season_races(year, [(0, 1), (2, 3)])]
+    races += [matchups for year in range(1998, 2000) for matchups in season_races(year, [(2, 3)])]
+
+    full = Glicko2Engine()
+    full.start([0, 1, 2, 3])
+    for matchups in races:
+        full.process_race(matchups)
+
+    # Replayed season by season in two independent parts, as the parallel replay does
+    split = Glicko2Engine()
+    split.start([0, 1, 2, 3])
+    for year in sorted({matchups.year for matchups in races}):
+        season = [matchups for matchups in races if matchups.year == year]
+        for indices in ([0, 1], [2, 3]):
+            part = split.split(indices)
+            local = {driver: n for n, driver in enumerate(indices)}
+            for matchups in season:
+                pairs = [(a, b, s) for a, b, s in zip(matchups.index_a, matchups.index_b, matchups.score_a)
+                         if a in local]
+                part.process_race(RaceMatchups(
+                    matchups.race_id, matchups.year, matchups.weight,
+                    [local[a] for a, _, _ in pairs], [local[b] for _, b, _ in pairs], [s for _, _, s in pairs]
+                ))
+            split.merge(part, indices)
+
+    np.testing.assert_array_equal(split.mu, full.mu)
+    np.testing.assert_array_equal(split.phi, full.phi)
+    np.testing.assert_array_equal(split.sigma, full.sigma)
+
+
+def test_full_field_volatility_stays_bounded():
+    field = 20
+    rng = np.random.default_rng(7)
+    index_a, index_b = np.triu_indices(field, 1)
+    engine = Glicko2Engine()
+    engine.start(list(range(field)))
+
+    # Random finishing orders, every pair compared, weighted as full-field pairing does
+    for race in range(400):
+        order = rng.permutation(field)
+        engine.process_race(RaceMatchups(
+            race, 2000 + race // 20, 1.0 / (field - 1),
+            index_a, index_b, (order[index_a] < order[index_b]).astype(float)
+        ))
+
+    assert np.all(np.isfinite(engine.mu))
+    assert engine.sigma.max() < 2 * Glicko2Engine.BASE_VOLATILITY
+
+
+def test_full_field_replay_keeps_volatility_near_base():
+    processor = F1DataProcessor(pairing=PAIRING_FULL_FIELD)
+    processor.load_data(DATA_PATH)
+    processor.process_races()
+    engine = processor.rating_engines[0]
+
+    assert np.all(np.isfinite(engine.mu)) and np.all(np.isfinite(engine.phi))
+    assert engine.sigma.max() < 2 * Glicko2Engine.BASE_VOLATILITY
+    assert engine.phi.max() * GLICKO2_SCALE <= Glicko2Engine.BASE_RD
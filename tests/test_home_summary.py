@@ -0,0 +1,59 @@
+"""
+Home page read model keyed by the AppStats data version.
+"""
+import pytest
+
+from app import create_app, db
+from app.models import AppStats, DriverEloRanking, HomeSummary
+from app.response_cache import DATA_VERSION_KEY
+from app.routes.main import get_home_summary
+from app.services import store_home_summary
+from config import TestingConfig
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(
+            DriverEloRanking(
+                id=i, driver=f"Driver {i}", f1_driver_id=i, elo_rating=1500 + i, lower_bound=1450 + i,
+                upper_bound=1550 + i, confidence_score=80, reliability_grade='B', race_count=50,
+                rating_volatility=30.0, first_year=1990 + i, last_year=2000 + i, career_span=11,
+                flag_level='Veteran'
+            )
+            for i in range(1, 4)
+        )
+        db.session.commit()
+        yield app
+        db.session.remove()
+
+
+def store(version, stats):
+    """Write a data version and its summary in one transaction, as populate_database does."""
+    stat = AppStats.query.filter_by(stat_key=DATA_VERSION_KEY).first()
+    if stat is None:
+        db.session.add(AppStats(stat_key=DATA_VERSION_KEY, stat_value=version))
+    else:
+        stat.stat_value = version
+    store_home_summary(stats, version)
+    db.session.commit()
+
+
+def test_summary_is_keyed_by_the_data_version(app):
+    store(41, {'drivers_count': 3})
+    assert HomeSummary.query.one().data_version == '41'
+    assert get_home_summary()['stats'] == {'drivers_count': 3}
+
+    store(42, {'drivers_count': 4})
+    assert [row.data_version for row in HomeSummary.query] == ['42']
+    assert get_home_summary()['stats'] == {'drivers_count': 4}
+
+
+def test_summary_of_another_version_is_not_served(app):
+    store(41, {'drivers_count': 3})
+    AppStats.query.filter_by(stat_key=DATA_VERSION_KEY).one().stat_value = 43
+    db.session.commit()
+
+    assert get_home_summary() is None
@@ -0,0 +1,13 @@
+"""
+Prometheus metrics endpoint.
+"""
+from app import create_app
+from config import TestingConfig
+
+
+def test_metrics_content_type():
+    app = create_app(TestingConfig)
+    response = app.test_client().get('/metrics')
+
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == 'text/plain; version=0.0.4; charset=utf-8'
@@ -0,0 +1,216 @@
+"""
+Contact form outbox delivered to a local aiosmtpd server.
+"""
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from aiosmtpd.controller import Controller
+from flask_mail import Message
+
+from app import create_app, db
+from app.models import OutboxMessage
+from app.outbox import CLAIM_TIMEOUT, queue_mail, send_due_messages
+from config import TestingConfig
+
+RETRY_SECONDS = 30
+
+
+class RecordingHandler:
+    """aiosmtpd handler keeping every message it accepts."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope.content.decode('utf-8', 'replace'))
+        return '250 Message accepted for delivery'
+
+    def wait_for(self, count, timeout=5):
+        deadline = time.monotonic() + timeout
+        while len(self.messages) < count and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return self.messages
+
+
+def free_port():
+    """A local port with nothing listening on it."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_port():
+    return free_port()
+
+
+@pytest.fixture
+def smtp(smtp_port):
+    """SMTP server on smtp_port for the duration of a test."""
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname='127.0.0.1', port=smtp_port)
+    controller.start()
+    yield handler
+    controller.stop()
+
+
+def make_app(tmp_path, smtp_port, mode):
+    config = type('OutboxTestConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'outbox.db'}",
+        'WTF_CSRF_ENABLED': False,
+        'MAIL_SERVER': '127.0.0.1',
+        'MAIL_PORT': smtp_port,
+        'MAIL_USE_TLS': False,
+        'MAIL_SUPPRESS_SEND': False,
+        'MAIL_DEFAULT_SENDER': 'site@example.com',
+        'MAIL_RECIPIENT': 'owner@example.com',
+        'MAIL_OUTBOX_MODE': mode,
+        'MAIL_OUTBOX_RETRY_SECONDS': RETRY_SECONDS,
+    })
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@pytest.fixture
+def app(tmp_path, smtp_port):
+    """App whose outbox is only sent by the test calling send_due_messages."""
+    app = make_app(tmp_path, smtp_port, 'thread')
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+
+def add_message(subject, **values):
+    message = OutboxMessage(subject=subject, recipients='owner@example.com', body='Hello', **values)
+    db.session.add(message)
+    db.session.commit()
+    return message.id
+
+
+def make_due(message_id):
+    db.session.get(OutboxMessage, message_id).next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+
+def test_queued_message_is_delivered_by_the_sender_thread(tmp_path, smtp_port, smtp):
+    app = make_app(tmp_path, smtp_port, 'thread')
+    with app.test_request_context():
+        queue_mail(Message(subject='Queued', recipients=['owner@example.com'], body='Hello'))
+
+    messages = smtp.wait_for(1)
+    assert len(messages) == 1
+    assert 'Subject: Queued' in messages[0]
+
+
+def test_contact_form_waits_for_the_cron_flush(tmp_path, smtp_port, smtp):
+    app = make_app(tmp_path, smtp_port, 'cron')
+    app.config['CRON_SECRET'] = 'cron-secret'
+    client = app.test_client()
+    response = client.post('/contact', data={
+        'name': 'Tester',
+        'email': 'tester@example.com',
+        'subject': 'general',
+        'message': 'A question about the ratings.'
+    })
+    response.close()
+    assert response.status_code == 302
+    assert smtp.messages == []
+    assert 'outbox_sender' not in app.extensions
+
+    assert client.get('/outbox/flush').status_code == 401
+    assert client.get('/outbox/flush', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert smtp.messages == []
+
+    response = client.get('/outbox/flush', headers={'Authorization': 'Bearer cron-secret'})
+    assert response.status_code == 200
+    assert response.get_json() == {'claimed': 1}
+    assert len(smtp.messages) == 1
+    assert 'A question about the ratings.' in smtp.messages[0]
+    with app.app_context():
+        assert OutboxMessage.query.count() == 0
+
+
+def test_flush_endpoint_is_absent_without_a_secret(tmp_path, smtp_port):
+    app = make_app(tmp_path, smtp_port, 'cron')
+    assert app.test_client().get('/outbox/flush').status_code == 404
+
+
+def test_refused_connection_is_retried_with_backoff(app, smtp_port):
+    message_id = add_message('Retried')
+
+    for attempt in (1, 2):
+        before = datetime.utcnow()
+        assert send_due_messages() == 1
+        message = db.session.get(OutboxMessage, message_id)
+        assert message.status == 'pending'
+        assert message.attempts == attempt
+        assert message.last_error
+        delay = timedelta(seconds=RETRY_SECONDS * 2 ** (attempt - 1))
+        assert before + delay - timedelta(seconds=1) <= message.next_attempt_at <= datetime.utcnow() + delay
+        # Not due again until the backoff has passed
+        assert send_due_messages() == 0
+        make_due(message_id)
+
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname='127.0.0.1', port=smtp_port)
+    controller.start()
+    try:
+        assert send_due_messages() == 1
+    finally:
+        controller.stop()
+    assert len(handler.messages) == 1
+    assert db.session.get(OutboxMessage, message_id) is None
+
+
+def test_message_is_marked_failed_after_max_attempts(app):
+    app.config['MAIL_OUTBOX_MAX_ATTEMPTS'] = 2
+    message_id = add_message('Undeliverable')
+
+    send_due_messages()
+    make_due(message_id)
+    send_due_messages()
+
+    message = db.session.get(OutboxMessage, message_id)
+    assert message.status == 'failed'
+    assert message.attempts == 2
+    assert send_due_messages() == 0
+
+
+def test_claimed_message_is_not_sent_twice(app, smtp):
+    add_message('Claimed', status='sending', claimed_at=datetime.utcnow())
+    add_message('Abandoned', status='sending', claimed_at=datetime.utcnow() - CLAIM_TIMEOUT - timedelta(minutes=1))
+
+    # Only the claim left by a worker that died mid-send is taken over
+    assert send_due_messages() == 1
+    assert len(smtp.messages) == 1
+    assert 'Subject: Abandoned' in smtp.messages[0]
+
+
+def test_concurrent_senders_deliver_each_message_once(app, smtp):
+    subjects = [f"Message {i}" for i in range(20)]
+    for subject in subjects:
+        add_message(subject)
+
+    def drain():
+        with app.app_context():
+            try:
+                while send_due_messages(batch_size=3):
+                    pass
+            finally:
+                db.session.remove()
+
+    workers = [threading.Thread(target=drain) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    delivered = [line for message in smtp.wait_for(len(subjects)) for line in message.splitlines()
+                 if line.startswith('Subject: ')]
+    assert sorted(delivered) == sorted(f"Subject: {subject}" for subject in subjects)
+    assert OutboxMessage.query.count() == 0
@@ -0,0 +1,44 @@
+"""
+Per-request streaming switch on the rankings page.
+"""
+import pytest
+
+from app import create_app, db
+from app.models import DriverEloRanking
+from config import TestingConfig
+
+
+def make_app(stream_default):
+    config = type('RankingsTestConfig', (TestingConfig,), {'RANKINGS_STREAM': stream_default})
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(
+            DriverEloRanking(
+                id=n, driver=f"Driver {n}", f1_driver_id=n, elo_rating=1600.0 - n, lower_bound=1550.0 - n,
+                upper_bound=1650.0 - n, confidence_score=80, reliability_grade='A', race_count=100,
+                rating_volatility=40.0, first_year=2000, last_year=2010, career_span=11, flag_level='Veteran'
+            )
+            for n in range(1, 6)
+        )
+        db.session.commit()
+    return app
+
+
+@pytest.mark.parametrize('stream_default, query, streamed', [
+    (False, '', False),
+    (False, '?stream=1', True),
+    (False, '?stream=junk', False),
+    (True, '', True),
+    (True, '?stream=0', False),
+])
+def test_stream_parameter_overrides_the_default(stream_default, query, streamed):
+    app = make_app(stream_default)
+    captured = []
+    app.after_request(lambda response: captured.append(response.is_streamed) or response)
+
+    response = app.test_client().get(f"/rankings{query}")
+
+    assert response.status_code == 200
+    assert captured == [streamed]
+    assert b'Driver 5' in response.get_data()
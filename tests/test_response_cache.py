@@ -0,0 +1,80 @@
+"""
+Response cache serving a real driver profile page.
+"""
+import pytest
+
+from app import create_app, db
+from app.models import AppStats, DriverEloProgression, DriverEloRanking, DriverTeamHistory
+from app.response_cache import DATA_VERSION_KEY
+from config import Config, TestingConfig
+
+# Driver profiles in the Ergast data; the default budget should hold them all
+DRIVER_COUNT = 684
+
+
+@pytest.fixture
+def app(tmp_path):
+    config = type('ResponseCacheTestConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'cache.db'}",
+        'RESPONSE_CACHE_ENABLED': True,
+        'RESPONSE_CACHE_MAX_BYTES': Config.RESPONSE_CACHE_MAX_BYTES,
+        'RESPONSE_CACHE_DIR': str(tmp_path / 'response-cache'),
+        'RESPONSE_CACHE_DIR_MAX_BYTES': Config.RESPONSE_CACHE_DIR_MAX_BYTES,
+    })
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        db.session.add(DriverEloRanking(
+            id=1, driver='Test Driver', f1_driver_id=10, elo_rating=1620.5, lower_bound=1580.0,
+            upper_bound=1661.0, confidence_score=85, reliability_grade='A', race_count=180,
+            rating_volatility=42.0, first_year=2001, last_year=2012, career_span=12, flag_level='Veteran'
+        ))
+        db.session.add_all(
+            DriverEloProgression(f1_driver_id=10, year=year, elo_rating=1500 + 10 * (year - 2001))
+            for year in range(2001, 2013)
+        )
+        db.session.add_all(
+            DriverTeamHistory(f1_driver_id=10, team='Team A' if year < 2007 else 'Team B', year=year,
+                              elo_rating=1500 + 10 * (year - 2001))
+            for year in range(2001, 2013)
+        )
+        db.session.add(AppStats(stat_key=DATA_VERSION_KEY, stat_value=1))
+        db.session.commit()
+    return app
+
+
+def test_driver_profile_is_cached(app):
+    client = app.test_client()
+    cache = app.extensions['response_cache']
+
+    first = client.get('/driver/1')
+    assert first.status_code == 200
+    assert first.headers['X-Cache'] == 'MISS'
+    body = first.get_data()
+    assert b'Test Driver' in body
+    # Charts rely on the plotly.js script in base.html instead of inlining it
+    assert len(body) < 200 * 1024
+
+    second = client.get('/driver/1')
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.get_data() == body
+    assert cache.memory.size == len(body)
+
+    # Arguments the view does not read share the entry
+    assert client.get('/driver/1?x=1').headers['X-Cache'] == 'HIT'
+    assert len(cache.memory) == 1
+
+    # Other workers on the host read it from the shared files
+    cache.memory.clear()
+    assert client.get('/driver/1').get_data() == body
+    assert len(cache.memory) == 1
+
+
+def test_default_budgets_hold_every_driver_profile(app):
+    body = app.test_client().get('/driver/1').get_data()
+    cache = app.extensions['response_cache']
+
+    # Small enough to be stored at all, and every profile fits with room to spare
+    assert len(body) <= cache.memory.max_bytes // 4
+    assert DRIVER_COUNT * len(body) * 2 <= cache.memory.max_bytes
+    assert DRIVER_COUNT * len(body) * 2 <= cache.files.max_bytes * 3 // 4
@@ -0,0 +1,33 @@
+"""
+Per-stage memory figures in the rebuild stage report.
+"""
+import os
+
+import pytest
+
+from utils.stage_report import StageReport
+
+ALLOCATION_MB = 200
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/clear_refs'), reason='needs the Linux RSS high-water mark')
+def test_memory_is_reported_per_stage():
+    report = StageReport()
+    with report.stage('idle'):
+        pass
+    with report.stage('allocate_and_free'):
+        block = bytearray(ALLOCATION_MB * 1_048_576)
+        del block
+    with report.stage('keep'):
+        kept = bytearray(ALLOCATION_MB // 2 * 1_048_576)
+
+    idle, freed, grown = report.stages
+    assert abs(idle['rss_growth_mb']) < ALLOCATION_MB * 0.1
+    # A transient allocation shows in the stage's peak but not its growth
+    assert freed['peak_rss_mb'] - idle['peak_rss_mb'] >= ALLOCATION_MB * 0.9
+    assert abs(freed['rss_growth_mb']) < ALLOCATION_MB * 0.1
+    # A later stage's peak is its own, not the process's peak so far
+    assert grown['rss_growth_mb'] >= ALLOCATION_MB // 2 * 0.9
+    assert grown['peak_rss_mb'] < freed['peak_rss_mb'] - ALLOCATION_MB // 4
+    assert 'RSS +MB' in report.summary()
+    del kept
@@ -8,7 +8,19 @@ This is useful when:
 - You need to rebuild the database
 
 Usage:
-    python update_db.py
+    python update_db.py [--force | --shadow] [--snapshot[=PATH]] [--stage-report=PATH] [--profile[=PATH]]
+    
+--shadow (PostgreSQL) rebuilds the tables in a separate schema while the
+live ones keep serving, then swaps them in atomically; see
+utils/shadow_reseed.py.
+
+--snapshot also writes the read-only SQLite snapshot served with
+DATABASE_SNAPSHOT (default path: snapshot/f1-elo.sqlite).
+
+Every run prints a per-stage table (wall and CPU time, RSS growth and peak, rows)
+and writes it as JSON (default path: build/stage-report.json). --profile
+also runs each stage under cProfile and writes the slowest stage's stats
+(default path: build/stage-profile.prof).
     
 For Heroku:
     heroku run python update_db.py
@@ -21,33 +33,64 @@ from app.models import (
     DriverEloProgression, 
     RaceResult, 
     DriverTeamHistory, 
-    AppStats
+    DriverEncounter,
+    AppStats,
+    HomeSummary,
+    SchemaInfo,
+    SCHEMA_VERSION
 )
 from app.services import populate_database
+from utils.database import ensure_schema
+from utils.shadow_reseed import shadow_reseed, supports_shadow_reseed
+from utils.snapshot import export_snapshot, snapshot_path_from_argv
+from utils.stage_report import StageReport, report_paths_from_argv
 
 
-def update_rankings(force_rebuild=False):
+def update_rankings(force_rebuild=False, snapshot_path=None, report_path=None, profile_path=None, shadow=False):
     """Update the database with fresh calculations.
     
     Args:
         force_rebuild: If True, clears all existing data before repopulating.
+        snapshot_path: If given, also write a read-only SQLite snapshot there.
+        report_path: If given, write the per-stage report there as JSON.
+        profile_path: If given, profile each stage and write the slowest one's stats there.
+        shadow: If True, rebuild in a shadow schema and swap it in (PostgreSQL only).
     """
     app = create_app()
+    report = StageReport(track_memory=bool(profile_path), profile=bool(profile_path))
     
     with app.app_context():
         print("Starting database update...")
         
-        if force_rebuild:
-            print("Force rebuild requested. Clearing existing data...")
-            RaceResult.query.delete()
-            DriverTeamHistory.query.delete()
-            DriverEloProgression.query.delete()
-            DriverEloRanking.query.delete()
-            AppStats.query.delete()
-            db.session.commit()
+        # Create any tables and indexes added since the database was first seeded
+        with report.stage('schema'):
+            ensure_schema(db, SchemaInfo, SCHEMA_VERSION, force=True)
         
-        # Repopulate database
-        populate_database()
+        if shadow:
+            if not supports_shadow_reseed(db):
+                print("ERROR: --shadow needs a PostgreSQL database.")
+                sys.exit(1)
+            shadow_reseed(
+                db, lambda: populate_database(report),
+                keep=app.config['RESEED_KEEP_VERSIONS'],
+                lock_timeout_ms=app.config['RESEED_LOCK_TIMEOUT_MS'],
+                report=report
+            )
+        else:
+            if force_rebuild:
+                print("Force rebuild requested. Clearing existing data...")
+                with report.stage('clear_tables'):
+                    RaceResult.query.delete()
+                    DriverTeamHistory.query.delete()
+                    DriverEncounter.query.delete()
+                    DriverEloProgression.query.delete()
+                    DriverEloRanking.query.delete()
+                    AppStats.query.delete()
+                    HomeSummary.query.delete()
+                    db.session.commit()
+            
+            # Repopulate database
+            populate_database(report)
         
         print("Database update completed successfully.")
         
@@ -60,15 +103,30 @@ def update_rankings(force_rebuild=False):
         print(f"  - Drivers: {driver_count}")
         print(f"  - ELO Progression Records: {progression_count}")
         print(f"  - Race Results: {race_count}")
+        
+        if snapshot_path:
+            with report.stage('snapshot'):
+                export_snapshot(db, snapshot_path)
+        
+        if report_path:
+            report.finish(report_path, profile_path)
 
 
 if __name__ == "__main__":
     force = '--force' in sys.argv or '-f' in sys.argv
+    shadow = '--shadow' in sys.argv
     
-    if force:
+    if force and not shadow:
         confirm = input("This will delete all existing data. Are you sure? (yes/no): ")
         if confirm.lower() != 'yes':
             print("Aborted.")
             sys.exit(0)
     
-    update_rankings(force_rebuild=force)
+    report_path, profile_path = report_paths_from_argv(sys.argv[1:])
+    update_rankings(
+        force_rebuild=force,
+        snapshot_path=snapshot_path_from_argv(sys.argv[1:]),
+        report_path=report_path,
+        profile_path=profile_path,
+        shadow=shadow
+    )
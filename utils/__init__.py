@@ -1,7 +1,17 @@
 """
 Utility modules for the F1 ELO Rankings application.
-"""
-from utils.visualization import DriverVisualizationUtils
-from utils.database import update_database_from_df
 
+The re-exports are resolved lazily so that importing a light submodule (such
+as utils.metrics) does not pull in pandas and plotly.
+"""
 __all__ = ['DriverVisualizationUtils', 'update_database_from_df']
+
+
+def __getattr__(name):
+    if name == 'DriverVisualizationUtils':
+        from utils.visualization import DriverVisualizationUtils
+        return DriverVisualizationUtils
+    if name == 'update_database_from_df':
+        from utils.database import update_database_from_df
+        return update_database_from_df
+    raise AttributeError(f"module 'utils' has no attribute {name!r}")
@@ -1,7 +1,120 @@
 """
 Database utility functions.
 """
-from sqlalchemy import inspect
+from sqlalchemy import delete, inspect, select
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+# Column mapping between the rankings DataFrame and the DriverEloRanking model
+COLUMN_MAPPING = {
+    'Driver': 'driver',
+    'f1_driver_id': 'f1_driver_id',
+    'Elo Rating': 'elo_rating',
+    'Lower Bound': 'lower_bound',
+    'Upper Bound': 'upper_bound',
+    'Confidence Score': 'confidence_score',
+    'Reliability Grade': 'reliability_grade',
+    'Race Count': 'race_count',
+    'Rating Volatility': 'rating_volatility',
+    'First Year': 'first_year',
+    'Last Year': 'last_year',
+    'Career Span': 'career_span',
+    'Flag Level': 'flag_level',
+    'Glicko Rating': 'glicko_rating',
+    'Glicko RD': 'glicko_rd',
+    'Glicko Volatility': 'glicko_volatility'
+}
+
+
+def create_missing_indexes(db):
+    """
+    Create any model indexes missing from existing tables.
+    
+    db.create_all() only creates indexes together with new tables, so indexes
+    added to a model later are created here.
+    
+    Args:
+        db: SQLAlchemy database instance
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+
+def add_missing_columns(db):
+    """
+    Add nullable model columns missing from existing tables.
+    
+    db.create_all() never alters existing tables, so columns added to a model
+    later are added here with ALTER TABLE. Only nullable columns without
+    server defaults are supported, which is what new columns must be.
+    
+    Args:
+        db: SQLAlchemy database instance
+    """
+    inspector = inspect(db.engine)
+    dialect = db.engine.dialect
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable:
+                raise ValueError(f"Cannot add NOT NULL column {table.name}.{column.name} to an existing table")
+            column_type = column.type.compile(dialect=dialect)
+            with db.engine.begin() as conn:
+                conn.exec_driver_sql(
+                    f"ALTER TABLE {dialect.identifier_preparer.format_table(table)} "
+                    f"ADD COLUMN {dialect.identifier_preparer.format_column(column)} {column_type}"
+                )
+
+
+# Databases already checked in this process, keyed by engine URL
+_checked_schemas = set()
+
+
+def ensure_schema(db, SchemaInfo, version, force=False):
+    """
+    Bring the schema up to date unless the database is already at version.
+    
+    Reads the stored schema version (one small query) instead of running
+    db.create_all() every time, and remembers the result for the rest of the
+    process. Tables, columns and indexes are only created when the stored
+    version is missing or older.
+    
+    Args:
+        db: SQLAlchemy database instance
+        SchemaInfo: The model class recording the schema version
+        version: Schema version the models correspond to
+        force: Create tables, columns and indexes regardless of the stored version
+        
+    Returns:
+        bool: True if tables, columns and indexes were (re)created
+    """
+    key = str(db.engine.url)
+    if key in _checked_schemas and not force:
+        return False
+    
+    current = None
+    if not force:
+        try:
+            current = db.session.execute(select(db.func.max(SchemaInfo.version))).scalar()
+        except (OperationalError, ProgrammingError):
+            # Schema version table does not exist yet
+            db.session.rollback()
+    
+    updated = current is None or current < version
+    if updated:
+        db.create_all()
+        add_missing_columns(db)
+        create_missing_indexes(db)
+        db.session.execute(delete(SchemaInfo))
+        db.session.add(SchemaInfo(version=version))
+        db.session.commit()
+    
+    _checked_schemas.add(key)
+    return updated
 
 
 def update_database_from_df(db, DriverEloRanking, df):
@@ -13,23 +126,6 @@ def update_database_from_df(db, DriverEloRanking, df):
         DriverEloRanking: The model class for driver rankings
         df: DataFrame containing driver ranking data
     """
-    # Define column mapping between DataFrame and model
-    column_mapping = {
-        'Driver': 'driver',
-        'f1_driver_id': 'f1_driver_id',
-        'Elo Rating': 'elo_rating',
-        'Lower Bound': 'lower_bound',
-        'Upper Bound': 'upper_bound',
-        'Confidence Score': 'confidence_score',
-        'Reliability Grade': 'reliability_grade',
-        'Race Count': 'race_count',
-        'Rating Volatility': 'rating_volatility',
-        'First Year': 'first_year',
-        'Last Year': 'last_year',
-        'Career Span': 'career_span',
-        'Flag Level': 'flag_level'
-    }
-    
     # Get the current model columns using SQLAlchemy inspector
     inspector = inspect(DriverEloRanking)
     model_columns = [c.key for c in inspector.columns if c.key != 'id']
@@ -37,7 +133,7 @@ def update_database_from_df(db, DriverEloRanking, df):
     for _, row in df.iterrows():
         # Convert DataFrame row to model column names
         record_data = {}
-        for df_col, model_col in column_mapping.items():
+        for df_col, model_col in COLUMN_MAPPING.items():
             if model_col in model_columns and df_col in row:
                 record_data[model_col] = row[df_col]
         
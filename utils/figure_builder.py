@@ -0,0 +1,127 @@
+"""
+Validation-free Plotly figure builder.
+
+go.Figure and plotly.express run every property through Plotly's validators,
+which dominates the CPU cost of building a chart on the server. The charts in
+this app only ever use a fixed set of known-good properties, so they are
+emitted here as plain figure dicts and serialized with validation turned off.
+
+The default Plotly template, which go.Figure would attach to every layout, is
+resolved once per process and shared by all figures.
+"""
+import plotly.io as pio
+
+# Shared layout fragments used across charts
+TRANSPARENT_BACKGROUND = {
+    'plot_bgcolor': 'rgba(0,0,0,0)',
+    'paper_bgcolor': 'rgba(0,0,0,0)',
+}
+GRID_COLOR = 'rgba(128,128,128,0.2)'
+
+# First colour of the default template's colorway, used by plotly.express
+DEFAULT_TRACE_COLOR = '#636efa'
+
+_templates = {}
+
+
+def default_template():
+    """Return the default Plotly template as a plain dict, resolved once per process."""
+    name = pio.templates.default
+    template = _templates.get(name)
+    if template is None:
+        template = pio.templates[name].to_plotly_json()
+        _templates[name] = template
+    return template
+
+
+def grid_axis(title=None, **extra):
+    """Axis with the light grid used throughout the site."""
+    axis = {'showgrid': True, 'gridwidth': 1, 'gridcolor': GRID_COLOR}
+    if title is not None:
+        axis['title'] = {'text': title}
+    axis.update(extra)
+    return axis
+
+
+def as_list(values):
+    """Convert a pandas Series or NumPy array to a plain list for JSON encoding."""
+    return values.tolist() if hasattr(values, 'tolist') else list(values)
+
+
+class FigureDict:
+    """
+    Minimal drop-in for go.Figure holding plain 'data' and 'layout' dicts.
+
+    Supports the subset of the go.Figure API the app uses: add_trace,
+    update_layout, to_dict, to_json and to_html.
+    """
+
+    def __init__(self, data=None, layout=None):
+        self.data = list(data or [])
+        self.layout = {'template': default_template()}
+        if layout:
+            self.layout.update(layout)
+
+    def add_trace(self, trace):
+        """Append a trace dict (must include 'type')."""
+        self.data.append(trace)
+        return self
+
+    def update_layout(self, **layout):
+        """Shallow-merge keys into the layout."""
+        self.layout.update(layout)
+        return self
+
+    def to_dict(self):
+        return {'data': self.data, 'layout': self.layout}
+
+    def to_plotly_json(self):
+        return self.to_dict()
+
+    def to_json(self, **kwargs):
+        return pio.to_json(self.to_dict(), validate=False, **kwargs)
+
+    def to_html(self, **kwargs):
+        return pio.to_html(self.to_dict(), validate=False, **kwargs)
+
+
+class TeamColorResolver:
+    """
+    Resolve team names to chart colours.
+
+    A team matches a palette entry when either name contains the other
+    (case-insensitive); the first entry in palette order wins. The lowercased
+    palette is built once and every resolved team name is memoized, so the
+    substring scan runs at most once per distinct team per process. Teams
+    without a match get fallback colours in order of first appearance.
+    """
+
+    def __init__(self, team_colors, fallback_palette):
+        self._palette = [(key.lower(), color) for key, color in team_colors.items()]
+        self._fallback = list(fallback_palette)
+        self._resolved = {}
+
+    def known_color(self, team):
+        """Return the palette colour for a team, or None if it has none."""
+        try:
+            return self._resolved[team]
+        except KeyError:
+            lowered = team.lower()
+            color = next(
+                (c for key, c in self._palette if key in lowered or lowered in key),
+                None
+            )
+            self._resolved[team] = color
+            return color
+
+    def color_map(self, teams):
+        """Assign colours to teams, handing out fallback colours in order."""
+        color_map = {}
+        fallback_index = 0
+        for team in teams:
+            color = self.known_color(team)
+            if color is None:
+                color = self._fallback[fallback_index % len(self._fallback)]
+                fallback_index += 1
+            color_map[team] = color
+        return color_map
@@ -0,0 +1,219 @@
+"""
+Lightweight in-process metrics with Prometheus text exposition.
+
+Metrics are plain Python counters, gauges and fixed-bucket histograms guarded
+by a lock. Recording an observation is a bisect plus a few integer
+increments; formatting only happens when /metrics is scraped, so the cost
+when no scraper is attached stays negligible.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+# Latency buckets in seconds, from sub-millisecond SQL up to slow page renders
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    """Escape a label value for the text exposition format."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames, values, extra=None):
+    """Format label pairs as {a="x",b="y"}."""
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    """Monotonic counter keyed by label values."""
+
+    type_name = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        """Increment the counter for the given label values."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        """Yield (suffix, label string, value) tuples."""
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in sorted(items):
+            yield '_total', _format_labels(self.labelnames, labels), value
+
+
+class Gauge:
+    """Current value keyed by label values, set rather than accumulated."""
+
+    type_name = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value, *labels):
+        """Set the gauge for the given label values."""
+        with self._lock:
+            self._values[labels] = value
+
+    def samples(self):
+        """Yield (suffix, label string, value) tuples."""
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in sorted(items):
+            yield '', _format_labels(self.labelnames, labels), value
+
+
+class Histogram:
+    """Fixed-bucket histogram keyed by label values."""
+
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        """Record a single observation for the given label values."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = [0] * (len(self.buckets) + 1) + [0.0]
+                self._values[labels] = state
+            state[index] += 1
+            state[-1] += value
+
+    def samples(self):
+        """Yield (suffix, label string, value) tuples with cumulative buckets."""
+        with self._lock:
+            items = [(labels, list(state)) for labels, state in self._values.items()]
+        for labels, state in sorted(items):
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                yield '_bucket', _format_labels(self.labelnames, labels, ('le', repr(bound))), cumulative
+            cumulative += state[len(self.buckets)]
+            yield '_bucket', _format_labels(self.labelnames, labels, ('le', '+Inf')), cumulative
+            yield '_sum', _format_labels(self.labelnames, labels), state[-1]
+            yield '_count', _format_labels(self.labelnames, labels), cumulative
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together in Prometheus text format."""
+
+    def __init__(self):
+        self.enabled = True
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """Get or create a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        """Get or create a gauge."""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Get or create a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type_name}')
+            for suffix, labels, value in metric.samples():
+                lines.append(f'{metric.name}{suffix}{labels} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+# Global registry used by the application
+registry = MetricsRegistry()
+
+chart_duration = registry.histogram(
+    'f1elo_chart_duration_seconds',
+    'Time spent building and serializing Plotly charts.',
+    ('chart', 'phase')
+)
+
+
+@contextmanager
+def timed(histogram, *labels):
+    """Context manager recording the duration of its block in a histogram."""
+    if not registry.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, *labels)
+
+
+def timed_chart(func):
+    """Decorator recording the build time of a chart method, labelled e.g. 'top_drivers'."""
+    chart_name = func.__name__.removeprefix('create_').removesuffix('_chart')
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not registry.enabled:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            chart_duration.observe(time.perf_counter() - start, chart_name, 'build')
+    return wrapper
+
+
+def chart_to_html(fig, chart_name, **kwargs):
+    """
+    Serialize a figure as a div, recording the time taken.
+
+    Defaults to full_html=False and include_plotlyjs=False: base.html loads
+    plotly.js once, and inlining the 4.6 MB bundle into every chart made a
+    driver page about 19 MB.
+    """
+    kwargs.setdefault('full_html', False)
+    kwargs.setdefault('include_plotlyjs', False)
+    if not registry.enabled:
+        return fig.to_html(**kwargs)
+    start = time.perf_counter()
+    html = fig.to_html(**kwargs)
+    chart_duration.observe(time.perf_counter() - start, chart_name, 'to_html')
+    return html
@@ -0,0 +1,246 @@
+"""
+Compact race-by-race ELO series for client-side driver comparison.
+
+Every change of selection on /compare used to be a round trip to the Python
+function, which queried the series and rendered a new chart. The static build
+instead writes every driver's series to a handful of small binary files under
+the static folder, so the browser can fetch the drivers it needs once and
+assemble any comparison itself.
+
+Drivers are sharded by id (DRIVERS_PER_SHARD consecutive ids per file). A
+shard is the magic bytes followed by unsigned LEB128 varints:
+
+    driver count
+    per driver: id, race count n, then four columns of n values each
+        race_number  delta from the previous race, zigzag encoded
+        race         delta of the index into the index file's race table, zigzag
+        position     finishing position + 1, or 0 if there is none
+        elo          delta of round(elo_rating * ELO_SCALE), zigzag encoded
+
+Shard file names carry a hash of their contents, so they never change and can
+be cached for good. The index file, named after the data version it was built
+from, lists the shards, the race table (name and date) and the driver names.
+The compare page only uses a bundle built for the data it is serving.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+
+FORMAT_VERSION = 1
+MAGIC = b'F1S' + bytes([FORMAT_VERSION])
+
+# Directory of the bundle inside the static folder
+SERIES_DIR = 'series'
+DEFAULT_SERIES_PATH = os.path.join('static', SERIES_DIR)
+
+DRIVERS_PER_SHARD = 32
+
+# Cache lifetime of the content-addressed shard files (one year)
+SHARD_MAX_AGE = 31536000
+
+# ELO ratings are stored as integers in 1/ELO_SCALE steps
+ELO_SCALE = 100
+
+
+def index_filename(data_version):
+    """Name of the index file for a data version."""
+    return f"index-{data_version}.json"
+
+
+def shard_of(driver_id, drivers_per_shard=DRIVERS_PER_SHARD):
+    return driver_id // drivers_per_shard
+
+
+def _zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, offset):
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _write_deltas(out, values):
+    previous = 0
+    for value in values:
+        _write_varint(out, _zigzag(value - previous))
+        previous = value
+
+
+def _read_deltas(data, offset, count):
+    values, total = [], 0
+    for _ in range(count):
+        delta, offset = _read_varint(data, offset)
+        total += _unzigzag(delta)
+        values.append(total)
+    return values, offset
+
+
+def encode_shard(series):
+    """
+    Encode drivers' series as one shard.
+
+    Args:
+        series: Dict mapping driver id to a dict of equal-length lists
+                'race_number', 'race' (race table index), 'position'
+                (None for no position) and 'elo' (scaled integers)
+
+    Returns:
+        bytes: Shard contents
+    """
+    out = bytearray(MAGIC)
+    _write_varint(out, len(series))
+    for driver_id in sorted(series):
+        columns = series[driver_id]
+        _write_varint(out, driver_id)
+        _write_varint(out, len(columns['race_number']))
+        _write_deltas(out, columns['race_number'])
+        _write_deltas(out, columns['race'])
+        for position in columns['position']:
+            _write_varint(out, 0 if position is None else position + 1)
+        _write_deltas(out, columns['elo'])
+    return bytes(out)
+
+
+def decode_shard(data):
+    """
+    Decode a shard written by encode_shard.
+
+    Returns:
+        dict: Driver id to columns, in the form encode_shard takes
+
+    Raises:
+        ValueError: If the data is not a shard of this format version
+    """
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"Not a series shard of format version {FORMAT_VERSION}")
+    offset = len(MAGIC)
+    count, offset = _read_varint(data, offset)
+    series = {}
+    for _ in range(count):
+        driver_id, offset = _read_varint(data, offset)
+        n, offset = _read_varint(data, offset)
+        race_numbers, offset = _read_deltas(data, offset, n)
+        races, offset = _read_deltas(data, offset, n)
+        positions = []
+        for _ in range(n):
+            position, offset = _read_varint(data, offset)
+            positions.append(position - 1 if position else None)
+        elos, offset = _read_deltas(data, offset, n)
+        series[driver_id] = {'race_number': race_numbers, 'race': races, 'position': positions, 'elo': elos}
+    return series
+
+
+def _write_file(path, data):
+    """Write a file next to its destination and move it into place."""
+    temporary = f"{path}.tmp"
+    with open(temporary, 'wb') as f:
+        f.write(data)
+    os.replace(temporary, path)
+
+
+def write_series_bundle(directory, data_version, rows, drivers_per_shard=DRIVERS_PER_SHARD):
+    """
+    Write the shards and index for one data version, removing older bundles.
+
+    Shards are written before the index, so a reader that finds the index
+    also finds every file it lists.
+
+    Args:
+        directory: Output directory (the static folder's SERIES_DIR)
+        data_version: Data version the rows were read at
+        rows: (driver id, driver name, race_number, race_name, race_date,
+              position, elo_rating) tuples ordered by driver id and race_number
+        drivers_per_shard: Consecutive driver ids per shard
+
+    Returns:
+        dict: The index
+    """
+    rows = list(rows)
+    races = sorted({(race_date, race_name) for _, _, _, race_name, race_date, _, _ in rows})
+    race_index = {race: i for i, race in enumerate(races)}
+
+    shards, names = {}, {}
+    for driver_id, name, race_number, race_name, race_date, position, elo_rating in rows:
+        names[driver_id] = name
+        columns = shards.setdefault(shard_of(driver_id, drivers_per_shard), {}).setdefault(
+            driver_id, {'race_number': [], 'race': [], 'position': [], 'elo': []}
+        )
+        columns['race_number'].append(race_number)
+        columns['race'].append(race_index[(race_date, race_name)])
+        columns['position'].append(position)
+        columns['elo'].append(round(elo_rating * ELO_SCALE))
+
+    os.makedirs(directory, exist_ok=True)
+    files = {}
+    for shard, series in sorted(shards.items()):
+        data = encode_shard(series)
+        filename = f"{shard}.{hashlib.sha256(data).hexdigest()[:12]}.bin"
+        _write_file(os.path.join(directory, filename), data)
+        files[str(shard)] = filename
+
+    index = {
+        'format': FORMAT_VERSION,
+        'data_version': data_version,
+        'generated_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'drivers_per_shard': drivers_per_shard,
+        'elo_scale': ELO_SCALE,
+        'shards': files,
+        'races': [[race_name, race_date] for race_date, race_name in races],
+        'drivers': {str(driver_id): name for driver_id, name in names.items()}
+    }
+    index_name = index_filename(data_version)
+    _write_file(
+        os.path.join(directory, index_name),
+        json.dumps(index, separators=(',', ':')).encode('utf-8')
+    )
+
+    keep = set(files.values()) | {index_name}
+    for filename in os.listdir(directory):
+        if filename not in keep:
+            os.remove(os.path.join(directory, filename))
+    return index
+
+
+def read_series(directory, data_version, driver_id):
+    """
+    Read one driver's series back from a bundle, as the browser does.
+
+    Returns:
+        dict: Lists 'race_number', 'race_name', 'race_date', 'elo_rating'
+              and 'position', or None if the driver is not in the bundle
+    """
+    with open(os.path.join(directory, index_filename(data_version))) as f:
+        index = json.load(f)
+    filename = index['shards'].get(str(shard_of(driver_id, index['drivers_per_shard'])))
+    if filename is None:
+        return None
+    with open(os.path.join(directory, filename), 'rb') as f:
+        columns = decode_shard(f.read()).get(driver_id)
+    if columns is None:
+        return None
+    return {
+        'race_number': columns['race_number'],
+        'race_name': [index['races'][race][0] for race in columns['race']],
+        'race_date': [index['races'][race][1] for race in columns['race']],
+        'elo_rating': [elo / index['elo_scale'] for elo in columns['elo']],
+        'position': columns['position']
+    }
@@ -0,0 +1,193 @@
+"""
+Zero-downtime reseeding through a shadow schema (PostgreSQL).
+
+A normal reseed deletes and reinserts the data tables in place, so readers
+see empty or half-written tables until it commits. With --shadow the seed
+scripts instead build every data table in a separate schema while the live
+tables keep serving, then swap them in with ALTER TABLE ... SET SCHEMA in a
+single transaction. The replaced tables move to a retired schema, kept for
+inspection or manual rollback until a later reseed drops them.
+
+Tables in LIVE_ONLY_TABLES (the schema version and the contact form outbox)
+are not rebuilt and stay where they are.
+"""
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from utils.stage_report import StageReport
+
+# Schema the new tables are built in
+BUILD_SCHEMA = 'f1elo_build'
+
+# Replaced tables move to a schema named with this prefix and a timestamp
+RETIRED_SCHEMA_PREFIX = 'f1elo_retired_'
+
+# Tables that are not part of the dataset and stay in the live schema
+LIVE_ONLY_TABLES = ('schema_info', 'outbox_message')
+
+# PostgreSQL error code for lock_timeout expiring
+LOCK_NOT_AVAILABLE = '55P03'
+
+
+def supports_shadow_reseed(db):
+    """Shadow reseeding needs schemas and transactional DDL, i.e. PostgreSQL."""
+    return db.engine.dialect.name == 'postgresql'
+
+
+def data_tables(db):
+    """The tables a reseed rebuilds, in dependency order."""
+    return [table for table in db.metadata.sorted_tables if table.name not in LIVE_ONLY_TABLES]
+
+
+def _quote(db, name):
+    return db.engine.dialect.identifier_preparer.quote(name)
+
+
+@contextmanager
+def building_in_shadow(db):
+    """
+    Route the app's database session to a fresh build schema.
+
+    Inside the block every query and write through db.session (and
+    db.engine) goes to empty copies of the data tables in BUILD_SCHEMA;
+    the live tables are untouched. Swap them in with swap_shadow_tables.
+
+    Args:
+        db: SQLAlchemy database instance (inside an app context)
+    """
+    engines = db.engines
+    live = engines[None]
+    db.session.close()
+    with live.begin() as conn:
+        conn.exec_driver_sql(f"DROP SCHEMA IF EXISTS {_quote(db, BUILD_SCHEMA)} CASCADE")
+        conn.exec_driver_sql(f"CREATE SCHEMA {_quote(db, BUILD_SCHEMA)}")
+
+    engines[None] = live.execution_options(schema_translate_map={None: BUILD_SCHEMA})
+    try:
+        db.metadata.create_all(engines[None], tables=data_tables(db))
+        yield
+    except BaseException:
+        db.session.rollback()
+        engines[None] = live
+        with live.begin() as conn:
+            conn.exec_driver_sql(f"DROP SCHEMA IF EXISTS {_quote(db, BUILD_SCHEMA)} CASCADE")
+        raise
+    finally:
+        db.session.close()
+        engines[None] = live
+
+
+def swap_shadow_tables(db, lock_timeout_ms=1000, attempts=10):
+    """
+    Replace the live data tables with the ones built in BUILD_SCHEMA, atomically.
+
+    Each live table moves to a new retired schema and its replacement moves
+    into the live schema, with their indexes and sequences, in one
+    transaction: readers see either every old table or every new one. The
+    renames wait at most lock_timeout_ms for running queries, so readers
+    never queue behind the swap for longer; on timeout it is retried.
+
+    Args:
+        db: SQLAlchemy database instance (inside an app context)
+        lock_timeout_ms: Longest wait for a table lock per attempt
+        attempts: Number of attempts before giving up
+
+    Returns:
+        str: Name of the schema now holding the replaced tables
+
+    Raises:
+        OperationalError: If the tables stayed locked for every attempt
+    """
+    tables = [table.name for table in data_tables(db)]
+    retired = f"{RETIRED_SCHEMA_PREFIX}{datetime.utcnow():%Y%m%d%H%M%S%f}"
+
+    for attempt in range(1, attempts + 1):
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(text(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}"))
+                live_schema = conn.execute(text("SELECT current_schema()")).scalar()
+                existing = set(conn.execute(
+                    text("SELECT tablename FROM pg_tables WHERE schemaname = :schema"),
+                    {'schema': live_schema}
+                ).scalars())
+
+                conn.exec_driver_sql(f"CREATE SCHEMA {_quote(db, retired)}")
+                for name in tables:
+                    if name in existing:
+                        conn.exec_driver_sql(
+                            f"ALTER TABLE {_quote(db, live_schema)}.{_quote(db, name)} SET SCHEMA {_quote(db, retired)}"
+                        )
+                    conn.exec_driver_sql(
+                        f"ALTER TABLE {_quote(db, BUILD_SCHEMA)}.{_quote(db, name)} SET SCHEMA {_quote(db, live_schema)}"
+                    )
+                conn.exec_driver_sql(f"DROP SCHEMA {_quote(db, BUILD_SCHEMA)}")
+            return retired
+        except OperationalError as e:
+            if getattr(e.orig, 'pgcode', None) != LOCK_NOT_AVAILABLE or attempt == attempts:
+                raise
+            print(f"Tables busy, retrying swap ({attempt}/{attempts})...")
+            time.sleep(min(0.1 * 2 ** attempt, 2))
+
+
+def retired_versions(db):
+    """Retired schemas, newest first."""
+    with db.engine.connect() as conn:
+        return list(conn.execute(
+            text("SELECT nspname FROM pg_namespace WHERE starts_with(nspname, :prefix) ORDER BY nspname DESC"),
+            {'prefix': RETIRED_SCHEMA_PREFIX}
+        ).scalars())
+
+
+def drop_retired_versions(db, keep=1):
+    """
+    Drop retired table versions except the newest `keep`.
+
+    Args:
+        db: SQLAlchemy database instance (inside an app context)
+        keep: Number of retired versions to keep
+
+    Returns:
+        list: Names of the dropped schemas
+    """
+    dropped = retired_versions(db)[max(keep, 0):]
+    for name in dropped:
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql(f"DROP SCHEMA {_quote(db, name)} CASCADE")
+    return dropped
+
+
+def shadow_reseed(db, populate, keep=1, lock_timeout_ms=1000, report=None):
+    """
+    Rebuild the data tables in a shadow schema, swap them in and drop old versions.
+
+    Args:
+        db: SQLAlchemy database instance (inside an app context)
+        populate: Callable filling the (empty) data tables through db.session
+        keep: Retired versions to keep after the swap
+        lock_timeout_ms: Longest wait for a table lock per swap attempt
+        report: Optional StageReport for the swap and cleanup stages
+
+    Returns:
+        str: Name of the schema holding the replaced tables
+    """
+    if report is None:
+        report = StageReport()
+
+    print(f"Building new tables in schema {BUILD_SCHEMA}; the live tables keep serving...")
+    with building_in_shadow(db):
+        populate()
+
+    print("Swapping the new tables in...")
+    with report.stage('swap'):
+        retired = swap_shadow_tables(db, lock_timeout_ms=lock_timeout_ms)
+    with report.stage('drop_retired'):
+        dropped = drop_retired_versions(db, keep=keep)
+
+    print(f"Previous tables moved to schema {retired}")
+    for name in dropped:
+        print(f"Dropped retired schema {name}")
+    return retired
@@ -0,0 +1,100 @@
+"""
+Read-only SQLite snapshot of the seeded database.
+
+The dataset only changes on reseed, so the seed scripts can write every table
+and index into one compact SQLite file that ships with the deploy. Pointing
+DATABASE_SNAPSHOT at that file serves all reads locally, opened read-only and
+immutable with memory-mapped I/O, instead of over the network.
+"""
+import os
+
+from sqlalchemy import create_engine, insert, select
+
+DEFAULT_SNAPSHOT_PATH = os.path.join('snapshot', 'f1-elo.sqlite')
+
+# Tables whose rows stay out of the snapshot: the outbox holds visitors' email
+SKIPPED_TABLES = ('outbox_message',)
+
+
+def snapshot_uri(path):
+    """
+    SQLAlchemy URI opening a snapshot read-only.
+
+    immutable=1 tells SQLite the file cannot change, so it skips locking and
+    change detection entirely.
+    """
+    return f"sqlite:///file:{os.path.abspath(path)}?mode=ro&immutable=1&uri=true"
+
+
+def snapshot_path_from_argv(argv):
+    """
+    Parse the seed scripts' --snapshot[=PATH] flag.
+
+    Returns:
+        str: Snapshot path, or None if the flag was not given
+    """
+    for arg in argv:
+        if arg == '--snapshot':
+            return DEFAULT_SNAPSHOT_PATH
+        if arg.startswith('--snapshot='):
+            return arg.split('=', 1)[1]
+    return None
+
+
+def export_snapshot(db, path):
+    """Write a snapshot and print a summary; used by the seed scripts."""
+    print(f"\nWriting read-only snapshot to {path}...")
+    counts = write_snapshot(db, path)
+    size_mb = os.path.getsize(path) / 1_048_576
+    print(f"Snapshot written: {sum(counts.values())} rows in {len(counts)} tables, {size_mb:.1f} MB")
+    return counts
+
+
+def write_snapshot(db, path, chunk_size=5000):
+    """
+    Copy every table and index of the current database into a SQLite file.
+    
+    Tables in SKIPPED_TABLES are created empty.
+
+    The file is written next to the destination and moved into place once
+    complete, so a reader never sees a partial snapshot.
+
+    Args:
+        db: SQLAlchemy database instance (inside an app context)
+        path: Destination file
+        chunk_size: Rows fetched and inserted per batch
+
+    Returns:
+        dict: Row count per table
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    engine = create_engine(f"sqlite:///{tmp_path}")
+    counts = {}
+    try:
+        db.metadata.create_all(engine)
+        with engine.begin() as conn:
+            for table in db.metadata.sorted_tables:
+                if table.name in SKIPPED_TABLES:
+                    continue
+                counts[table.name] = 0
+                result = db.session.execute(
+                    select(table).order_by(*table.primary_key.columns).execution_options(yield_per=chunk_size)
+                )
+                for rows in result.mappings().partitions():
+                    conn.execute(insert(table), [dict(row) for row in rows])
+                    counts[table.name] += len(rows)
+
+        # Planner statistics, then rewrite the file compactly
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.exec_driver_sql('ANALYZE')
+            conn.exec_driver_sql('VACUUM')
+    finally:
+        engine.dispose()
+
+    os.replace(tmp_path, path)
+    return counts
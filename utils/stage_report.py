@@ -0,0 +1,218 @@
+"""
+Per-stage timing and memory report for the database rebuild scripts.
+
+update_db.py and seed_neon.py run populate_database as a series of named
+stages (CSV loading, process_races, ranking export, database writes, ...).
+Each stage records wall time, CPU time (including finished child processes,
+such as the row-building pool), how much the process's resident memory grew
+and, on Linux, its peak RSS during the stage, and the number of rows it
+produced, so a slow or memory-hungry rebuild can be traced to its stage. With
+profiling on, every stage also runs under cProfile and tracemalloc, adding
+its peak traced Python memory, and the slowest stage's statistics are kept.
+Both slow the rebuild down several times, so they are off by default.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_REPORT_PATH = os.path.join('build', 'stage-report.json')
+DEFAULT_PROFILE_PATH = os.path.join('build', 'stage-profile.prof')
+
+
+def report_paths_from_argv(argv):
+    """
+    Parse the rebuild scripts' --stage-report[=PATH] and --profile[=PATH] flags.
+
+    Returns:
+        tuple: (JSON report path, cProfile output path or None)
+    """
+    report_path, profile_path = DEFAULT_REPORT_PATH, None
+    for arg in argv:
+        if arg.startswith('--stage-report='):
+            report_path = arg.split('=', 1)[1]
+        elif arg == '--profile':
+            profile_path = DEFAULT_PROFILE_PATH
+        elif arg.startswith('--profile='):
+            profile_path = arg.split('=', 1)[1]
+    return report_path, profile_path
+
+
+def _children_cpu_seconds():
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _rss_mb():
+    """Current resident set size of this process, or None where unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE') / 1_048_576
+
+
+def _reset_peak_rss():
+    """Reset the kernel's RSS high-water mark for this process; False where unsupported."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        return False
+    return True
+
+
+def _peak_rss_mb():
+    """RSS high-water mark of this process since the last reset, or None where unavailable."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class StageReport:
+    """
+    Measurements for a sequence of named stages.
+
+    Usage:
+        report = StageReport()
+        with report.stage('load_data') as stage:
+            ...
+            stage['rows'] = len(frame)
+
+    Args:
+        track_memory: Record peak traced memory per stage (starts tracemalloc)
+        profile: Run each stage under cProfile
+    """
+
+    def __init__(self, track_memory=False, profile=False):
+        self.track_memory = track_memory
+        self.profile = profile
+        self.stages = []
+        self._profiles = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Measure the enclosed block as one stage; the yielded dict takes 'rows'."""
+        record = {'name': name, 'rows': None}
+        rss_start = _rss_mb()
+        peak_reset = _reset_peak_rss()
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        profiler = cProfile.Profile() if self.profile else None
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        children_start = _children_cpu_seconds()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self._profiles[name] = profiler
+            record['wall_s'] = round(time.perf_counter() - wall_start, 3)
+            record['cpu_s'] = round(time.process_time() - cpu_start, 3)
+            record['child_cpu_s'] = round(_children_cpu_seconds() - children_start, 3)
+            rss_end = _rss_mb()
+            peak = _peak_rss_mb() if peak_reset else None
+            record['rss_growth_mb'] = (
+                round(rss_end - rss_start, 1) if rss_start is not None and rss_end is not None else None
+            )
+            record['peak_rss_mb'] = None if peak is None else round(peak, 1)
+            record['traced_peak_mb'] = (
+                round(tracemalloc.get_traced_memory()[1] / 1_048_576, 1) if self.track_memory else None
+            )
+            self.stages.append(record)
+
+    @property
+    def slowest(self):
+        """The stage with the longest wall time, or None."""
+        return max(self.stages, key=lambda record: record['wall_s'], default=None)
+
+    def summary(self):
+        """The stages as a text table, with totals."""
+        def mb(value):
+            return '-' if value is None else f"{value:.1f}"
+
+        lines = [
+            f"{'Stage':<24}{'Wall':>10}{'CPU':>10}{'Child CPU':>11}{'RSS +MB':>10}{'Peak RSS MB':>13}"
+            f"{'Traced MB':>11}{'Rows':>11}",
+            '-' * 100
+        ]
+        for record in self.stages:
+            rows = '-' if record['rows'] is None else f"{record['rows']:,}"
+            lines.append(
+                f"{record['name']:<24}{record['wall_s']:>9.2f}s{record['cpu_s']:>9.2f}s"
+                f"{record['child_cpu_s']:>10.2f}s{mb(record['rss_growth_mb']):>10}"
+                f"{mb(record['peak_rss_mb']):>13}"
+                f"{mb(record['traced_peak_mb']):>11}{rows:>11}"
+            )
+        lines.append('-' * 100)
+        lines.append(
+            f"{'total':<24}{sum(r['wall_s'] for r in self.stages):>9.2f}s"
+            f"{sum(r['cpu_s'] for r in self.stages):>9.2f}s"
+            f"{sum(r['child_cpu_s'] for r in self.stages):>10.2f}s"
+        )
+        return '\n'.join(lines)
+
+    def to_dict(self):
+        slowest = self.slowest
+        return {
+            'stages': self.stages,
+            'total_wall_s': round(sum(record['wall_s'] for record in self.stages), 3),
+            'slowest_stage': slowest['name'] if slowest else None
+        }
+
+    def write_json(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def dump_slowest_profile(self, path, top=20):
+        """
+        Write the slowest stage's cProfile statistics to path.
+
+        Returns:
+            str: Its top functions by cumulative time, or None if not profiling
+        """
+        slowest = self.slowest
+        if slowest is None or slowest['name'] not in self._profiles:
+            return None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        profiler = self._profiles[slowest['name']]
+        profiler.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(top)
+        return out.getvalue()
+
+    def finish(self, report_path, profile_path=None):
+        """Print the summary, write the JSON report and, if profiling, the slowest stage's profile."""
+        print("\nStage report:")
+        print(self.summary())
+        self.write_json(report_path)
+        print(f"Stage report written to {report_path}")
+        if profile_path:
+            stats = self.dump_slowest_profile(profile_path)
+            if stats is not None:
+                print(f"\ncProfile of the slowest stage ({self.slowest['name']}) written to {profile_path}:")
+                print(stats)
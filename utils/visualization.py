@@ -2,420 +2,526 @@
 Visualization utilities for creating Plotly charts.
 """
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 import numpy as np
 
+from utils.figure_builder import (
+    DEFAULT_TRACE_COLOR,
+    TRANSPARENT_BACKGROUND,
+    FigureDict,
+    TeamColorResolver,
+    as_list,
+    grid_axis,
+)
+from utils.metrics import timed_chart
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Select points with the Largest-Triangle-Three-Buckets algorithm.
+    
+    The first and last points are always kept. The points in between are
+    split into threshold - 2 buckets, and from each bucket the point forming
+    the largest triangle with the previously selected point and the average
+    of the next bucket is kept. This preserves the visual shape of the series,
+    including local peaks and troughs.
+    
+    Args:
+        x: Sequence of x values, sorted ascending
+        y: Sequence of y values
+        threshold: Number of points to keep
+        
+    Returns:
+        numpy.ndarray: Sorted indices of the selected points
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    bucket_size = (n - 2) / (threshold - 2)
+    
+    selected = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        
+        areas = np.abs(
+            (x[selected] - avg_x) * (y[start:end] - y[selected]) -
+            (x[selected] - x[start:end]) * (avg_y - y[selected])
+        )
+        selected = start + int(np.argmax(areas))
+        indices[i + 1] = selected
+    
+    return indices
+
+
+def downsample_indices(x, y, threshold):
+    """
+    Downsample a series with LTTB while keeping its global maximum and minimum.
+    
+    Args:
+        x: Sequence of x values, sorted ascending
+        y: Sequence of y values
+        threshold: Target number of points. None or 0 disables downsampling.
+        
+    Returns:
+        numpy.ndarray: Sorted indices of the points to plot
+    """
+    n = len(x)
+    if not threshold or n <= threshold:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    # LTTB gets two fewer slots so the career peak and low can be added back
+    indices = lttb_indices(x, y, max(3, threshold - 2))
+    return np.union1d(indices, [int(np.argmax(y)), int(np.argmin(y))])
+
+
+# Reliability grades in display order, with their chart colours
+GRADE_ORDER = ['A+', 'A', 'B+', 'B', 'C+', 'C', 'D+', 'D', 'F']
+GRADE_COLORS = {
+    'A+': '#198754', 'A': '#28a745', 'B+': '#0d6efd', 'B': '#3d8bfd',
+    'C+': '#fd7e14', 'C': '#ffc107', 'D+': '#dc3545', 'D': '#e35d6a',
+    'F': '#343a40'
+}
+
+# F1 team colors - a curated palette for visual distinction
+TEAM_COLORS = {
+    # Current/Recent Teams
+    'Red Bull': '#1E41FF',
+    'Ferrari': '#DC0000',
+    'Mercedes': '#00D2BE',
+    'McLaren': '#FF8700',
+    'Aston Martin': '#006F62',
+    'Alpine F1 Team': '#0090FF',
+    'Williams': '#005AFF',
+    'RB F1 Team': '#2B4562',
+    'Sauber': '#900000',
+    'Haas F1 Team': '#B6BABD',
+    # Historical Teams
+    'Lotus': '#C6A800',
+    'Brabham': '#2E8B57',
+    'Tyrrell': '#00008B',
+    'BRM': '#006400',
+    'Cooper': '#4169E1',
+    'Renault': '#FFF500',
+    'Jordan': '#EBC100',
+    'BAR': '#CCCCCC',
+    'Benetton': '#00D2BE',
+    'Ligier': '#0066CC',
+    'Minardi': '#191919',
+    'Arrows': '#FF6600',
+    'March': '#FF4500',
+    'Surtees': '#8B0000',
+    'Shadow': '#1C1C1C',
+    'Prost': '#1E90FF',
+    'Jaguar': '#0A5C36',
+    'Toyota': '#CC0000',
+    'Honda': '#CCCCCC',
+    'Toro Rosso': '#469BFF',
+    'Racing Point': '#F596C8',
+    'Force India': '#FF5F1F',
+    'Lotus F1': '#B6860E',
+    'Caterham': '#00994C',
+    'Marussia': '#6E0000',
+    'HRT': '#A49E8C',
+    'Virgin': '#C82D2D',
+    'Alfa Romeo': '#900000',
+    'AlphaTauri': '#2B4562',
+    'Maserati': '#9B111E',
+}
+
+# Distinct colors for teams not in TEAM_COLORS
+DEFAULT_TEAM_PALETTE = [
+    '#E63946', '#F4A261', '#2A9D8F', '#264653', '#E9C46A',
+    '#8338EC', '#3A86FF', '#06D6A0', '#EF476F', '#FFD166',
+    '#118AB2', '#073B4C', '#F72585', '#7209B7', '#560BAD'
+]
+
+team_color_resolver = TeamColorResolver(TEAM_COLORS, DEFAULT_TEAM_PALETTE)
+
+
+def _group_by(keys, values):
+    """
+    Group values by key.
+    
+    Returns:
+        tuple: (sorted unique keys, per-group sums, per-group maxima, per-group counts)
+    """
+    keys = np.asarray(keys)
+    values = np.asarray(values, dtype=float)
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(unique_keys))
+    sums = np.bincount(inverse, weights=values, minlength=len(unique_keys))
+    maxima = np.full(len(unique_keys), -np.inf)
+    np.maximum.at(maxima, inverse, values)
+    return unique_keys, sums, maxima, counts
+
+
+def summarize_top_drivers(df, n=10):
+    """Top drivers by ELO rating, for the top drivers chart."""
+    top_drivers = df.nlargest(n, 'elo_rating')
+    return {
+        'driver': as_list(top_drivers['driver']),
+        'elo_rating': top_drivers['elo_rating'].to_numpy(dtype=float).tolist()
+    }
+
+
+def summarize_era_trends(df):
+    """Average and top ELO rating per debut decade, for the era trends chart."""
+    eras = (df['first_year'].to_numpy() // 10) * 10
+    era_keys, sums, maxima, counts = _group_by(eras, df['elo_rating'].to_numpy())
+    return {
+        'era': era_keys.tolist(),
+        'average_elo': (sums / counts).tolist(),
+        'top_elo': maxima.tolist()
+    }
+
+
+def summarize_reliability_distribution(df):
+    """Driver count per reliability grade, in grade order."""
+    grade_counts = df['reliability_grade'].value_counts()
+    grades = [grade for grade in GRADE_ORDER if grade in grade_counts.index]
+    return {
+        'grade': grades,
+        'count': [int(grade_counts[grade]) for grade in grades]
+    }
+
+
+def summarize_career_longevity(df):
+    """Average ELO rating and driver count per career span, for the longevity chart."""
+    spans, sums, _, counts = _group_by(df['career_span'].to_numpy(), df['elo_rating'].to_numpy())
+    return {
+        'career_span': spans.tolist(),
+        'average_elo': (sums / counts).tolist(),
+        'driver_count': counts.tolist()
+    }
+
+
+def summarize_home_charts(df):
+    """
+    Aggregate the rankings into everything the four home page charts need.
+    
+    The result is JSON-serializable so it can be precomputed at seed time.
+    
+    Args:
+        df: DataFrame of DriverEloRanking rows (model column names)
+        
+    Returns:
+        dict: Summaries keyed by chart name
+    """
+    return {
+        'top_drivers': summarize_top_drivers(df),
+        'era_trends': summarize_era_trends(df),
+        'reliability_distribution': summarize_reliability_distribution(df),
+        'career_longevity': summarize_career_longevity(df)
+    }
+
 
 class DriverVisualizationUtils:
-    """Utility class for creating driver-related visualizations."""
-
-    def create_top_drivers_chart(self, df):
-        """Create bar chart of top drivers by ELO rating."""
-        top_drivers = df.nlargest(10, 'elo_rating')
-        fig = px.bar(
-            top_drivers,
-            x='driver',
-            y=top_drivers['elo_rating'].round(0),
-            labels={'elo_rating': 'ELO Rating', 'driver': 'Driver'},
-            text=top_drivers['elo_rating'].round(0)
-        )
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            title=None,
-            yaxis_title='ELO Rating',
-            hovermode=False
+    """
+    Utility class for creating driver-related visualizations.
+    
+    Charts are returned as FigureDict objects, built straight from column
+    arrays without going through Plotly's property validation.
+    """
+
+    # Trace attributes shared by every driver on the comparison chart
+    COMPARISON_TRACE = {
+        'type': 'scatter',
+        'mode': 'lines+markers',
+        'hovertemplate': (
+            'Race: %{customdata[0]}<br>' +
+            'Date: %{customdata[1]}<br>' +
+            'ELO: %{y:.0f}<br>' +
+            'Position: %{customdata[2]}'
         )
-        return fig
-
-    def create_era_trends_chart(self, df):
-        """Create line chart showing ELO trends by era."""
-        df = df.copy()
-        df['era'] = (df['first_year'] // 10) * 10
-        era_group = df.groupby('era').agg({'elo_rating': ['mean', 'max']}).reset_index()
-        era_group.columns = ['Era', 'Average ELO', 'Top ELO']
-
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=era_group['Era'], 
-            y=era_group['Average ELO'].round(0), 
-            mode='lines+markers',
-            name='Average ELO', 
-            hovertemplate='Era: %{x}<br>Average ELO: %{y:,.0f}'
-        ))
-        fig.add_trace(go.Scatter(
-            x=era_group['Era'], 
-            y=era_group['Top ELO'].round(0), 
-            mode='lines+markers',
-            name='Top ELO', 
-            hovertemplate='Era: %{x}<br>Top ELO: %{y:,.0f}'
-        ))
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            title=None,
-            xaxis_title='Decade',
-            yaxis_title='ELO Rating',
-            xaxis=dict(
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='rgba(128, 128, 128, 0.2)',
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='rgba(128, 128, 128, 0.2)',
-            )
+    }
+
+    def __init__(self, max_points=None):
+        """
+        Args:
+            max_points: Target number of points per series for time-series
+                        charts. None plots every point.
+        """
+        self.max_points = max_points
+
+    def _downsample(self, data, x_col, y_col):
+        """Return data reduced to at most max_points rows (plus career extremes)."""
+        if not self.max_points or len(data) <= self.max_points:
+            return data
+        return data.iloc[downsample_indices(data[x_col], data[y_col], self.max_points)]
+
+    @timed_chart
+    def create_top_drivers_chart(self, summary):
+        """Create bar chart of top drivers by ELO rating from summarize_top_drivers()."""
+        elo = np.round(np.asarray(summary['elo_rating'], dtype=float), 0).tolist()
+        return FigureDict(
+            data=[{
+                'type': 'bar',
+                'x': list(summary['driver']),
+                'y': elo,
+                'text': elo,
+                'textposition': 'auto',
+                'orientation': 'v',
+                'name': '',
+                'legendgroup': '',
+                'showlegend': False,
+                'marker': {'color': DEFAULT_TRACE_COLOR, 'pattern': {'shape': ''}},
+                'hovertemplate': 'Driver=%{x}<br>y=%{y}<br>text=%{text}<extra></extra>',
+                'xaxis': 'x',
+                'yaxis': 'y'
+            }],
+            layout={
+                **TRANSPARENT_BACKGROUND,
+                'barmode': 'relative',
+                'legend': {'tracegroupgap': 0},
+                'margin': {'t': 60},
+                'xaxis': {'anchor': 'y', 'domain': [0.0, 1.0], 'title': {'text': 'Driver'}},
+                'yaxis': {'anchor': 'x', 'domain': [0.0, 1.0], 'title': {'text': 'ELO Rating'}},
+                'hovermode': False
+            }
         )
-        return fig
-
-    def create_reliability_distribution_chart(self, df):
-        """Create pie chart showing distribution of reliability grades."""
-        reliability_group = df.groupby('reliability_grade').agg({
-            'elo_rating': 'mean', 
-            'driver': 'count'
-        }).reset_index()
-        reliability_group.columns = ['Reliability Grade', 'Average ELO', 'Driver Count']
-
-        grade_order = ['A+', 'A', 'B+', 'B', 'C+', 'C', 'D+', 'D', 'F']
-        grade_colors = {
-            'A+': '#198754', 'A': '#28a745', 'B+': '#0d6efd', 'B': '#3d8bfd',
-            'C+': '#fd7e14', 'C': '#ffc107', 'D+': '#dc3545', 'D': '#e35d6a',
-            'F': '#343a40'
-        }
 
-        reliability_group['Reliability Grade'] = pd.Categorical(
-            reliability_group['Reliability Grade'],
-            categories=grade_order,
-            ordered=True
-        )
-        reliability_group = reliability_group.sort_values('Reliability Grade')
-
-        fig = px.pie(
-            reliability_group,
-            values='Driver Count',
-            names='Reliability Grade',
-            labels={'Driver Count': 'Driver Count', 'Reliability Grade': 'Reliability Grade'},
-            category_orders={'Reliability Grade': grade_order},
-            color='Reliability Grade',
-            color_discrete_map=grade_colors
+    @timed_chart
+    def create_era_trends_chart(self, summary):
+        """Create line chart showing ELO trends by era from summarize_era_trends()."""
+        eras = list(summary['era'])
+
+        return FigureDict(
+            data=[
+                {
+                    'type': 'scatter',
+                    'x': eras,
+                    'y': np.round(np.asarray(summary['average_elo'], dtype=float), 0).tolist(),
+                    'mode': 'lines+markers',
+                    'name': 'Average ELO',
+                    'hovertemplate': 'Era: %{x}<br>Average ELO: %{y:,.0f}'
+                },
+                {
+                    'type': 'scatter',
+                    'x': eras,
+                    'y': np.round(np.asarray(summary['top_elo'], dtype=float), 0).tolist(),
+                    'mode': 'lines+markers',
+                    'name': 'Top ELO',
+                    'hovertemplate': 'Era: %{x}<br>Top ELO: %{y:,.0f}'
+                }
+            ],
+            layout={
+                **TRANSPARENT_BACKGROUND,
+                'xaxis': grid_axis('Decade'),
+                'yaxis': grid_axis('ELO Rating')
+            }
         )
-        fig.update_traces(hovertemplate='Grade: %{label}<br>Count: %{value:,.0f}')
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            title=None
-        )
-        return fig
 
-    def create_career_longevity_chart(self, df):
-        """Create scatter plot showing career longevity vs ELO rating."""
-        career_span_data = df.groupby('career_span').agg({
-            'elo_rating': 'mean',
-            'driver': 'count'
-        }).reset_index()
+    @timed_chart
+    def create_reliability_distribution_chart(self, summary):
+        """Create pie chart showing distribution of reliability grades from summarize_reliability_distribution()."""
+        grades = list(summary['grade'])
+
+        return FigureDict(
+            data=[{
+                'type': 'pie',
+                'labels': grades,
+                'values': list(summary['count']),
+                'customdata': [[grade] for grade in grades],
+                'marker': {'colors': [GRADE_COLORS[grade] for grade in grades]},
+                'direction': 'clockwise',
+                'sort': False,
+                'domain': {'x': [0.0, 1.0], 'y': [0.0, 1.0]},
+                'name': '',
+                'legendgroup': '',
+                'showlegend': True,
+                'hovertemplate': 'Grade: %{label}<br>Count: %{value:,.0f}'
+            }],
+            layout={
+                **TRANSPARENT_BACKGROUND,
+                'legend': {'tracegroupgap': 0},
+                'margin': {'t': 60}
+            }
+        )
 
-        career_span_data.columns = ['career_span', 'avg_elo', 'driver_count']
-        career_span_data['avg_elo'] = career_span_data['avg_elo'].round(0)
+    @timed_chart
+    def create_career_longevity_chart(self, summary):
+        """Create scatter plot showing career longevity vs ELO rating from summarize_career_longevity()."""
+        spans = np.asarray(summary['career_span'])
+        counts = np.asarray(summary['driver_count'])
+        avg_elo = np.round(np.asarray(summary['average_elo'], dtype=float), 0)
 
-        n_points = len(career_span_data)
+        n_points = len(spans)
         colors = [f'hsl({h},70%,50%)' for h in np.linspace(0, 300, n_points)]
 
         min_size, max_size = 10, 50
-        min_count = career_span_data['driver_count'].min()
-        max_count = career_span_data['driver_count'].max()
-
-        def scale_size(count):
-            if max_count == min_count:
-                return (min_size + max_size) / 2
-            scaled = (count - min_count) / (max_count - min_count)
-            return min_size + (max_size - min_size) * scaled
-
-        career_span_data['point_size'] = career_span_data['driver_count'].apply(scale_size)
-
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=career_span_data['career_span'],
-            y=career_span_data['avg_elo'],
-            mode='markers',
-            marker=dict(
-                size=career_span_data['point_size'],
-                color=colors,
-                line=dict(width=1, color='darkgray')
-            ),
-            hovertemplate='Career Span: %{x} years<br>Average ELO: %{y:,.0f}<br>Drivers: %{customdata}<extra></extra>',
-            customdata=career_span_data['driver_count']
-        ))
-
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            title=None,
-            showlegend=False,
-            xaxis=dict(
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='rgba(128, 128, 128, 0.2)',
-                title='Career Span (Years)',
-                range=[-1, career_span_data['career_span'].max() + 1]
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='rgba(128, 128, 128, 0.2)',
-                title='ELO Rating'
-            )
+        min_count, max_count = counts.min(), counts.max()
+        if max_count == min_count:
+            sizes = np.full(n_points, (min_size + max_size) / 2)
+        else:
+            sizes = min_size + (max_size - min_size) * (counts - min_count) / (max_count - min_count)
+
+        return FigureDict(
+            data=[{
+                'type': 'scatter',
+                'x': spans.tolist(),
+                'y': avg_elo.tolist(),
+                'mode': 'markers',
+                'marker': {
+                    'size': sizes.tolist(),
+                    'color': colors,
+                    'line': {'width': 1, 'color': 'darkgray'}
+                },
+                'hovertemplate': 'Career Span: %{x} years<br>Average ELO: %{y:,.0f}<br>Drivers: %{customdata}<extra></extra>',
+                'customdata': counts.tolist()
+            }],
+            layout={
+                **TRANSPARENT_BACKGROUND,
+                'showlegend': False,
+                'xaxis': grid_axis('Career Span (Years)', range=[-1, int(spans.max()) + 1]),
+                'yaxis': grid_axis('ELO Rating')
+            }
         )
-        return fig
  
+    @timed_chart
     def create_elo_history_chart(self, driver_data, driver_name):
         """Create a line chart showing ELO rating progression over time."""
-        fig = go.Figure()
-
-        fig.add_trace(go.Scatter(
-            x=driver_data['year'],
-            y=driver_data['elo_rating'],
-            mode='lines+markers',
-            name='ELO Rating',
-            line=dict(width=2),
-            hovertemplate='Year: %{x}<br>ELO: %{y:.0f}'
-        ))
-
-        fig.update_layout(
-            title=f'ELO Rating Progression - {driver_name}',
-            xaxis_title='Year',
-            yaxis_title='ELO Rating',
-            hovermode='x unified',
-            showlegend=False,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='rgba(128,128,128,0.2)'
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='rgba(128,128,128,0.2)'
-            )
+        driver_data = self._downsample(driver_data, 'year', 'elo_rating')
+        return FigureDict(
+            data=[{
+                'type': 'scatter',
+                'x': as_list(driver_data['year']),
+                'y': as_list(driver_data['elo_rating']),
+                'mode': 'lines+markers',
+                'name': 'ELO Rating',
+                'line': {'width': 2},
+                'hovertemplate': 'Year: %{x}<br>ELO: %{y:.0f}'
+            }],
+            layout={
+                **TRANSPARENT_BACKGROUND,
+                'title': {'text': f'ELO Rating Progression - {driver_name}'},
+                'hovermode': 'x unified',
+                'showlegend': False,
+                'xaxis': grid_axis('Year'),
+                'yaxis': grid_axis('ELO Rating')
+            }
         )
 
-        return fig
-
+    @timed_chart
     def create_team_elo_chart(self, team_data, driver_name):
         """Create a clean chart showing ELO progression as a continuous line colored by team."""
         if 'elo_rating' not in team_data.columns:
             team_data = team_data.copy()
             team_data['elo_rating'] = team_data.groupby('team').cumcount() + 1500
 
-        # F1 team colors - a curated palette for visual distinction
-        team_colors = {
-            # Current/Recent Teams
-            'Red Bull': '#1E41FF',
-            'Ferrari': '#DC0000',
-            'Mercedes': '#00D2BE',
-            'McLaren': '#FF8700',
-            'Aston Martin': '#006F62',
-            'Alpine F1 Team': '#0090FF',
-            'Williams': '#005AFF',
-            'RB F1 Team': '#2B4562',
-            'Sauber': '#900000',
-            'Haas F1 Team': '#B6BABD',
-            # Historical Teams
-            'Lotus': '#C6A800',
-            'Brabham': '#2E8B57',
-            'Tyrrell': '#00008B',
-            'BRM': '#006400',
-            'Cooper': '#4169E1',
-            'Renault': '#FFF500',
-            'Jordan': '#EBC100',
-            'BAR': '#CCCCCC',
-            'Benetton': '#00D2BE',
-            'Ligier': '#0066CC',
-            'Minardi': '#191919',
-            'Arrows': '#FF6600',
-            'March': '#FF4500',
-            'Surtees': '#8B0000',
-            'Shadow': '#1C1C1C',
-            'Prost': '#1E90FF',
-            'Jaguar': '#0A5C36',
-            'Toyota': '#CC0000',
-            'Honda': '#CCCCCC',
-            'Toro Rosso': '#469BFF',
-            'Racing Point': '#F596C8',
-            'Force India': '#FF5F1F',
-            'Lotus F1': '#B6860E',
-            'Caterham': '#00994C',
-            'Marussia': '#6E0000',
-            'HRT': '#A49E8C',
-            'Virgin': '#C82D2D',
-            'Alfa Romeo': '#900000',
-            'AlphaTauri': '#2B4562',
-            'Maserati': '#9B111E',
-        }
-        
-        # Generate distinct colors for unknown teams
-        default_palette = [
-            '#E63946', '#F4A261', '#2A9D8F', '#264653', '#E9C46A',
-            '#8338EC', '#3A86FF', '#06D6A0', '#EF476F', '#FFD166',
-            '#118AB2', '#073B4C', '#F72585', '#7209B7', '#560BAD'
-        ]
-        
-        # Sort data by year
-        team_data = team_data.sort_values('year').copy()
-        
-        # Get the primary team for each year (the one with most races that year)
-        year_team_counts = team_data.groupby(['year', 'team']).size().reset_index(name='race_count')
-        primary_team_per_year = year_team_counts.loc[year_team_counts.groupby('year')['race_count'].idxmax()]
-        primary_team_per_year = primary_team_per_year[['year', 'team']].sort_values('year')
-        
-        # Get average ELO per year
-        yearly_elo = team_data.groupby('year')['elo_rating'].mean().reset_index().sort_values('year')
-        
-        # Merge to get team info per year
-        yearly_data = yearly_elo.merge(primary_team_per_year, on='year', how='left')
-        yearly_data = yearly_data.sort_values('year').reset_index(drop=True)
-        
-        # Drop rows with missing team data (can occur when year exists in yearly_elo
-        # but not in primary_team_per_year due to NaN teams in source data)
-        yearly_data = yearly_data.dropna(subset=['team'])
-        
-        if yearly_data.empty:
+        team_data = team_data.sort_values('year')
+        row_years = team_data['year'].tolist()
+        row_teams = team_data['team'].tolist()
+        row_elos = team_data['elo_rating'].tolist()
+
+        # Average ELO per year and race count per (year, team)
+        year_elos = {}
+        year_team_counts = {}
+        for year, team, elo in zip(row_years, row_teams, row_elos):
+            year_elos.setdefault(year, []).append(elo)
+            # Rows with missing team data are averaged but never chosen as primary team
+            if isinstance(team, str):
+                year_team_counts[(year, team)] = year_team_counts.get((year, team), 0) + 1
+
+        # Primary team for each year is the one with most races (alphabetical on ties)
+        primary_team = {}
+        for (year, team), count in sorted(year_team_counts.items()):
+            if year not in primary_team or count > year_team_counts[(year, primary_team[year])]:
+                primary_team[year] = team
+
+        years = [year for year in sorted(year_elos) if year in primary_team]
+        if not years:
             # No valid team data available, return empty figure
-            return go.Figure()
-        
-        # Get all unique teams in chronological order
-        teams_in_order = list(yearly_data['team'].unique())
-        
-        # Assign colors to teams
-        color_map = {}
-        color_idx = 0
-        for team in teams_in_order:
-            matched = False
-            for key, color in team_colors.items():
-                if key.lower() in team.lower() or team.lower() in key.lower():
-                    color_map[team] = color
-                    matched = True
-                    break
-            if not matched:
-                color_map[team] = default_palette[color_idx % len(default_palette)]
-                color_idx += 1
+            return FigureDict()
+        elos = [float(np.mean(year_elos[year])) for year in years]
+        teams = [primary_team[year] for year in years]
+
+        # Unique teams in chronological order, with their colours
+        teams_in_order = list(dict.fromkeys(teams))
+        color_map = team_color_resolver.color_map(teams_in_order)
 
         # Calculate y-axis range with padding
-        y_min = yearly_data['elo_rating'].min()
-        y_max = yearly_data['elo_rating'].max()
+        y_min, y_max = min(elos), max(elos)
         y_padding = (y_max - y_min) * 0.12 if y_max != y_min else 50
-        
-        fig = go.Figure()
-        
-        # Build the career as connected segments, each colored by team
-        # We'll draw line segments between consecutive years
-        years = yearly_data['year'].tolist()
-        elos = yearly_data['elo_rating'].tolist()
-        teams = yearly_data['team'].tolist()
-        
-        # Track which teams we've added to legend
-        teams_in_legend = set()
-        
-        # Draw connecting line segments between consecutive points
-        for i in range(len(years) - 1):
-            year_start = years[i]
-            year_end = years[i + 1]
-            elo_start = elos[i]
-            elo_end = elos[i + 1]
-            team = teams[i]  # Color by the starting point's team
-            color = color_map.get(team, '#888888')
-            
-            # Only show in legend once per team
-            show_legend = team not in teams_in_legend
-            if show_legend:
-                teams_in_legend.add(team)
-            
-            fig.add_trace(go.Scatter(
-                x=[year_start, year_end],
-                y=[elo_start, elo_end],
-                mode='lines',
-                line=dict(color=color, width=4),
-                name=team,
-                showlegend=False,
-                hoverinfo='skip'
-            ))
-        
+
+        # Build the career as connected segments between consecutive years,
+        # each colored by the starting point's team
+        traces = [
+            {
+                'type': 'scatter',
+                'x': [years[i], years[i + 1]],
+                'y': [elos[i], elos[i + 1]],
+                'mode': 'lines',
+                'line': {'color': color_map.get(teams[i], '#888888'), 'width': 4},
+                'name': teams[i],
+                'showlegend': False,
+                'hoverinfo': 'skip'
+            }
+            for i in range(len(years) - 1)
+        ]
+
         # Add markers for each year with hover info
         for team in teams_in_order:
-            team_years = yearly_data[yearly_data['team'] == team]
-            color = color_map.get(team, '#888888')
-            
-            fig.add_trace(go.Scatter(
-                x=team_years['year'],
-                y=team_years['elo_rating'],
-                mode='markers',
-                name=team,
-                marker=dict(
-                    size=12,
-                    color=color,
-                    line=dict(width=2, color='white'),
-                    symbol='circle'
-                ),
-                hovertemplate=(
-                    f'<b>{team}</b><br>' +
-                    'Year: %{x}<br>' +
-                    'ELO: %{y:.0f}<extra></extra>'
-                ),
-                showlegend=True
-            ))
-        
+            traces.append({
+                'type': 'scatter',
+                'x': [year for year, t in zip(years, teams) if t == team],
+                'y': [elo for elo, t in zip(elos, teams) if t == team],
+                'mode': 'markers',
+                'name': team,
+                'marker': {
+                    'size': 12,
+                    'color': color_map.get(team, '#888888'),
+                    'line': {'width': 2, 'color': 'white'},
+                    'symbol': 'circle'
+                },
+                'hovertemplate': f'<b>{team}</b><br>Year: %{{x}}<br>ELO: %{{y:.0f}}<extra></extra>',
+                'showlegend': True
+            })
+
         # Determine appropriate x-axis tick interval
-        year_span = max(years) - min(years) if years else 0
+        year_span = max(years) - min(years)
         if year_span <= 8:
             dtick = 1
         elif year_span <= 15:
             dtick = 2
         else:
             dtick = 5
-        
-        fig.update_layout(
-            title=dict(
-                text=f'<b>Career ELO by Team</b><br><sup>{driver_name}</sup>',
-                font=dict(size=16),
-                x=0.5,
-                xanchor='center'
-            ),
-            xaxis_title='Year',
-            yaxis_title='ELO Rating',
-            hovermode='closest',
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            legend=dict(
-                orientation='h',
-                yanchor='bottom',
-                y=1.02,
-                xanchor='center',
-                x=0.5,
-                bgcolor='rgba(255,255,255,0.9)',
-                bordercolor='rgba(0,0,0,0.1)',
-                borderwidth=1,
-                font=dict(size=11)
-            ),
-            xaxis=dict(
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='rgba(128,128,128,0.2)',
-                dtick=dtick,
-                tickangle=0
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='rgba(128,128,128,0.2)',
-                range=[y_min - y_padding, y_max + y_padding]
-            ),
-            margin=dict(t=80, b=50, l=60, r=30)
+
+        return FigureDict(
+            data=traces,
+            layout={
+                **TRANSPARENT_BACKGROUND,
+                'title': {
+                    'text': f'<b>Career ELO by Team</b><br><sup>{driver_name}</sup>',
+                    'font': {'size': 16},
+                    'x': 0.5,
+                    'xanchor': 'center'
+                },
+                'hovermode': 'closest',
+                'legend': {
+                    'orientation': 'h',
+                    'yanchor': 'bottom',
+                    'y': 1.02,
+                    'xanchor': 'center',
+                    'x': 0.5,
+                    'bgcolor': 'rgba(255,255,255,0.9)',
+                    'bordercolor': 'rgba(0,0,0,0.1)',
+                    'borderwidth': 1,
+                    'font': {'size': 11}
+                },
+                'xaxis': grid_axis('Year', dtick=dtick, tickangle=0),
+                'yaxis': grid_axis('ELO Rating', range=[y_min - y_padding, y_max + y_padding]),
+                'margin': {'t': 80, 'b': 50, 'l': 60, 'r': 30}
+            }
         )
-        
-        return fig
 
     def get_teammate_comparisons(self, driver_data, career_data, drivers_df):
         """Calculate head-to-head statistics against teammates."""
@@ -466,138 +572,99 @@ class DriverVisualizationUtils:
 
         return sorted(comparisons, key=lambda x: x['races'], reverse=True)[:5]
 
+    @timed_chart
     def create_era_performance_chart(self, driver_data):
         """Create a bar chart showing average ELO rating by era (decade)."""
-        driver_data = driver_data.copy()
-        driver_data['decade'] = (driver_data['year'] // 10) * 10
-        era_avg = driver_data.groupby('decade')['elo_rating'].mean().reset_index()
-
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=era_avg['decade'].astype(str) + 's',
-            y=era_avg['elo_rating'],
-            text=era_avg['elo_rating'].round(0),
-            textposition='auto',
-            hovertemplate='Era: %{x}<br>Average ELO: %{y:.0f}',
-        ))
-
-        fig.update_layout(
-            title='Average ELO Rating by Era',
-            xaxis_title='Era',
-            yaxis_title='Average ELO Rating',
-            showlegend=False,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='rgba(128,128,128,0.2)'
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='rgba(128,128,128,0.2)'
-            )
+        decades, sums, _, counts = _group_by(
+            (driver_data['year'].to_numpy() // 10) * 10,
+            driver_data['elo_rating'].to_numpy()
+        )
+        averages = sums / counts
+
+        return FigureDict(
+            data=[{
+                'type': 'bar',
+                'x': [f'{decade}s' for decade in decades.tolist()],
+                'y': averages.tolist(),
+                'text': np.round(averages, 0).tolist(),
+                'textposition': 'auto',
+                'hovertemplate': 'Era: %{x}<br>Average ELO: %{y:.0f}'
+            }],
+            layout={
+                **TRANSPARENT_BACKGROUND,
+                'title': {'text': 'Average ELO Rating by Era'},
+                'showlegend': False,
+                'xaxis': grid_axis('Era'),
+                'yaxis': grid_axis('Average ELO Rating')
+            }
         )
 
-        return fig
-
+    @timed_chart
     def create_confidence_chart(self, driver):
         """Create a visualization of the driver's confidence interval."""
-        fig = go.Figure()
-        
-        # Add main ELO rating point
-        fig.add_trace(go.Scatter(
-            x=[driver.elo_rating],
-            y=[0],
-            mode='markers',
-            marker=dict(
-                size=20,
-                color='blue',
-                symbol='diamond'
-            ),
-            name='Current Rating',
-            hovertemplate='ELO Rating: %{x:.0f}'
-        ))
-        
-        # Add confidence interval
-        fig.add_trace(go.Scatter(
-            x=[driver.lower_bound, driver.upper_bound],
-            y=[0, 0],
-            mode='lines',
-            line=dict(
-                color='rgba(0,0,255,0.3)',
-                width=10
-            ),
-            name='95% Confidence Interval',
-            hovertemplate='%{x:.0f}'
-        ))
-        
-        # Update layout
-        fig.update_layout(
-            title='Rating Confidence Interval',
-            showlegend=True,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(
-                title='ELO Rating',
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='rgba(128,128,128,0.2)',
-                zeroline=False
-            ),
-            yaxis=dict(
-                showticklabels=False,
-                showgrid=False,
-                zeroline=False
-            ),
-            height=200,
-            margin=dict(t=30, l=50, r=50, b=30)
+        return FigureDict(
+            data=[
+                # Main ELO rating point
+                {
+                    'type': 'scatter',
+                    'x': [driver.elo_rating],
+                    'y': [0],
+                    'mode': 'markers',
+                    'marker': {'size': 20, 'color': 'blue', 'symbol': 'diamond'},
+                    'name': 'Current Rating',
+                    'hovertemplate': 'ELO Rating: %{x:.0f}'
+                },
+                # Confidence interval
+                {
+                    'type': 'scatter',
+                    'x': [driver.lower_bound, driver.upper_bound],
+                    'y': [0, 0],
+                    'mode': 'lines',
+                    'line': {'color': 'rgba(0,0,255,0.3)', 'width': 10},
+                    'name': '95% Confidence Interval',
+                    'hovertemplate': '%{x:.0f}'
+                }
+            ],
+            layout={
+                **TRANSPARENT_BACKGROUND,
+                'title': {'text': 'Rating Confidence Interval'},
+                'showlegend': True,
+                'xaxis': grid_axis('ELO Rating', zeroline=False),
+                'yaxis': {'showticklabels': False, 'showgrid': False, 'zeroline': False},
+                'height': 200,
+                'margin': {'t': 30, 'l': 50, 'r': 50, 'b': 30}
+            }
         )
-        
-        return fig
 
+    @timed_chart
     def create_comparison_chart(self, comparison_data):
         """Create a line chart comparing multiple drivers' ELO progression."""
         if comparison_data.empty:
             return None
             
-        fig = go.Figure()
-        
-        for driver in comparison_data['Driver'].unique():
-            driver_data = comparison_data[comparison_data['Driver'] == driver]
-            
-            fig.add_trace(go.Scatter(
-                x=driver_data['race_number'],
-                y=driver_data['elo_rating'],
-                name=driver,
-                mode='lines+markers',
-                hovertemplate=(
-                    'Race: %{customdata[0]}<br>' +
-                    'Date: %{customdata[1]}<br>' +
-                    'ELO: %{y:.0f}<br>' +
-                    'Position: %{customdata[2]}'
-                ),
-                customdata=driver_data[['race_name', 'race_date', 'position']]
-            ))
+        traces = []
+        for driver, driver_data in comparison_data.groupby('Driver', sort=False):
+            driver_data = self._downsample(driver_data, 'race_number', 'elo_rating')
+            trace = {
+                **self.COMPARISON_TRACE,
+                'x': as_list(driver_data['race_number']),
+                'y': as_list(driver_data['elo_rating']),
+                'name': driver,
+                'customdata': driver_data[['race_name', 'race_date', 'position']].to_numpy().tolist()
+            }
+            if 'driver_id' in driver_data:
+                trace['meta'] = int(driver_data['driver_id'].iloc[0])
+            traces.append(trace)
         
-        fig.update_layout(
-            title='Driver ELO Rating Progression by Race',
-            xaxis_title='Race Number',
-            yaxis_title='ELO Rating',
-            hovermode='closest',
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='rgba(128,128,128,0.2)',
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='rgba(128,128,128,0.2)',
-            )
-        )
-        
-        return fig
+        return FigureDict(data=traces, layout=self.comparison_layout())
+    
+    @staticmethod
+    def comparison_layout():
+        """Layout of the comparison chart, also used to draw it in the browser."""
+        return {
+            **TRANSPARENT_BACKGROUND,
+            'title': {'text': 'Driver ELO Rating Progression by Race'},
+            'hovermode': 'closest',
+            'xaxis': grid_axis('Race Number'),
+            'yaxis': grid_axis('ELO Rating')
+        }